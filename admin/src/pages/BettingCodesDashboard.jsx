@@ -64,39 +64,48 @@ function BettingCodesDashboard() {
         
         ws.onmessage = (event) => {
           try {
-            const data = JSON.parse(event.data);
-            
-            switch(data.type) {
-              case 'NEW_BETTING_CODE':
-                setPendingCodes(prev => {
-                  const exists = prev.some(code => code.id === data.code.id);
-                  if (exists) return prev;
-                  return [data.code, ...prev];
-                });
-                toast.info(`New betting code from ${data.code.user_name}`, {
-                  duration: 5000,
-                  icon: '🎲'
-                });
-                break;
-
-              case 'CODE_VERIFIED':
-                toast.success(`Code ${data.code_id} verified as ${data.status}`, {
-                  duration: 5000,
-                  icon: '✅'
-                });
-                fetchPendingCodes(); // Refresh list
-                break;
-
-              case 'ERROR':
-                toast.error(data.message || 'Unknown error occurred', {
-                  duration: 7000,
-                  icon: '⚠️'
-                });
-                break;
-
-              default:
-                console.log('Unknown message type:', data.type);
-            }
+            const message = JSON.parse(event.data);
+            // Bursts of events arrive together in one BATCH frame
+            const events = message.type === 'BATCH' ? message.events : [message];
+
+            events.forEach((data) => {
+              switch(data.type) {
+                case 'NEW_BETTING_CODE':
+                  setPendingCodes(prev => {
+                    const exists = prev.some(code => code.id === data.code.id);
+                    if (exists) return prev;
+                    return [data.code, ...prev];
+                  });
+                  toast.info(`New betting code from ${data.code.user_name}`, {
+                    duration: 5000,
+                    icon: '🎲'
+                  });
+                  break;
+
+                case 'CODE_VERIFIED':
+                  toast.success(`Code ${data.code_id} verified as ${data.status}`, {
+                    duration: 5000,
+                    icon: '✅'
+                  });
+                  fetchPendingCodes(); // Refresh list
+                  break;
+
+                case 'PING':
+                  // Server heartbeat; an unanswered connection is closed as idle
+                  ws.send(JSON.stringify({ type: 'PONG' }));
+                  break;
+
+                case 'ERROR':
+                  toast.error(data.message || 'Unknown error occurred', {
+                    duration: 7000,
+                    icon: '⚠️'
+                  });
+                  break;
+
+                default:
+                  console.log('Unknown message type:', data.type);
+              }
+            });
           } catch (error) {
             console.error('Error processing WebSocket message:', error);
             toast.error('Error processing update', {
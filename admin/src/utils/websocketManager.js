@@ -41,11 +41,21 @@ class WebSocketManager {
     }
 
     handleMessage(data) {
+        // Bursts of events arrive together in one BATCH frame
+        if (data.type === 'BATCH') {
+            data.events.forEach(event => this.handleMessage(event));
+            return;
+        }
+
         const listeners = this.listeners.get(data.type) || [];
         listeners.forEach(callback => callback(data));
 
         // Show notifications for specific events
         switch (data.type) {
+            case 'PING':
+                // Server heartbeat; an unanswered connection is closed as idle
+                this.socket.send(JSON.stringify({ type: 'PONG' }));
+                break;
             case 'NEW_BETTING_CODE':
                 toast.info(`New betting code from ${data.data.user_name}`);
                 break;
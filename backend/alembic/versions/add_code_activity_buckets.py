@@ -0,0 +1,61 @@
+"""add hourly code activity buckets for trending
+
+Revision ID: add_code_activity_buckets
+Revises: add_code_stats_table
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_code_activity_buckets'
+down_revision = 'add_code_stats_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'code_activity_buckets' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'code_activity_buckets',
+        sa.Column('code_id', sa.Integer(), sa.ForeignKey('betting_codes.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('purchases', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('code_id', 'bucket_start')
+    )
+    op.create_index('ix_code_activity_buckets_bucket_start', 'code_activity_buckets', ['bucket_start'])
+
+    # Backfill the last 30 days, the longest trending window
+    if conn.dialect.name == 'postgresql':
+        hour = "date_trunc('hour', {column})"
+        since = "now() - interval '30 days'"
+    else:
+        hour = "strftime('%Y-%m-%d %H:00:00', {column})"
+        since = "datetime('now', '-30 days')"
+
+    op.execute(f"""
+        INSERT INTO code_activity_buckets (code_id, bucket_start, views, purchases, rating_sum, rating_count)
+        SELECT code_id, bucket_start, SUM(views), SUM(purchases), SUM(rating_sum), SUM(rating_count)
+        FROM (
+            SELECT code_id, {hour.format(column='viewed_at')} AS bucket_start,
+                   1 AS views, 0 AS purchases, 0 AS rating_sum, 0 AS rating_count
+            FROM code_views WHERE viewed_at >= {since}
+            UNION ALL
+            SELECT code_id, {hour.format(column='purchased_at')}, 0, 1, 0, 0
+            FROM code_purchases WHERE purchased_at >= {since}
+            UNION ALL
+            SELECT code_id, {hour.format(column='created_at')}, 0, 0, rating, 1
+            FROM code_ratings WHERE created_at >= {since}
+        ) activity
+        GROUP BY code_id, bucket_start
+    """)
+
+def downgrade():
+    op.drop_index('ix_code_activity_buckets_bucket_start', table_name='code_activity_buckets')
+    op.drop_table('code_activity_buckets')
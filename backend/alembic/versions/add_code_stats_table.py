@@ -0,0 +1,74 @@
+"""add code_stats rollup table
+
+Revision ID: add_code_stats_table
+Revises: add_marketplace_search
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_code_stats_table'
+down_revision = 'add_marketplace_search'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'code_stats' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'code_stats',
+        sa.Column('code_id', sa.Integer(), sa.ForeignKey('betting_codes.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('view_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('purchase_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_viewed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_purchased_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_rated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('code_id')
+    )
+    op.create_index('ix_code_stats_purchase_count', 'code_stats', ['purchase_count'])
+
+    # Backfill from the raw tables, aggregating each one separately so nothing fans out
+    op.execute("""
+        INSERT INTO code_stats (
+            code_id, view_count, purchase_count, revenue, rating_sum, rating_count,
+            last_viewed_at, last_purchased_at, last_rated_at, updated_at
+        )
+        SELECT
+            bc.id,
+            COALESCE(v.view_count, 0),
+            COALESCE(p.purchase_count, 0),
+            COALESCE(p.revenue, 0),
+            COALESCE(r.rating_sum, 0),
+            COALESCE(r.rating_count, 0),
+            v.last_viewed_at,
+            p.last_purchased_at,
+            r.last_rated_at,
+            CURRENT_TIMESTAMP
+        FROM betting_codes bc
+        LEFT JOIN (
+            SELECT code_id, COUNT(*) AS view_count, MAX(viewed_at) AS last_viewed_at
+            FROM code_views GROUP BY code_id
+        ) v ON v.code_id = bc.id
+        LEFT JOIN (
+            SELECT code_id, COUNT(*) AS purchase_count, SUM(amount) AS revenue, MAX(purchased_at) AS last_purchased_at
+            FROM code_purchases GROUP BY code_id
+        ) p ON p.code_id = bc.id
+        LEFT JOIN (
+            SELECT code_id, COUNT(*) AS rating_count, SUM(rating) AS rating_sum,
+                   MAX(COALESCE(updated_at, created_at)) AS last_rated_at
+            FROM code_ratings GROUP BY code_id
+        ) r ON r.code_id = bc.id
+        WHERE v.code_id IS NOT NULL OR p.code_id IS NOT NULL OR r.code_id IS NOT NULL
+    """)
+
+def downgrade():
+    op.drop_index('ix_code_stats_purchase_count', table_name='code_stats')
+    op.drop_table('code_stats')
@@ -0,0 +1,69 @@
+"""add indexes for marketplace hot filters
+
+Revision ID: add_marketplace_indexes
+Revises: merge_marketplace_heads
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_marketplace_indexes'
+down_revision = 'merge_marketplace_heads'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, extra kwargs)
+INDEXES = [
+    (
+        'ix_betting_codes_marketplace_live', 'betting_codes', ['user_country', 'created_at', 'id'],
+        {
+            'postgresql_where': sa.text("is_published AND marketplace_status = 'active' AND status = 'approved'"),
+            'sqlite_where': sa.text("is_published = 1 AND marketplace_status = 'active' AND status = 'approved'"),
+            'postgresql_include': ['valid_until', 'price', 'win_probability', 'expected_odds'],
+            'postgresql_ops': {'created_at': 'DESC NULLS LAST', 'id': 'DESC'},
+        }
+    ),
+    ('ix_betting_codes_country_marketplace_status', 'betting_codes', ['user_country', 'marketplace_status', 'valid_until'], {}),
+    ('ix_betting_codes_country_analysis_status', 'betting_codes', ['user_country', 'analysis_status', 'created_at'], {}),
+    ('ix_betting_codes_country_status', 'betting_codes', ['user_country', 'status'], {}),
+    ('ix_betting_codes_user_id', 'betting_codes', ['user_id'], {}),
+    ('ix_code_views_code_id_viewed_at', 'code_views', ['code_id', 'viewed_at'], {}),
+    ('ix_code_purchases_code_id_purchased_at', 'code_purchases', ['code_id', 'purchased_at'], {}),
+    ('ix_code_ratings_code_id_created_at', 'code_ratings', ['code_id', 'created_at'], {}),
+]
+
+def _existing_indexes(inspector, table):
+    if table not in inspector.get_table_names():
+        return None
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    is_postgres = conn.dialect.name == 'postgresql'
+
+    pending = []
+    for name, table, columns, kwargs in INDEXES:
+        existing = _existing_indexes(inspector, table)
+        if existing is None or name in existing:
+            continue
+        pending.append((name, table, columns, kwargs))
+
+    if is_postgres:
+        # Build without locking writes on the live tables
+        with op.get_context().autocommit_block():
+            for name, table, columns, kwargs in pending:
+                op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+    else:
+        for name, table, columns, kwargs in pending:
+            op.create_index(name, table, columns, **kwargs)
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    for name, table, columns, kwargs in reversed(INDEXES):
+        existing = _existing_indexes(inspector, table)
+        if existing and name in existing:
+            op.drop_index(name, table_name=table)
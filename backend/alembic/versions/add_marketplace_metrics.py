@@ -0,0 +1,67 @@
+"""add hourly/daily marketplace metrics rollup
+
+Revision ID: add_marketplace_metrics
+Revises: add_marketplace_stats_index
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_marketplace_metrics'
+down_revision = 'add_marketplace_stats_index'
+branch_labels = None
+depends_on = None
+
+# Range scans of the rollup job over the source tables
+SOURCE_INDEXES = [
+    ('ix_betting_codes_created_at', 'betting_codes', ['created_at']),
+    ('ix_code_purchases_purchased_at', 'code_purchases', ['purchased_at']),
+]
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if 'marketplace_metrics' not in inspector.get_table_names():
+        op.create_table(
+            'marketplace_metrics',
+            sa.Column('granularity', sa.String(4), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('country', sa.String(50), nullable=False),
+            sa.Column('category', sa.String(50), nullable=False),
+            sa.Column('bookmaker', sa.String(50), nullable=False),
+            sa.Column('sales', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('new_listings', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('listing_price_sum', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('listing_price_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('listing_price_min', sa.Float(), nullable=True),
+            sa.Column('listing_price_max', sa.Float(), nullable=True),
+            sa.Column('codes_created', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('codes_won', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'country', 'category', 'bookmaker')
+        )
+        op.create_index(
+            'ix_marketplace_metrics_country_bucket', 'marketplace_metrics',
+            ['country', 'granularity', 'bucket_start']
+        )
+
+    # The table is backfilled by the rollup job on its first run (or by
+    # backfill_marketplace_metrics.py), outside of this transaction
+    for name, table, columns in SOURCE_INDEXES:
+        existing = {ix['name'] for ix in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+        if conn.dialect.name == 'postgresql':
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns)
+
+def downgrade():
+    for name, table, _ in SOURCE_INDEXES:
+        op.drop_index(name, table_name=table)
+    op.drop_index('ix_marketplace_metrics_country_bucket', table_name='marketplace_metrics')
+    op.drop_table('marketplace_metrics')
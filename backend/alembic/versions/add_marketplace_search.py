@@ -0,0 +1,124 @@
+"""add full-text search index for marketplace codes
+
+Revision ID: add_marketplace_search
+Revises: add_marketplace_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_marketplace_search'
+down_revision = 'add_marketplace_indexes'
+branch_labels = None
+depends_on = None
+
+# A copy of the DDL in app.core.search as of this revision, so that later
+# changes there do not change what this migration does
+
+# Column weights: title and tags rank above bookmaker, description lowest
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE betting_codes ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_betting_codes_search_vector ON betting_codes USING GIN (search_vector)",
+    """
+    CREATE OR REPLACE FUNCTION betting_codes_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce((
+                SELECT string_agg(value, ' ')
+                FROM json_array_elements_text(
+                    CASE WHEN json_typeof(NEW.tags::json) = 'array' THEN NEW.tags::json ELSE '[]'::json END
+                )
+            ), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.bookmaker, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS betting_codes_search_vector_trg ON betting_codes",
+    """
+    CREATE TRIGGER betting_codes_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, bookmaker, tags ON betting_codes
+    FOR EACH ROW EXECUTE FUNCTION betting_codes_search_vector_update()
+    """,
+    # Backfill rows written before the trigger existed
+    "UPDATE betting_codes SET title = title WHERE search_vector IS NULL",
+]
+
+POSTGRES_SEARCH_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS betting_codes_search_vector_trg ON betting_codes",
+    "DROP FUNCTION IF EXISTS betting_codes_search_vector_update()",
+    "DROP INDEX IF EXISTS ix_betting_codes_search_vector",
+    "ALTER TABLE betting_codes DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS betting_codes_fts USING fts5(
+        title, description, bookmaker, tags,
+        content='betting_codes', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_insert AFTER INSERT ON betting_codes BEGIN
+        INSERT INTO betting_codes_fts(rowid, title, description, bookmaker, tags)
+        VALUES (new.id, new.title, new.description, new.bookmaker, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_delete AFTER DELETE ON betting_codes BEGIN
+        INSERT INTO betting_codes_fts(betting_codes_fts, rowid, title, description, bookmaker, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.bookmaker, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_update
+    AFTER UPDATE OF title, description, bookmaker, tags ON betting_codes BEGIN
+        INSERT INTO betting_codes_fts(betting_codes_fts, rowid, title, description, bookmaker, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.bookmaker, old.tags);
+        INSERT INTO betting_codes_fts(rowid, title, description, bookmaker, tags)
+        VALUES (new.id, new.title, new.description, new.bookmaker, new.tags);
+    END
+    """,
+    "INSERT INTO betting_codes_fts(betting_codes_fts) VALUES ('rebuild')",
+]
+
+SQLITE_SEARCH_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS betting_codes_fts_insert",
+    "DROP TRIGGER IF EXISTS betting_codes_fts_delete",
+    "DROP TRIGGER IF EXISTS betting_codes_fts_update",
+    "DROP TABLE IF EXISTS betting_codes_fts",
+]
+
+def upgrade():
+    # tsvector column + GIN index + trigger on Postgres, FTS5 table + triggers on SQLite
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if conn.dialect.name == 'postgresql':
+        if 'search_vector' in {c['name'] for c in inspector.get_columns('betting_codes')}:
+            return
+        statements = POSTGRES_SEARCH_DDL
+    elif conn.dialect.name == 'sqlite':
+        if 'betting_codes_fts' in inspector.get_table_names():
+            return
+        statements = SQLITE_SEARCH_DDL
+    else:
+        # Search falls back to LIKE
+        return
+
+    for statement in statements:
+        op.execute(statement)
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        statements = POSTGRES_SEARCH_DROP_DDL
+    elif conn.dialect.name == 'sqlite':
+        statements = SQLITE_SEARCH_DROP_DDL
+    else:
+        return
+
+    for statement in statements:
+        op.execute(statement)
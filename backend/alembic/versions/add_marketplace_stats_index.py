@@ -0,0 +1,45 @@
+"""cover the marketplace stats aggregate with one betting_codes index
+
+Revision ID: add_marketplace_stats_index
+Revises: add_code_activity_buckets
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_marketplace_stats_index'
+down_revision = 'add_code_activity_buckets'
+branch_labels = None
+depends_on = None
+
+NEW_INDEX = ('ix_betting_codes_country_marketplace_stats', ['user_country', 'marketplace_status', 'valid_until', 'status'])
+OLD_INDEX = ('ix_betting_codes_country_marketplace_status', ['user_country', 'marketplace_status', 'valid_until'])
+
+def _existing_indexes(conn):
+    return {ix['name'] for ix in sa.inspect(conn).get_indexes('betting_codes')}
+
+def _swap(create, drop):
+    """Create one index and drop the other; the new index serves every query of the old one"""
+    conn = op.get_bind()
+    existing = _existing_indexes(conn)
+
+    if conn.dialect.name == 'postgresql':
+        # Build without locking writes on the live table
+        with op.get_context().autocommit_block():
+            if create[0] not in existing:
+                op.create_index(create[0], 'betting_codes', create[1], postgresql_concurrently=True)
+            if drop[0] in existing:
+                op.drop_index(drop[0], table_name='betting_codes', postgresql_concurrently=True)
+    else:
+        if create[0] not in existing:
+            op.create_index(create[0], 'betting_codes', create[1])
+        if drop[0] in existing:
+            op.drop_index(drop[0], table_name='betting_codes')
+
+def upgrade():
+    # status as a trailing column makes the single-scan stats aggregate index-only
+    _swap(NEW_INDEX, OLD_INDEX)
+
+def downgrade():
+    _swap(OLD_INDEX, NEW_INDEX)
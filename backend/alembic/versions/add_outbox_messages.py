@@ -0,0 +1,42 @@
+"""add transactional outbox
+
+Revision ID: add_outbox_messages
+Revises: add_marketplace_metrics
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_outbox_messages'
+down_revision = 'add_marketplace_metrics'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'outbox_messages' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(10), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('claim_token', sa.String(36), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_messages_status_available_at', 'outbox_messages', ['status', 'available_at'])
+    op.create_index('ix_outbox_messages_claim_token', 'outbox_messages', ['claim_token'])
+
+def downgrade():
+    op.drop_index('ix_outbox_messages_claim_token', table_name='outbox_messages')
+    op.drop_index('ix_outbox_messages_status_available_at', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
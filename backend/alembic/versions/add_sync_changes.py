@@ -0,0 +1,62 @@
+"""add sync change log
+
+Revision ID: add_sync_changes
+Revises: add_outbox_messages
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_sync_changes'
+down_revision = 'add_outbox_messages'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'sync_changes' in inspector.get_table_names():
+        return
+
+    op.add_column('users', sa.Column('sync_version', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'sync_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('changed_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'entity', 'entity_id', name='uq_sync_changes_user_entity')
+    )
+    op.create_index('ix_sync_changes_user_version', 'sync_changes', ['user_id', 'version'])
+
+    # Existing records become each user's first versions, so a client syncing
+    # from scratch receives everything
+    op.execute("""
+        INSERT INTO sync_changes (user_id, entity, entity_id, version, deleted, changed_at)
+        SELECT user_id, entity, entity_id,
+               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY entity, entity_id),
+               FALSE, CURRENT_TIMESTAMP
+        FROM (
+            SELECT id AS user_id, 'settings' AS entity, id AS entity_id FROM users
+            UNION ALL
+            SELECT user_id, 'code', id FROM betting_codes WHERE user_id IS NOT NULL
+            UNION ALL
+            SELECT user_id, 'payment', id FROM payments WHERE user_id IS NOT NULL
+        ) AS records
+    """)
+    op.execute("""
+        UPDATE users SET sync_version = (
+            SELECT COALESCE(MAX(version), 0) FROM sync_changes WHERE sync_changes.user_id = users.id
+        )
+    """)
+
+def downgrade():
+    op.drop_index('ix_sync_changes_user_version', table_name='sync_changes')
+    op.drop_table('sync_changes')
+    op.drop_column('users', 'sync_version')
@@ -0,0 +1,20 @@
+"""merge marketplace migration heads
+
+Revision ID: merge_marketplace_heads
+Revises: add_fields_to_code_purchase, create_admin_table, merge_country_heads
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'merge_marketplace_heads'
+down_revision = ('add_fields_to_code_purchase', 'create_admin_table', 'merge_country_heads')
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    pass
+
+def downgrade():
+    pass
@@ -2,8 +2,9 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from app.db.base import Base
+from app.db.engine import get_engine
 import logging
 
 # Configure logging
@@ -11,7 +12,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create admin engine
-admin_engine = create_engine(settings.ADMIN_DATABASE_URL)
+admin_engine = get_engine(settings.ADMIN_DATABASE_URL, "admin")
 
 app = FastAPI(
     title="Kilcode Admin API",
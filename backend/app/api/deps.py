@@ -7,8 +7,10 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, ReadSessionLocal
 from app.db.admin_session import AdminSessionLocal
+from app.db import routing
+from app.core.principals import principal_cache
 from app.models.admin import Admin
 import logging
 
@@ -25,6 +27,14 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def get_read_db() -> Generator:
+    """Session for read-only endpoints, routed to a read replica when one is caught up"""
+    try:
+        db = ReadSessionLocal()
+        yield db
+    finally:
+        db.close()
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
@@ -47,9 +57,13 @@ def get_current_user(
             detail="Could not validate credentials",
         )
         
-    user = crud.user.get(db, id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = principal_cache.get(models.User, user_id)
+    if user is None:
+        user = crud.user.get(db, id=user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.put(user)
+    routing.set_principal(f"user:{user.id}")
     return user
 
 def get_current_active_user(
@@ -113,9 +127,13 @@ def get_current_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate admin credentials",
         )
-    admin = crud.admin.get(db, id=token_data.sub)
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
+    admin = principal_cache.get(Admin, token_data.sub)
+    if admin is None:
+        admin = crud.admin.get(db, id=token_data.sub)
+        if not admin:
+            raise HTTPException(status_code=404, detail="Admin not found")
+        principal_cache.put(admin)
     if not admin.is_active:
         raise HTTPException(status_code=400, detail="Inactive admin")
+    routing.set_principal(f"admin:{admin.id}")
     return admin 
\ No newline at end of file
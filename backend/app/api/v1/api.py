@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 from typing import List, Literal, Optional, Dict, Any
@@ -7,6 +8,7 @@ import logging
 from app.core.auth import get_current_user
 from app.schemas.user import User
 from app.core.security import create_access_token
+from app.api.v1 import sync
 from app.api.v1.endpoints import (
     auth, payments, betting_codes, admin_dashboard, admin_auth,
     admin_statistics, admin_betting, admin_users,
@@ -16,12 +18,14 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
 from app.models.transaction import Transaction
-from app.schemas.transaction import TransactionListResponse, Transaction as TransactionSchema
+from app.schemas.transaction import TransactionListResponse
+from app.core.serialization import serialize_transaction, serialize_many, orjson_response
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-api_router = APIRouter()
+# Every included router inherits orjson encoding
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include the auth router
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -75,6 +79,9 @@ api_router.include_router(
     tags=["code-analyzer"]
 )
 
+# Include the delta sync router
+api_router.include_router(sync.router, tags=["sync"])
+
 # Create models for our requests
 class UserRegister(BaseModel):
     name: str
@@ -126,14 +133,6 @@ class NotificationBase(BaseModel):
     read: bool
     created_at: datetime
 
-class SyncRequest(BaseModel):
-    lastSync: str
-    version: str
-
-class SyncResponse(BaseModel):
-    updates: List[Dict[str, Any]]
-    newVersion: str
-
 # For development, you can make the auth optional
 async def get_optional_user(request: Request) -> Optional[User]:
     try:
@@ -204,12 +203,16 @@ def validate_betting_code(code: str, bookmaker: str, country: str) -> bool:
         
     return bool(re.match(patterns[bookmaker], code, re.IGNORECASE)) 
 
-@api_router.get("/transactions", response_model=TransactionListResponse)
+@api_router.get("/transactions", responses={200: {"model": TransactionListResponse}})
 async def get_transactions(
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user transactions and current balance"""
+    """
+    Get user transactions and current balance:
+    {"transactions": [...], "balance": float}, shaped like TransactionListResponse.
+    The body is serialized directly, so it is documented but not validated against it.
+    """
     try:
         # Get user with fresh balance
         user = db.query(User).filter(User.id == current_user.id).first()
@@ -239,13 +242,10 @@ async def get_transactions(
             db.commit()
             db.refresh(user)
 
-        # Convert transactions to Pydantic models
-        transaction_schemas = [TransactionSchema.model_validate(t) for t in transactions]
-
-        return TransactionListResponse(
-            balance=user.balance,
-            transactions=transaction_schemas
-        )
+        return orjson_response({
+            "transactions": serialize_many(serialize_transaction, transactions),
+            "balance": user.balance
+        })
 
     except Exception as e:
         logger.error(f"Error getting transactions: {str(e)}")
@@ -307,56 +307,4 @@ async def get_updates(current_user: User = Depends(get_optional_user)) -> Dict[s
             # Add any pending notifications or updates from your database here
         ]
     
-    return {"updates": updates} 
-
-@api_router.post("/sync", response_model=SyncResponse)
-async def sync_data(
-    sync_request: SyncRequest,
-    current_user: User = Depends(get_current_user)
-):
-    try:
-        # Convert lastSync from timestamp string to datetime
-        last_sync_dt = datetime.fromtimestamp(int(sync_request.lastSync) / 1000)
-        
-        updates = []
-        
-        # Add mock updates for testing
-        updates.extend([
-            {
-                "type": "CODE_STATUS",
-                "code": "B9J-123456-ABCD",
-                "status": "verified",
-                "updated_at": datetime.now().timestamp() * 1000,
-                "message": "Code verified successfully"
-            },
-            {
-                "type": "PAYMENT_STATUS",
-                "reference": "TRX-123456",
-                "status": "completed",
-                "updated_at": datetime.now().timestamp() * 1000,
-                "amount": 5000
-            },
-            {
-                "type": "USER_SETTINGS",
-                "settings": {
-                    "notifications_enabled": True,
-                    "language": "en",
-                    "timezone": "Africa/Lagos"
-                },
-                "updated_at": datetime.now().timestamp() * 1000
-            }
-        ])
-
-        # Generate new version (increment current version)
-        new_version = str(int(sync_request.version) + 1)
-
-        return SyncResponse(
-            updates=updates,
-            newVersion=new_version
-        )
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to sync data: {str(e)}"
-        ) 
\ No newline at end of file
+    return {"updates": updates}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Any
 import logging
@@ -7,7 +8,7 @@ from datetime import timedelta
 
 from app.schemas.token import TokenResponse
 from app.schemas.admin import AdminLogin, AdminCreate, Admin, AdminResponse
-from app.db.admin_session import get_admin_db
+from app.db.admin_session import get_admin_db, get_async_admin_db
 from app.core.security import security_manager
 from app.core.config import settings
 from app.core.auth import get_current_admin
@@ -43,7 +44,7 @@ async def verify_token(
         )
 
 @router.post("/register", response_model=Admin)
-async def register_admin(
+def register_admin(
     *,
     db: Session = Depends(get_admin_db),
     admin_in: AdminCreate,
@@ -81,7 +82,7 @@ async def register_admin(
 @router.post("/login", response_model=AdminResponse)
 async def admin_login(
     *,
-    db: Session = Depends(get_admin_db),
+    db: AsyncSession = Depends(get_async_admin_db),
     form_data: AdminLogin,
 ) -> Any:
     """
@@ -90,7 +91,7 @@ async def admin_login(
     try:
         logger.info(f"Admin login attempt for email: {form_data.email}")
         
-        admin = crud.admin.authenticate(
+        admin = await crud.admin.authenticate_async(
             db, 
             email=form_data.email, 
             password=form_data.password
@@ -252,22 +252,25 @@ async def bulk_verify_codes(
         ).all()
         
         # Update all codes
+        admin_note = note or f"Bulk verification: {status}"
         for code in codes:
             code.status = status
             code.verified_by = current_admin.id
-            code.admin_note = note or f"Bulk verification: {status}"
+            code.admin_note = admin_note
             code.verified_at = func.now()
-            
-            # Notify user through WebSocket
-            await manager.notify_code_verification(
-                user.email,
-                code.id,
-                status,
-                note or f"Bulk verification: {status}"
-            )
+        code_ids = [code.id for code in codes]
+        user_email = user.email
         
         db.commit()
         
+        # Notify user through WebSocket (the manager sends these as one batch)
+        for code_id in code_ids:
+            await manager.notify_code_verification(user_email, {
+                "code_id": code_id,
+                "status": status,
+                "note": admin_note
+            })
+        
         return {
             "message": f"Successfully verified {len(codes)} codes",
             "verified_count": len(codes)
@@ -1,72 +1,77 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func, case, and_
 from typing import List
-from ....db.session import get_db
+from ....db.session import get_db, get_read_db
 from ....core.security import get_current_admin
 from ....models.betting_code import BettingCode
 from ....models.user import User
 from ....models.admin import Admin
 from ....models.payment import Payment
 from ....models.transaction import Transaction
+from ....core.singleflight import coalesced_query
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _country_statistics(db: Session, country: str) -> dict:
+    """User and betting code counts for one country"""
+    # User statistics - only for this admin's country
+    total_users = db.query(User).filter(
+        func.lower(User.country) == country
+    ).count() or 0
+    logger.info(f"Total users: {total_users}")
+    
+    # Active users
+    active_users = db.query(User).filter(
+        func.lower(User.country) == country,
+        User.is_active == True
+    ).count() or 0
+    
+    # Verified users
+    verified_users = db.query(User).filter(
+        func.lower(User.country) == country,
+        User.is_verified == True
+    ).count() or 0
+    
+    # Betting code statistics
+    betting_stats = db.query(
+        func.count(BettingCode.id).label('total_codes'),
+        func.sum(case((BettingCode.status == 'pending', 1), else_=0)).label('pending_codes'),
+        func.sum(case((BettingCode.status == 'won', 1), else_=0)).label('won_codes'),
+        func.sum(case((BettingCode.status == 'lost', 1), else_=0)).label('lost_codes')
+    ).join(User, isouter=True).filter(
+        func.lower(User.country) == country
+    ).first()
+    logger.info(f"Betting stats: {betting_stats}")
+
+    return {
+        "country": country.upper(),
+        "users": {
+            "total": total_users,
+            "active": active_users,
+            "verified": verified_users
+        },
+        "betting": {
+            "total_codes": betting_stats.total_codes if betting_stats else 0,
+            "pending_codes": betting_stats.pending_codes if betting_stats else 0,
+            "won_codes": betting_stats.won_codes if betting_stats else 0,
+            "lost_codes": betting_stats.lost_codes if betting_stats else 0
+        }
+    }
+
 @router.get("/statistics")
 async def get_statistics(
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get country-specific statistics"""
     try:
         country = current_admin.country.lower()
         logger.info(f"Getting statistics for country: {country}")
         
-        # User statistics - only for this admin's country
-        total_users = db.query(User).filter(
-            func.lower(User.country) == country
-        ).count() or 0
-        logger.info(f"Total users: {total_users}")
-        
-        # Active users
-        active_users = db.query(User).filter(
-            func.lower(User.country) == country,
-            User.is_active == True
-        ).count() or 0
-        
-        # Verified users
-        verified_users = db.query(User).filter(
-            func.lower(User.country) == country,
-            User.is_verified == True
-        ).count() or 0
-        
-        # Betting code statistics
-        betting_stats = db.query(
-            func.count(BettingCode.id).label('total_codes'),
-            func.sum(case((BettingCode.status == 'pending', 1), else_=0)).label('pending_codes'),
-            func.sum(case((BettingCode.status == 'won', 1), else_=0)).label('won_codes'),
-            func.sum(case((BettingCode.status == 'lost', 1), else_=0)).label('lost_codes')
-        ).join(User, isouter=True).filter(
-            func.lower(User.country) == country
-        ).first()
-        logger.info(f"Betting stats: {betting_stats}")
-
-        response = {
-            "country": country.upper(),
-            "users": {
-                "total": total_users,
-                "active": active_users,
-                "verified": verified_users
-            },
-            "betting": {
-                "total_codes": betting_stats.total_codes if betting_stats else 0,
-                "pending_codes": betting_stats.pending_codes if betting_stats else 0,
-                "won_codes": betting_stats.won_codes if betting_stats else 0,
-                "lost_codes": betting_stats.lost_codes if betting_stats else 0
-            }
-        }
+        # Admins of the same country opening the dashboard together share one computation
+        response = await coalesced_query(("admin-statistics", country), _country_statistics, country)
         logger.info(f"Returning statistics: {response}")
         return response
         
@@ -80,14 +85,16 @@ async def get_statistics(
 @router.get("/pending-verifications")
 async def get_pending_verifications(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get pending betting code verifications for admin's country"""
     try:
         country = current_admin.country.lower()
         logger.info(f"Getting pending verifications for country: {country}")
         
-        pending_codes = db.query(BettingCode).join(User).filter(
+        pending_codes = db.query(BettingCode).join(User).options(
+            contains_eager(BettingCode.user)
+        ).filter(
             func.lower(User.country) == country,
             BettingCode.status == 'pending'
         ).all()
@@ -122,7 +129,7 @@ async def get_pending_verifications(
 @router.get("/pending-payments")
 async def get_pending_payments(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get pending registration payments for admin's country"""
     try:
@@ -2,17 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Dict
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, and_
 import logging
 
 from ....core.auth import get_current_admin
 from ....core.database import get_db
+from ....db.session import get_read_db
 from ....core.websocket_manager import manager
 from ....models.payment import Payment
 from ....models.user import User
 from ....schemas.payment import PaymentResponse, PaymentVerification
 from ....models.transaction import Transaction
 from ....models.admin import Admin
+from ....utils.aggregation import aggregate, count_if, sum_if
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -69,7 +71,7 @@ async def get_pending_withdrawals(
 @router.get("/statistics")
 async def get_payment_statistics(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get payment statistics for admin's country"""
     try:
@@ -78,39 +80,28 @@ async def get_payment_statistics(
         
         # Get payments from the last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        # Base query for withdrawals in admin's country
-        base_query = db.query(Payment).join(User).filter(
-            func.lower(User.country) == country,
-            Payment.type == 'withdrawal',
-            Payment.created_at >= thirty_days_ago
+        recent = Payment.created_at >= thirty_days_ago
+        
+        # One pass over the country's withdrawals: status counts cover the last
+        # 30 days, the approved total covers all time
+        stats = aggregate(
+            db.query(Payment).join(User).filter(
+                func.lower(User.country) == country,
+                Payment.type == 'withdrawal'
+            ),
+            total_payments=count_if(recent),
+            pending_payments=count_if(and_(recent, Payment.status == 'pending')),
+            approved_payments=count_if(and_(recent, Payment.status == 'approved')),
+            rejected_payments=count_if(and_(recent, Payment.status == 'rejected')),
+            total_amount=sum_if(Payment.amount, Payment.status == 'approved')
         )
         
-        # Get total payments
-        total_payments = base_query.count()
-        
-        # Get pending payments
-        pending_payments = base_query.filter(Payment.status == 'pending').count()
-        
-        # Get approved payments
-        approved_payments = base_query.filter(Payment.status == 'approved').count()
-        
-        # Get rejected payments
-        rejected_payments = base_query.filter(Payment.status == 'rejected').count()
-        
-        # Get total amount
-        total_amount = db.query(func.sum(Payment.amount)).select_from(Payment).join(User).filter(
-            func.lower(User.country) == country,
-            Payment.type == 'withdrawal',
-            Payment.status == 'approved'
-        ).scalar() or 0
-        
         return {
-            "totalPayments": total_payments,
-            "pendingPayments": pending_payments,
-            "approvedPayments": approved_payments,
-            "rejectedPayments": rejected_payments,
-            "totalAmount": float(total_amount)
+            "totalPayments": stats["total_payments"],
+            "pendingPayments": stats["pending_payments"],
+            "approvedPayments": stats["approved_payments"],
+            "rejectedPayments": stats["rejected_payments"],
+            "totalAmount": float(stats["total_amount"] or 0)
         }
         
     except Exception as e:
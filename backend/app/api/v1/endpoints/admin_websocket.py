@@ -22,13 +22,15 @@ async def admin_websocket(
             return
 
         # Connect admin to their country's WebSocket
-        await manager.connect_admin(websocket, country.lower())
+        connection = await manager.connect_admin(websocket, country.lower())
         
         try:
             while True:
                 # Keep connection alive and handle messages
                 data = await websocket.receive_json()
                 logger.debug(f"Received message from {country} admin: {data}")
+                # Keeps the connection from being swept as idle; answers PINGs
+                connection.received(data)
                 
                 # Handle admin acknowledgments
                 if data.get("type") == "ACK":
@@ -36,6 +38,7 @@ async def admin_websocket(
                 
         except Exception as e:
             logger.error(f"WebSocket error for admin {admin.id}: {str(e)}")
+            await manager.disconnect_admin(websocket, country.lower())
             
     except Exception as e:
         logger.error(f"Failed to establish WebSocket connection: {str(e)}")
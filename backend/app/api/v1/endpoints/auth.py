@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Any
 import logging
@@ -9,6 +10,7 @@ from app.schemas.user import User, UserCreate
 from app.api import deps
 from app.core import security
 from app.core.auth import get_current_user
+from app.db.session import get_async_db
 from app import crud
 from app.models.user import User as UserModel
 from app.services.paystack import paystack
@@ -93,14 +95,14 @@ def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     user_data: UserLogin,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Login for access token.
     """
     try:
         logger.info(f"Login attempt for email: {user_data.email}")
-        user = crud.user.authenticate(
+        user = await crud.user.authenticate_async(
             db, email=user_data.email, password=user_data.password
         )
         if not user:
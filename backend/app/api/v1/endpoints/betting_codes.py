@@ -242,7 +242,7 @@ async def get_pending_codes(
 @router.get("/admin/dashboard/statistics")
 async def get_dashboard_statistics(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_admin: Admin = Depends(deps.get_current_admin)
 ):
     """Get dashboard statistics for admin"""
@@ -290,7 +290,7 @@ async def get_dashboard_statistics(
 @router.get("/admin/dashboard/pending-verifications")
 async def get_pending_verifications(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_admin: Admin = Depends(deps.get_current_admin)
 ):
     """Get pending betting code verifications for admin"""
@@ -302,7 +302,7 @@ async def get_pending_verifications(
 @router.get("/admin/dashboard/pending-payments")
 async def get_pending_payments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_admin: Admin = Depends(deps.get_current_admin)
 ):
     """Get pending registration payments for admin"""
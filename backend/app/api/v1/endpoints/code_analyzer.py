@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional, Dict
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, get_async_read_db
 from app.core.auth import get_current_admin
 from app.models.admin import Admin
 from app.models.betting_code import BettingCode
@@ -15,13 +16,43 @@ from sqlalchemy import func
 from app.models.code_view import CodeView
 from app.models.code_purchase import CodePurchase
 from app.models.code_rating import CodeRating
-from sqlalchemy import or_
+from app.models.code_stats import CodeStats
+from app.services.code_stats_service import CodeStatsService
+from app.services.trending_service import trending_engine, TRENDING_TIMEFRAMES
+from sqlalchemy import or_, select
 from sqlalchemy import case, and_
+from app.core.search import apply_search, apply_search_async
+from app.utils.pagination import COUNT_MODES, decode_cursor, apply_keyset, count_rows_async, next_cursor
+from app.core.serialization import serialize_betting_code, serialize_many, orjson_response
+from app.core.cache import cache, cached_response
+from app.core.singleflight import coalesced_query
+from app.utils.aggregation import aggregate, aggregate_sets, count_if
+from app.models.marketplace_metric import MarketplaceMetric
+from app.services.metrics_rollup_service import MetricsRollup
+from app.services import outbox_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Columns that cursor pagination can seek on (always paired with id)
+KEYSET_SORT_COLUMNS = ('created_at', 'price', 'win_probability', 'expected_odds', 'valid_until')
+
+# Cached marketplace listings of a country; invalidated whenever a listing changes
+MARKETPLACE_CACHE_TAG = "marketplace:{country}"
+
+def admin_cache_params(kwargs: Dict) -> Dict:
+    """Cache key params for responses that depend on the admin's country"""
+    return {**kwargs, "admin_country": kwargs["current_admin"].country.lower()}
+
+def avg_rating_expr():
+    """Average rating from the code_stats rollup (0 for codes without ratings)"""
+    return func.coalesce(CodeStats.rating_sum / func.nullif(CodeStats.rating_count, 0), 0)
+
+def purchase_count_expr():
+    return func.coalesce(CodeStats.purchase_count, 0)
+
 @router.get("/countries")
+@cached_response("countries", cache_type="countries")
 async def get_available_countries():
     """Get list of available countries with their configurations"""
     try:
@@ -60,13 +91,13 @@ async def get_pending_analyses(
         # Get allowed bookmakers for this country
         allowed_bookmakers = [b["id"] for b in country_config["bookmakers"]]
         
-        codes = db.query(BettingCode).filter(
+        codes = db.query(BettingCode).options(*BettingCode.list_options()).filter(
             BettingCode.analysis_status == "pending",
             BettingCode.user_country == country,
             BettingCode.bookmaker.in_(allowed_bookmakers)
         ).all()
         
-        return [code.to_dict() for code in codes]
+        return orjson_response(serialize_many(serialize_betting_code, codes))
     except Exception as e:
         logger.error(f"Error fetching pending analyses: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching pending analyses")
@@ -272,6 +303,7 @@ async def publish_to_marketplace(
         code.marketplace_status = 'active' if marketplace_data.get('isPublished') else 'draft'
         
         db.commit()
+        await cache.invalidate(MARKETPLACE_CACHE_TAG.format(country=country))
         return code.to_dict()
     except HTTPException as e:
         raise e
@@ -281,8 +313,9 @@ async def publish_to_marketplace(
         raise HTTPException(status_code=500, detail="Error publishing to marketplace")
 
 @router.get("/marketplace-codes")
+@cached_response("marketplace-codes", cache_type="marketplace_codes", tags=(MARKETPLACE_CACHE_TAG,))
 async def get_marketplace_codes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     country: Optional[str] = None,
     page: int = 1,
     limit: int = 12,
@@ -297,9 +330,16 @@ async def get_marketplace_codes(
     sort_by: Optional[str] = None,
     sort_direction: str = "desc",
     filter: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    pagination: str = "page",
+    count: Optional[str] = None
 ):
-    """Get marketplace codes with advanced filtering"""
+    """
+    Get marketplace codes with advanced filtering.
+    Pass pagination=cursor (or a cursor from a previous response) for keyset paging;
+    count=exact|estimate|none controls how the total is computed.
+    """
     try:
         if not country:
             raise HTTPException(status_code=400, detail="Country is required")
@@ -308,8 +348,9 @@ async def get_marketplace_codes(
         if country not in ['nigeria', 'ghana']:
             raise HTTPException(status_code=400, detail="Invalid country")
 
-        # Base query with required filters
-        query = db.query(BettingCode).filter(
+        # Base query with required filters (runs on the async session, so the
+        # event loop keeps serving other requests while the database works)
+        query = select(BettingCode).filter(
             BettingCode.user_country == country,
             BettingCode.is_published == True,
             BettingCode.marketplace_status == 'active',
@@ -341,48 +382,91 @@ async def get_marketplace_codes(
             query = query.filter(BettingCode.created_at >= start_date)
         if end_date:
             query = query.filter(BettingCode.created_at <= end_date)
+        search_rank = None
         if search:
-            search_filter = or_(
-                BettingCode.title.ilike(f"%{search}%"),
-                BettingCode.description.ilike(f"%{search}%"),
-                BettingCode.bookmaker.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            query, search_rank = await apply_search_async(db, query, search)
             
+        use_cursor = bool(cursor) or pagination == "cursor"
+        count_mode = count or ("none" if use_cursor else "exact")
+        if count_mode not in COUNT_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid count mode. Must be one of: {', '.join(COUNT_MODES)}")
+
+        if use_cursor:
+            limit = max(1, min(limit, 100))
+            position = decode_cursor(cursor) if cursor else None
+            if position:
+                # The cursor pins the ordering it was issued for
+                sort_by = position['sort_by']
+                sort_direction = position['direction']
+            sort_by = sort_by or 'created_at'
+            if sort_by not in KEYSET_SORT_COLUMNS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cursor pagination supports sort_by: {', '.join(KEYSET_SORT_COLUMNS)}"
+                )
+            direction = "asc" if sort_direction == "asc" else "desc"
+
+            total, total_is_estimate = await count_rows_async(db, query, count_mode)
+
+            query = apply_keyset(
+                query.options(*BettingCode.list_options()),
+                getattr(BettingCode, sort_by),
+                BettingCode.id,
+                direction,
+                position
+            )
+            rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+            codes, cursor_out = next_cursor(rows, limit, sort_by, direction)
+
+            logger.info(f"Returning {len(codes)} codes for country {country} (cursor mode)")
+
+            return orjson_response({
+                "items": serialize_many(serialize_betting_code, codes),
+                "total": total,
+                "total_is_estimate": total_is_estimate,
+                "limit": limit,
+                "next_cursor": cursor_out,
+                "has_more": cursor_out is not None,
+                "success": True
+            })
+
         # Get total count before pagination
-        total = query.count()
+        total, total_is_estimate = await count_rows_async(db, query, count_mode)
         
         logger.info(f"Found {total} codes for country {country}")
             
-        # Apply sorting
-        if sort_by:
+        # Apply sorting, with id as a tiebreaker so pages don't overlap
+        if sort_by == "relevance" and search_rank is not None:
+            query = query.order_by(search_rank.desc(), BettingCode.id.desc())
+        elif sort_by:
             sort_column = getattr(BettingCode, sort_by, BettingCode.created_at)
             if sort_direction == "desc":
-                query = query.order_by(sort_column.desc())
+                query = query.order_by(sort_column.desc(), BettingCode.id.desc())
             else:
-                query = query.order_by(sort_column.asc())
+                query = query.order_by(sort_column.asc(), BettingCode.id.asc())
         else:
-            # Default sort by created_at desc
-            query = query.order_by(BettingCode.created_at.desc())
+            # Default sort by created_at desc (matches ix_betting_codes_marketplace_live)
+            query = query.order_by(BettingCode.created_at.desc().nulls_last(), BettingCode.id.desc())
         
         # Apply pagination
         offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+        query = query.options(*BettingCode.list_options()).offset(offset).limit(limit)
         
         # Get paginated results
-        codes = query.all()
+        codes = (await db.execute(query)).scalars().all()
         
         # Log the results
         logger.info(f"Returning {len(codes)} codes for page {page}")
         
         # Return formatted response
-        return {
-            "items": [code.to_dict() for code in codes],
+        return orjson_response({
+            "items": serialize_many(serialize_betting_code, codes),
             "total": total,
+            "total_is_estimate": total_is_estimate,
             "page": page,
             "limit": limit,
             "success": True
-        }
+        })
     except HTTPException as e:
         logger.error(f"HTTP Exception in get_marketplace_codes: {str(e)}")
         raise e
@@ -390,6 +474,30 @@ async def get_marketplace_codes(
         logger.error(f"Error fetching marketplace codes: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching marketplace codes")
 
+@router.post("/marketplace-codes/{code_id}/view")
+async def record_code_view(
+    code_id: int,
+    db: Session = Depends(get_db)
+):
+    """Record a marketplace listing view"""
+    try:
+        code = db.query(BettingCode.id).filter(
+            BettingCode.id == code_id,
+            BettingCode.is_published == True
+        ).first()
+        if not code:
+            raise HTTPException(status_code=404, detail="Code not found")
+
+        CodeStatsService.record_view(db, code_id)
+        db.commit()
+        return {"success": True}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error recording code view: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error recording code view")
+
 @router.put("/marketplace-status/{code_id}")
 async def update_marketplace_status(
     code_id: int,
@@ -417,6 +525,7 @@ async def update_marketplace_status(
             code.is_published = False
             
         db.commit()
+        await cache.invalidate(MARKETPLACE_CACHE_TAG.format(country=country))
         return code.to_dict()
     except HTTPException as e:
         raise e
@@ -426,6 +535,7 @@ async def update_marketplace_status(
         raise HTTPException(status_code=500, detail="Error updating marketplace status")
 
 @router.get("/country-config/{country}")
+@cached_response("country-config", cache_type="country_config", vary=admin_cache_params)
 async def get_country_config_endpoint(
     country: str,
     current_admin: Admin = Depends(get_current_admin)
@@ -456,7 +566,7 @@ async def get_country_config_endpoint(
 @router.get("/submitted-codes")
 async def get_submitted_codes(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     min_odds: Optional[float] = None,
     max_odds: Optional[float] = None,
     bookmaker: Optional[str] = None,
@@ -474,7 +584,10 @@ async def get_submitted_codes(
         allowed_bookmakers = [b["id"] for b in country_config["bookmakers"]]
         
         # Get all submitted codes that haven't been analyzed yet
-        query = db.query(BettingCode).join(BettingCode.user).filter(
+        query = db.query(BettingCode).join(BettingCode.user).options(
+            contains_eager(BettingCode.user),
+            *BettingCode.list_options()
+        ).filter(
             BettingCode.user.has(country=country),  # User's country matches admin's country
             BettingCode.bookmaker.in_(allowed_bookmakers),
             BettingCode.status == 'pending',  # Only pending codes
@@ -511,8 +624,8 @@ async def get_submitted_codes(
         codes = query.all()
         
         # Return detailed code information
-        return [{
-            **code.to_dict(),
+        return orjson_response([{
+            **serialize_betting_code(code),
             'description': code.description or 'No description available',
             'bookmaker_name': next(
                 (b['name'] for b in country_config['bookmakers'] if b['id'] == code.bookmaker),
@@ -522,68 +635,61 @@ async def get_submitted_codes(
             'country_name': country_config.get('name', country.upper()),
             'currency': country_config['currency']['code'],
             'currency_symbol': country_config['currency']['symbol']
-        } for code in codes]
+        } for code in codes])
         
     except Exception as e:
         logger.error(f"Error fetching submitted codes: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching submitted codes")
 
+def _marketplace_stats(db: Session, country: str) -> dict:
+    """Listing, revenue and win-rate totals for one country, in one round trip"""
+    country_codes = db.query(BettingCode).filter(BettingCode.user_country == country)
+
+    stats = aggregate_sets(
+        db,
+        (
+            country_codes,
+            {
+                "active_listings": count_if(and_(
+                    BettingCode.marketplace_status == 'active',
+                    BettingCode.valid_until > datetime.utcnow()
+                )),
+                "won_codes": count_if(BettingCode.status == 'won'),
+                "total_sold": count_if(BettingCode.marketplace_status == 'sold'),
+                "total_published": count_if(BettingCode.marketplace_status == 'active')
+            }
+        ),
+        # One-to-many tables get their own scan so they cannot repeat code rows
+        (
+            country_codes.join(CodeStats, CodeStats.code_id == BettingCode.id),
+            {"total_revenue": func.coalesce(func.sum(CodeStats.revenue), 0)}
+        ),
+        (
+            country_codes.join(CodeAnalysis, CodeAnalysis.betting_code_id == BettingCode.id),
+            {"total_analyzed": func.count(CodeAnalysis.id)}
+        )
+    )
+
+    total_sold = stats["total_sold"]
+    avg_win_rate = (stats["won_codes"] / total_sold * 100) if total_sold > 0 else 0
+    
+    return {
+        "active_listings": stats["active_listings"],
+        "total_revenue": float(stats["total_revenue"]),
+        "avg_win_rate": round(avg_win_rate, 2),
+        "total_analyzed": stats["total_analyzed"],
+        "total_published": stats["total_published"]
+    }
+
 @router.get("/marketplace/stats")
 async def get_marketplace_stats(
-    current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: Admin = Depends(get_current_admin)
 ):
     """Get marketplace statistics for the admin's country"""
     try:
         country = current_admin.country.lower()
-        
-        # Get total active listings
-        active_listings = db.query(BettingCode).filter(
-            BettingCode.marketplace_status == 'active',
-            BettingCode.valid_until > datetime.utcnow(),
-            BettingCode.user_country == country
-        ).count()
-        
-        # Get total revenue
-        total_revenue = db.query(func.sum(CodePurchase.amount)).join(
-            BettingCode, CodePurchase.code_id == BettingCode.id
-        ).filter(
-            BettingCode.user_country == country
-        ).scalar() or 0
-        
-        # Get average win rate
-        won_codes = db.query(BettingCode).filter(
-            BettingCode.status == 'won',
-            BettingCode.user_country == country
-        ).count()
-        
-        total_sold = db.query(BettingCode).filter(
-            BettingCode.marketplace_status == 'sold',
-            BettingCode.user_country == country
-        ).count()
-        
-        avg_win_rate = (won_codes / total_sold * 100) if total_sold > 0 else 0
-        
-        # Get total analyzed codes for the country
-        total_analyzed = db.query(CodeAnalysis).join(
-            BettingCode, CodeAnalysis.betting_code_id == BettingCode.id
-        ).filter(
-            BettingCode.user_country == country
-        ).count()
-        
-        # Get total published codes for the country
-        total_published = db.query(BettingCode).filter(
-            BettingCode.marketplace_status == 'active',
-            BettingCode.user_country == country
-        ).count()
-        
-        return {
-            "active_listings": active_listings,
-            "total_revenue": float(total_revenue),
-            "avg_win_rate": round(avg_win_rate, 2),
-            "total_analyzed": total_analyzed,
-            "total_published": total_published
-        }
+        # Admins of the same country opening the dashboard together share one computation
+        return await coalesced_query(("marketplace-stats", country), _marketplace_stats, country)
     except Exception as e:
         logger.error(f"Error fetching marketplace stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching marketplace statistics")
@@ -592,7 +698,7 @@ async def get_marketplace_stats(
 async def get_marketplace_analytics(
     timeframe: str = "7d",
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get detailed marketplace analytics for the specified timeframe"""
     try:
@@ -609,31 +715,25 @@ async def get_marketplace_analytics(
         else:
             raise HTTPException(status_code=400, detail="Invalid timeframe")
             
-        # Get analytics data
+        # Summed from the metrics rollup: at most a few dozen hourly or daily buckets
+        totals = aggregate(
+            MetricsRollup.window(db, country, start_date),
+            sales=func.coalesce(func.sum(MarketplaceMetric.sales), 0),
+            revenue=func.coalesce(func.sum(MarketplaceMetric.revenue), 0),
+            new_listings=func.coalesce(func.sum(MarketplaceMetric.new_listings), 0),
+            price_sum=func.sum(MarketplaceMetric.listing_price_sum),
+            price_count=func.sum(MarketplaceMetric.listing_price_count),
+            min_price=func.min(MarketplaceMetric.listing_price_min),
+            max_price=func.max(MarketplaceMetric.listing_price_max)
+        )
+
         analytics = {
-            "sales": db.query(BettingCode).filter(
-                BettingCode.user_country == country,
-                BettingCode.marketplace_status == 'sold',
-                BettingCode.updated_at >= start_date
-            ).count(),
-            
-            "revenue": float(db.query(func.sum(BettingCode.price)).filter(
-                BettingCode.user_country == country,
-                BettingCode.marketplace_status == 'sold',
-                BettingCode.updated_at >= start_date
-            ).scalar() or 0),
-            
-            "new_listings": db.query(BettingCode).filter(
-                BettingCode.user_country == country,
-                BettingCode.is_published == True,
-                BettingCode.created_at >= start_date
-            ).count(),
-            
-            "avg_price": float(db.query(func.avg(BettingCode.price)).filter(
-                BettingCode.user_country == country,
-                BettingCode.is_published == True,
-                BettingCode.created_at >= start_date
-            ).scalar() or 0)
+            "sales": totals["sales"],
+            "revenue": float(totals["revenue"]),
+            "new_listings": totals["new_listings"],
+            "avg_price": float(totals["price_sum"] / totals["price_count"]) if totals["price_count"] else 0.0,
+            "min_price": float(totals["min_price"] or 0),
+            "max_price": float(totals["max_price"] or 0)
         }
         
         return analytics
@@ -670,6 +770,7 @@ async def validate_code(
         raise HTTPException(status_code=500, detail="Error validating code")
 
 @router.get("/marketplace/categories")
+@cached_response("marketplace-categories", cache_type="country_config", vary=admin_cache_params)
 async def get_marketplace_categories(
     current_admin: Admin = Depends(get_current_admin)
 ):
@@ -690,7 +791,7 @@ async def get_marketplace_categories(
 async def get_code_analytics(
     code_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get detailed analytics for a specific code"""
     try:
@@ -703,27 +804,14 @@ async def get_code_analytics(
         if code.user_country.lower() != country:
             raise HTTPException(status_code=403, detail="Cannot access codes from other countries")
             
-        # Get code analytics
+        # Get code analytics from the rollup row
+        stats = db.query(CodeStats).filter(CodeStats.code_id == code_id).first()
         analytics = {
-            "views": db.query(func.count(CodeView.id)).filter(
-                CodeView.code_id == code_id
-            ).scalar(),
-            
-            "purchases": db.query(func.count(CodePurchase.id)).filter(
-                CodePurchase.code_id == code_id
-            ).scalar(),
-            
-            "revenue": float(db.query(func.sum(CodePurchase.amount)).filter(
-                CodePurchase.code_id == code_id
-            ).scalar() or 0),
-            
-            "average_rating": float(db.query(func.avg(CodeRating.rating)).filter(
-                CodeRating.code_id == code_id
-            ).scalar() or 0),
-            
-            "total_ratings": db.query(CodeRating).filter(
-                CodeRating.code_id == code_id
-            ).count()
+            "views": stats.view_count if stats else 0,
+            "purchases": stats.purchase_count if stats else 0,
+            "revenue": float(stats.revenue) if stats else 0.0,
+            "average_rating": float(stats.avg_rating) if stats else 0.0,
+            "total_ratings": stats.rating_count if stats else 0
         }
         
         return analytics
@@ -736,65 +824,54 @@ async def get_code_analytics(
 @router.get("/marketplace/trending")
 async def get_trending_codes(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     timeframe: str = "7d"
 ):
-    """Get trending codes based on views, purchases, and ratings"""
+    """Get trending codes ranked by time-decayed views, purchases and ratings"""
     try:
         country = current_admin.country.lower()
         
-        # Calculate start date based on timeframe
-        now = datetime.utcnow()
-        if timeframe == "24h":
-            start_date = now - timedelta(days=1)
-        elif timeframe == "7d":
-            start_date = now - timedelta(days=7)
-        elif timeframe == "30d":
-            start_date = now - timedelta(days=30)
-        else:
+        if timeframe not in TRENDING_TIMEFRAMES:
             raise HTTPException(status_code=400, detail="Invalid timeframe")
         
-        # Get codes with their stats
-        trending_codes = (
+        # Ranking comes from the in-memory trending engine; only the top rows hit the DB
+        trending_engine.ensure_fresh(db)
+        ranked = trending_engine.top(country, timeframe, limit=10)
+        if not ranked:
+            return []
+        
+        scores = dict(ranked)
+        rows = (
             db.query(
                 BettingCode,
-                func.count(CodeView.id).label('view_count'),
-                func.count(CodePurchase.id).label('purchase_count'),
-                func.avg(CodeRating.rating).label('avg_rating')
+                CodeStats.view_count,
+                CodeStats.purchase_count,
+                avg_rating_expr().label('avg_rating')
             )
-            .outerjoin(CodeView, CodeView.code_id == BettingCode.id)
-            .outerjoin(CodePurchase, CodePurchase.code_id == BettingCode.id)
-            .outerjoin(CodeRating, CodeRating.code_id == BettingCode.id)
+            .outerjoin(CodeStats, CodeStats.code_id == BettingCode.id)
+            .options(*BettingCode.list_options())
             .filter(
-                BettingCode.user_country == country,
+                BettingCode.id.in_(scores),
                 BettingCode.is_published == True,
                 BettingCode.marketplace_status == 'active',
-                BettingCode.valid_until > datetime.utcnow(),
-                or_(
-                    CodeView.viewed_at >= start_date,
-                    CodePurchase.purchased_at >= start_date,
-                    CodeRating.created_at >= start_date
-                )
-            )
-            .group_by(BettingCode.id)
-            .order_by(
-                (func.count(CodeView.id) * 0.3 +
-                 func.count(CodePurchase.id) * 0.5 +
-                 func.coalesce(func.avg(CodeRating.rating), 0) * 0.2).desc()
+                BettingCode.valid_until > datetime.utcnow()
             )
-            .limit(10)
             .all()
         )
+        rows.sort(key=lambda row: scores[row[0].id], reverse=True)
         
-        return [{
-            **code.to_dict(),
+        return orjson_response([{
+            **serialize_betting_code(code),
             'stats': {
-                'views': view_count,
-                'purchases': purchase_count,
-                'rating': float(avg_rating) if avg_rating else 0
+                'views': view_count or 0,
+                'purchases': purchase_count or 0,
+                'rating': float(avg_rating) if avg_rating else 0,
+                'trending_score': round(scores[code.id], 4)
             }
-        } for code, view_count, purchase_count, avg_rating in trending_codes]
+        } for code, view_count, purchase_count, avg_rating in rows])
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error fetching trending codes: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching trending codes")
@@ -803,7 +880,7 @@ async def get_trending_codes(
 async def search_marketplace_codes(
     query: str,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     min_rating: Optional[float] = None,
     min_win_rate: Optional[float] = None,
     category: Optional[str] = None,
@@ -817,11 +894,11 @@ async def search_marketplace_codes(
         base_query = (
             db.query(
                 BettingCode,
-                func.avg(CodeRating.rating).label('avg_rating'),
-                func.count(CodePurchase.id).label('purchase_count')
+                avg_rating_expr().label('avg_rating'),
+                purchase_count_expr().label('purchase_count')
             )
-            .outerjoin(CodeRating, CodeRating.code_id == BettingCode.id)
-            .outerjoin(CodePurchase, CodePurchase.code_id == BettingCode.id)
+            .outerjoin(CodeStats, CodeStats.code_id == BettingCode.id)
+            .options(*BettingCode.list_options())
             .filter(
                 BettingCode.user_country == country,
                 BettingCode.is_published == True,
@@ -830,18 +907,14 @@ async def search_marketplace_codes(
             )
         )
         
-        # Apply text search
+        # Apply full-text search (title, description, bookmaker and tags)
+        search_rank = None
         if query:
-            search_filter = or_(
-                BettingCode.title.ilike(f"%{query}%"),
-                BettingCode.description.ilike(f"%{query}%"),
-                BettingCode.tags.contains([query])
-            )
-            base_query = base_query.filter(search_filter)
+            base_query, search_rank = apply_search(db, base_query, query)
         
         # Apply filters
         if min_rating:
-            base_query = base_query.having(func.avg(CodeRating.rating) >= min_rating)
+            base_query = base_query.filter(avg_rating_expr() >= min_rating)
         
         if min_win_rate:
             base_query = base_query.filter(BettingCode.win_probability >= min_win_rate)
@@ -849,30 +922,30 @@ async def search_marketplace_codes(
         if category:
             base_query = base_query.filter(BettingCode.category == category)
         
-        # Group by
-        base_query = base_query.group_by(BettingCode.id)
-        
         # Apply sorting
         if sort_by == "rating":
-            base_query = base_query.order_by(func.avg(CodeRating.rating).desc())
+            base_query = base_query.order_by(avg_rating_expr().desc())
         elif sort_by == "popularity":
-            base_query = base_query.order_by(func.count(CodePurchase.id).desc())
+            base_query = base_query.order_by(purchase_count_expr().desc())
         elif sort_by == "price":
             base_query = base_query.order_by(BettingCode.price.asc())
         elif sort_by == "win_probability":
             base_query = base_query.order_by(BettingCode.win_probability.desc())
+        elif search_rank is not None:
+            # Best matches first when no explicit sort is requested
+            base_query = base_query.order_by(search_rank.desc(), BettingCode.created_at.desc())
         else:
             base_query = base_query.order_by(BettingCode.created_at.desc())
         
         results = base_query.all()
         
-        return [{
-            **code.to_dict(),
+        return orjson_response([{
+            **serialize_betting_code(code),
             'stats': {
                 'rating': float(avg_rating) if avg_rating else 0,
                 'purchases': purchase_count
             }
-        } for code, avg_rating, purchase_count in results]
+        } for code, avg_rating, purchase_count in results])
         
     except Exception as e:
         logger.error(f"Error searching marketplace codes: {str(e)}")
@@ -910,6 +983,7 @@ async def rate_code(
         
         if existing_rating:
             # Update existing rating
+            CodeStatsService.record_rating(db, code_id, rating, previous=existing_rating.rating)
             existing_rating.rating = rating
             existing_rating.comment = comment
             existing_rating.updated_at = datetime.utcnow()
@@ -922,6 +996,7 @@ async def rate_code(
                 comment=comment
             )
             db.add(new_rating)
+            CodeStatsService.record_rating(db, code_id, rating)
         
         db.commit()
         return {"message": "Rating submitted successfully"}
@@ -937,7 +1012,7 @@ async def rate_code(
 async def get_code_ratings(
     code_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 10
 ):
@@ -982,7 +1057,7 @@ async def get_code_ratings(
 @router.get("/marketplace/recommendations")
 async def get_code_recommendations(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     category: Optional[str] = None,
     min_success_rate: float = 0.7,
     max_price: Optional[float] = None
@@ -991,18 +1066,30 @@ async def get_code_recommendations(
     try:
         country = current_admin.country.lower()
         
+        # Win/total per code, aggregated on its own so it doesn't fan out against the stats
+        analysis_summary = (
+            db.query(
+                CodeAnalysis.betting_code_id.label('code_id'),
+                func.sum(case((CodeAnalysis.status == 'won', 1), else_=0)).label('wins'),
+                func.count(CodeAnalysis.id).label('total_analyzed')
+            )
+            .group_by(CodeAnalysis.betting_code_id)
+            .subquery()
+        )
+        success_rate = analysis_summary.c.wins * 1.0 / analysis_summary.c.total_analyzed
+
         # Base query for active marketplace codes
         base_query = (
             db.query(
                 BettingCode,
-                func.avg(CodeRating.rating).label('avg_rating'),
-                func.count(CodePurchase.id).label('purchase_count'),
-                func.sum(case((CodeAnalysis.status == 'won', 1), else_=0)).label('wins'),
-                func.count(CodeAnalysis.id).label('total_analyzed')
+                avg_rating_expr().label('avg_rating'),
+                purchase_count_expr().label('purchase_count'),
+                analysis_summary.c.wins,
+                analysis_summary.c.total_analyzed
             )
-            .outerjoin(CodeRating, CodeRating.code_id == BettingCode.id)
-            .outerjoin(CodePurchase, CodePurchase.code_id == BettingCode.id)
-            .outerjoin(CodeAnalysis, CodeAnalysis.betting_code_id == BettingCode.id)
+            .join(analysis_summary, analysis_summary.c.code_id == BettingCode.id)
+            .outerjoin(CodeStats, CodeStats.code_id == BettingCode.id)
+            .options(*BettingCode.list_options())
             .filter(
                 BettingCode.user_country == country,
                 BettingCode.is_published == True,
@@ -1023,40 +1110,96 @@ async def get_code_recommendations(
             except (ValueError, TypeError):
                 pass  # Skip invalid price values
         
-        # Group and calculate success rate
+        # Filter and order by success rate (the inner join already requires analyses)
         recommendations = (
-            base_query.group_by(BettingCode.id)
-            .having(
-                and_(
-                    func.count(CodeAnalysis.id) > 0,  # Must have analyses
-                    func.sum(case((CodeAnalysis.status == 'won', 1), else_=0)) / func.count(CodeAnalysis.id) >= min_success_rate
-                )
-            )
+            base_query.filter(success_rate >= min_success_rate)
             .order_by(
-                (func.sum(case((CodeAnalysis.status == 'won', 1), else_=0)) / func.count(CodeAnalysis.id)).desc(),
-                func.avg(CodeRating.rating).desc()
+                success_rate.desc(),
+                avg_rating_expr().desc()
             )
             .limit(10)
             .all()
         )
         
-        return [{
-            **code.to_dict(),
+        return orjson_response([{
+            **serialize_betting_code(code),
             'stats': {
                 'rating': float(avg_rating) if avg_rating else 0,
                 'purchases': purchase_count,
                 'success_rate': (wins / total_analyzed * 100) if total_analyzed > 0 else 0
             }
-        } for code, avg_rating, purchase_count, wins, total_analyzed in recommendations]
+        } for code, avg_rating, purchase_count, wins, total_analyzed in recommendations])
         
     except Exception as e:
         logger.error(f"Error fetching code recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching code recommendations")
 
+def _marketplace_performance(db: Session, country: str, start_date: datetime) -> dict:
+    """Revenue, success rates and popular categories for the performance dashboard"""
+    # Get performance metrics
+    performance = {
+        "revenue": {
+            "total": 0,
+            "by_category": {}
+        },
+        "success_rates": {
+            "overall": 0,
+            "by_category": {}
+        },
+        "popular_categories": [],
+        "price_performance": {
+            "optimal_range": None,
+            "by_range": []
+        }
+    }
+    
+    try:
+        # One grouped pass over the country's daily metrics buckets in the timeframe
+        by_category = (
+            MetricsRollup.window(db, country, start_date)
+            .with_entities(
+                MarketplaceMetric.category,
+                func.sum(MarketplaceMetric.revenue),
+                func.sum(MarketplaceMetric.sales),
+                func.sum(MarketplaceMetric.codes_created),
+                func.sum(MarketplaceMetric.codes_won)
+            )
+            .group_by(MarketplaceMetric.category)
+            .all()
+        )
+    except Exception as e:
+        logger.error(f"Error reading marketplace metrics: {str(e)}")
+        return performance
+
+    # '' is the rollup's bucket for codes without a category
+    categorized = [row for row in by_category if row[0]]
+
+    performance["revenue"]["total"] = float(sum(revenue for _, revenue, _, _, _ in by_category))
+    performance["revenue"]["by_category"] = {
+        cat: float(revenue) for cat, revenue, sales, _, _ in categorized if sales
+    }
+
+    total_codes = sum(created for _, _, _, created, _ in by_category)
+    total_wins = sum(wins for _, _, _, _, wins in by_category)
+    performance["success_rates"]["overall"] = (
+        (total_wins / total_codes * 100) if total_codes > 0 else 0
+    )
+    performance["success_rates"]["by_category"] = {
+        cat: (wins / created * 100) if created > 0 else 0
+        for cat, _, _, created, wins in categorized if created
+    }
+
+    popular = sorted((row for row in categorized if row[2]), key=lambda row: row[2], reverse=True)[:5]
+    performance["popular_categories"] = [
+        {"category": cat, "purchases": sales}
+        for cat, _, sales, _, _ in popular
+    ]
+    
+    return performance
+
 @router.get("/marketplace/performance")
 async def get_marketplace_performance(
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
     timeframe: str = "30d"
 ):
     """Get detailed marketplace performance metrics"""
@@ -1074,96 +1217,13 @@ async def get_marketplace_performance(
         else:
             raise HTTPException(status_code=400, detail="Invalid timeframe")
         
-        # Get performance metrics
-        performance = {
-            "revenue": {
-                "total": 0,
-                "by_category": {}
-            },
-            "success_rates": {
-                "overall": 0,
-                "by_category": {}
-            },
-            "popular_categories": [],
-            "price_performance": {
-                "optimal_range": None,
-                "by_range": []
-            }
-        }
-        
-        try:
-            # Get total revenue
-            total_revenue = db.query(func.sum(CodePurchase.amount)).scalar() or 0
-            performance["revenue"]["total"] = float(total_revenue)
-        except Exception as e:
-            logger.error(f"Error getting total revenue: {str(e)}")
-        
-        try:
-            # Get revenue by category
-            category_revenue = (
-                db.query(
-                    BettingCode.category,
-                    func.sum(CodePurchase.amount).label('revenue')
-                )
-                .join(CodePurchase, CodePurchase.code_id == BettingCode.id)
-                .group_by(BettingCode.category)
-                .all()
-            )
-            
-            performance["revenue"]["by_category"] = {
-                cat: float(rev) for cat, rev in category_revenue if cat is not None
-            }
-        except Exception as e:
-            logger.error(f"Error getting category revenue: {str(e)}")
-        
-        try:
-            # Calculate success rates
-            success_rates = (
-                db.query(
-                    BettingCode.category,
-                    func.count(BettingCode.id).label('total'),
-                    func.sum(case((BettingCode.status == 'won', 1), else_=0)).label('wins')
-                )
-                .group_by(BettingCode.category)
-                .all()
-            )
-            
-            total_codes = sum(total for _, total, _ in success_rates)
-            total_wins = sum(wins for _, _, wins in success_rates)
-            
-            performance["success_rates"]["overall"] = (
-                (total_wins / total_codes * 100) if total_codes > 0 else 0
-            )
-            
-            performance["success_rates"]["by_category"] = {
-                cat: (wins / total * 100) if total > 0 else 0
-                for cat, total, wins in success_rates if cat is not None
-            }
-        except Exception as e:
-            logger.error(f"Error calculating success rates: {str(e)}")
-        
-        try:
-            # Get popular categories
-            popular_categories = (
-                db.query(
-                    BettingCode.category,
-                    func.count(CodePurchase.id).label('purchases')
-                )
-                .join(CodePurchase, CodePurchase.code_id == BettingCode.id)
-                .group_by(BettingCode.category)
-                .order_by(func.count(CodePurchase.id).desc())
-                .limit(5)
-                .all()
-            )
-            
-            performance["popular_categories"] = [
-                {"category": cat, "purchases": purchases}
-                for cat, purchases in popular_categories if cat is not None
-            ]
-        except Exception as e:
-            logger.error(f"Error getting popular categories: {str(e)}")
-        
-        return performance
+        # Admins requesting the same country and timeframe share one computation
+        return await coalesced_query(
+            ("marketplace-performance", country, timeframe),
+            _marketplace_performance,
+            country,
+            start_date
+        )
         
     except Exception as e:
         logger.error(f"Error fetching marketplace performance: {str(e)}")
@@ -1173,7 +1233,7 @@ async def get_marketplace_performance(
 async def get_similar_codes(
     code_id: int,
     current_admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = 5
 ):
     """Get similar codes based on category, success rate, and price range"""
@@ -1196,11 +1256,11 @@ async def get_similar_codes(
         similar_codes = (
             db.query(
                 BettingCode,
-                func.avg(CodeRating.rating).label('avg_rating'),
-                func.count(CodePurchase.id).label('purchase_count')
+                avg_rating_expr().label('avg_rating'),
+                purchase_count_expr().label('purchase_count')
             )
-            .outerjoin(CodeRating, CodeRating.code_id == BettingCode.id)
-            .outerjoin(CodePurchase, CodePurchase.code_id == BettingCode.id)
+            .outerjoin(CodeStats, CodeStats.code_id == BettingCode.id)
+            .options(*BettingCode.list_options())
             .filter(
                 BettingCode.id != code_id,
                 BettingCode.user_country == country,
@@ -1209,22 +1269,21 @@ async def get_similar_codes(
                 BettingCode.category == code.category,
                 BettingCode.price.between(min_price, max_price)
             )
-            .group_by(BettingCode.id)
             .order_by(
                 func.abs(BettingCode.win_probability - code.win_probability),
-                func.avg(CodeRating.rating).desc()
+                avg_rating_expr().desc()
             )
             .limit(limit)
             .all()
         )
         
-        return [{
-            **code.to_dict(),
+        return orjson_response([{
+            **serialize_betting_code(code),
             'stats': {
                 'rating': float(avg_rating) if avg_rating else 0,
                 'purchases': purchase_count
             }
-        } for code, avg_rating, purchase_count in similar_codes]
+        } for code, avg_rating, purchase_count in similar_codes])
         
     except HTTPException as e:
         raise e
@@ -1320,6 +1379,7 @@ async def admin_upload_to_marketplace(
             db.add(code)
             db.commit()
             db.refresh(code)
+            await cache.invalidate(MARKETPLACE_CACHE_TAG.format(country=country))
             
             # Return the code with all necessary fields
             return {
@@ -1404,12 +1464,39 @@ async def verify_payment(
             )
             
             db.add(purchase)
+            CodeStatsService.record_purchase(db, purchase)
             
             # Update code status
             code.marketplace_status = 'sold'
+
+            # Format code details for the response and the buyer's email
+            code_details = {
+                'code': code.code,
+                'bookmaker': code.bookmaker,
+                'win_probability': code.win_probability,
+                'expected_odds': code.expected_odds,
+                'valid_until': code.valid_until.isoformat() if code.valid_until else None,
+                'category': code.category,
+                'title': code.title,
+                'description': code.description,
+                'market_data': code.market_data,
+                'price': code.price,
+                'min_stake': code.min_stake,
+                'tags': code.tags,
+                'issuer': code.issuer,
+                'issuer_type': code.issuer_type,
+                'marketplace_status': code.marketplace_status,
+                'analysis_status': code.analysis_status,
+                'user_country': code.user_country,
+                'email': email  # Include buyer's email
+            }
+
+            # Sent by the outbox worker once the purchase is committed
+            outbox_service.enqueue(db, "purchase_email", {"to_email": email, "code_details": code_details})
             
             db.commit()
             print(f"Purchase record created for code {code_id}")
+            await cache.invalidate(MARKETPLACE_CACHE_TAG.format(country=(code.user_country or country).lower()))
 
         except Exception as e:
             db.rollback()
@@ -1419,28 +1506,6 @@ async def verify_payment(
                 detail="Error saving purchase record"
             )
 
-        # Format code details for email
-        code_details = {
-            'code': code.code,
-            'bookmaker': code.bookmaker,
-            'win_probability': code.win_probability,
-            'expected_odds': code.expected_odds,
-            'valid_until': code.valid_until.isoformat() if code.valid_until else None,
-            'category': code.category,
-            'title': code.title,
-            'description': code.description,
-            'market_data': code.market_data,
-            'price': code.price,
-            'min_stake': code.min_stake,
-            'tags': code.tags,
-            'issuer': code.issuer,
-            'issuer_type': code.issuer_type,
-            'marketplace_status': code.marketplace_status,
-            'analysis_status': code.analysis_status,
-            'user_country': code.user_country,
-            'email': email  # Include buyer's email
-        }
-
         print(f"Returning code details for {code_id}")
         
         # Return success with code data
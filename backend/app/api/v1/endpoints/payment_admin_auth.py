@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
 import logging
 from datetime import timedelta
 
 from app.schemas.token import TokenResponse
 from app.schemas.admin import AdminLogin, Admin, AdminResponse
-from app.db.admin_session import get_admin_db
+from app.db.admin_session import get_async_admin_db
 from app.core.security import security_manager
 from app.core.config import settings
 from app.core.auth import get_current_admin
@@ -42,7 +42,7 @@ async def get_payment_admin_info(
 @router.post("/login", response_model=AdminResponse)
 async def payment_admin_login(
     *,
-    db: Session = Depends(get_admin_db),
+    db: AsyncSession = Depends(get_async_admin_db),
     form_data: AdminLogin,
 ) -> Any:
     """
@@ -51,7 +51,7 @@ async def payment_admin_login(
     try:
         logger.info(f"Payment admin login attempt for email: {form_data.email}")
         
-        admin = crud.admin.authenticate(
+        admin = await crud.admin.authenticate_async(
             db, 
             email=form_data.email, 
             password=form_data.password
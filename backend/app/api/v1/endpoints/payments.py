@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Optional, Any
 from datetime import datetime
 import logging
 
 from ....core.auth import get_current_user
-from ....core.database import get_db
+from ....db.session import get_async_db
 from ....core.websocket_manager import manager
 from ....models.user import User
 from ....models.payment import Payment
@@ -38,7 +39,7 @@ PAYMENT_CONFIG = {
 async def process_paystack_payment(
     payment: Payment,
     current_user,
-    db: Session
+    db: AsyncSession
 ) -> PaymentResponse:
     try:
         # Get country-specific configuration
@@ -61,8 +62,8 @@ async def process_paystack_payment(
         payment.reference = payment_result["reference"]
         payment.status = "pending"
         db.add(payment)
-        db.commit()
-        db.refresh(payment)
+        await db.commit()
+        await db.refresh(payment)
 
         # Create activity record
         await activity_service.create_activity(
@@ -95,7 +96,7 @@ async def process_paystack_payment(
     except Exception as e:
         payment.status = "failed"
         db.add(payment)
-        db.commit()
+        await db.commit()
         
         # Log failed payment attempt
         await activity_service.create_activity(
@@ -119,7 +120,7 @@ async def process_paystack_payment(
 @router.post("/registration", response_model=PaymentResponse)
 async def initiate_registration_payment(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Initiate registration payment"""
     try:
@@ -134,11 +135,13 @@ async def initiate_registration_payment(
             )
         
         # Check for pending payments
-        pending_payment = db.query(Payment).filter(
-            Payment.user_id == current_user.id,
-            Payment.type == "registration",
-            Payment.status == "pending"
-        ).first()
+        pending_payment = (await db.execute(
+            select(Payment).where(
+                Payment.user_id == current_user.id,
+                Payment.type == "registration",
+                Payment.status == "pending"
+            )
+        )).scalars().first()
         
         if pending_payment:
             return await process_paystack_payment(pending_payment, current_user, db)
@@ -154,8 +157,8 @@ async def initiate_registration_payment(
         )
         
         db.add(payment)
-        db.commit()
-        db.refresh(payment)
+        await db.commit()
+        await db.refresh(payment)
         
         return await process_paystack_payment(payment, current_user, db)
         
@@ -169,7 +172,7 @@ async def initiate_registration_payment(
 async def verify_payment(
     verification: PaymentVerification,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Verify Paystack payment"""
     try:
@@ -177,10 +180,12 @@ async def verify_payment(
         payment_data = await paystack_service.verify_payment(verification.reference)
         
         # Get payment record
-        payment = db.query(Payment).filter(
-            Payment.reference == verification.reference,
-            Payment.user_id == current_user.id
-        ).first()
+        payment = (await db.execute(
+            select(Payment).where(
+                Payment.reference == verification.reference,
+                Payment.user_id == current_user.id
+            )
+        )).scalars().first()
         
         if not payment:
             raise HTTPException(
@@ -227,7 +232,7 @@ async def verify_payment(
         
         db.add(payment)
         db.add(current_user)
-        db.commit()
+        await db.commit()
         
         return {
             "status": "success",
@@ -259,7 +264,7 @@ async def check_payment_health():
 @router.post("/test-flow")
 async def test_payment_flow(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test the complete payment flow"""
     return await paystack_service.test_payment_flow(
@@ -291,13 +296,13 @@ async def get_payment_analytics(
 async def get_payment_receipt(
     reference: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate receipt for a payment"""
     # Get payment record
-    payment = db.query(Payment).filter(
-        Payment.reference == reference
-    ).first()
+    payment = (await db.execute(
+        select(Payment).where(Payment.reference == reference)
+    )).scalars().first()
     
     if not payment:
         raise HTTPException(
@@ -322,13 +327,13 @@ async def get_payment_receipt(
 async def retry_payment(
     reference: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Retry a failed payment"""
     # Get payment record
-    payment = db.query(Payment).filter(
-        Payment.reference == reference
-    ).first()
+    payment = (await db.execute(
+        select(Payment).where(Payment.reference == reference)
+    )).scalars().first()
     
     if not payment:
         raise HTTPException(
@@ -372,7 +377,7 @@ async def run_payment_tests(
 async def initiate_payment(
     payment_data: PaymentInitiation,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Initiate a withdrawal payment"""
     try:
@@ -414,8 +419,9 @@ async def initiate_payment(
                     detail=f"Invalid phone number format. Must be {country_config['phone_length']} digits"
                 )
 
-        # Check user balance
-        if payment_data.amount > current_user.balance:
+        # Check user balance (read fresh: current_user may be a cached snapshot)
+        balance = (await db.execute(select(User.balance).where(User.id == current_user.id))).scalar_one()
+        if payment_data.amount > balance:
             raise HTTPException(
                 status_code=422,
                 detail="Insufficient balance"
@@ -434,8 +440,8 @@ async def initiate_payment(
         )
         
         db.add(payment)
-        db.commit()
-        db.refresh(payment)
+        await db.commit()
+        await db.refresh(payment)
 
         # Create transaction record
         transaction = Transaction(
@@ -450,7 +456,7 @@ async def initiate_payment(
         )
 
         db.add(transaction)
-        db.commit()
+        await db.commit()
 
         # Notify country admin about new withdrawal request
         await manager.notify_country_admin(
@@ -491,14 +497,16 @@ async def verify_payment(
     payment_id: int,
     verification: PaymentVerification,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Verify a payment status"""
     try:
-        payment = db.query(Payment).filter(
-            Payment.id == payment_id,
-            Payment.user_id == current_user.id
-        ).first()
+        payment = (await db.execute(
+            select(Payment).where(
+                Payment.id == payment_id,
+                Payment.user_id == current_user.id
+            )
+        )).scalars().first()
 
         if not payment:
             raise HTTPException(
@@ -507,10 +515,12 @@ async def verify_payment(
             )
 
         # Get associated transaction
-        transaction = db.query(Transaction).filter(
-            Transaction.payment_reference == payment.reference,
-            Transaction.user_id == current_user.id
-        ).first()
+        transaction = (await db.execute(
+            select(Transaction).where(
+                Transaction.payment_reference == payment.reference,
+                Transaction.user_id == current_user.id
+            )
+        )).scalars().first()
 
         if not transaction:
             raise HTTPException(
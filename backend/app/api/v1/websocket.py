@@ -1,6 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
 from app.core.auth import get_current_user_ws, get_current_admin_ws
-from app.core.websocket_manager import ConnectionManager
+from app.core.websocket_manager import manager
 from app.models.user import User
 from app.models.admin import Admin
 from typing import Optional
@@ -11,9 +11,6 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize WebSocket manager
-manager = ConnectionManager()
-
 @router.websocket("/ws/admin/{country}")
 async def websocket_endpoint(websocket: WebSocket, country: str, token: Optional[str] = None):
     """WebSocket endpoint for real-time betting code updates"""
@@ -36,16 +33,17 @@ async def websocket_endpoint(websocket: WebSocket, country: str, token: Optional
         
         # Register connection with manager
         logger.info(f"Admin {admin.email} connected to country: {country}")
-        await manager.connect_admin(websocket, country)
+        connection = await manager.connect_admin(websocket, country.lower())
         
         try:
             while True:
                 data = await websocket.receive_text()
-                # Handle received data if needed
+                # Keeps the connection from being swept as idle; answers PINGs
+                connection.received(data)
                 
         except WebSocketDisconnect:
             logger.info(f"Admin {admin.email} disconnected from country: {country}")
-            await manager.disconnect_admin(websocket, country)
+            await manager.disconnect_admin(websocket, country.lower())
                 
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
@@ -92,11 +90,12 @@ async def user_websocket_endpoint(websocket: WebSocket, token: Optional[str] = N
             
         # Connect user with country
         try:
-            await manager.connect(websocket, f"{user.email}", user_country)
+            connection = await manager.connect(websocket, f"{user.email}", user_country, aliases=(user.id,))
             
             while True:
                 data = await websocket.receive_text()
-                # Handle received data if needed
+                # Keeps the connection from being swept as idle; answers PINGs
+                connection.received(data)
                 
         except WebSocketDisconnect:
             logger.info(f"User {user.email} disconnected from {user_country}")
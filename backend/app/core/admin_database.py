@@ -1,25 +1,15 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from ..db.base_class import Base
 from .admin_config import admin_settings
+from ..db.engine import get_engine
 from dotenv import load_dotenv
 
 load_dotenv()
 
 ADMIN_DATABASE_URL = admin_settings.ADMIN_DATABASE_URL
 
-# Create engine with proper configuration
-if ADMIN_DATABASE_URL.startswith("sqlite"):
-    admin_engine = create_engine(
-        ADMIN_DATABASE_URL, 
-        connect_args={"check_same_thread": False},
-        pool_pre_ping=True
-    )
-else:
-    admin_engine = create_engine(
-        ADMIN_DATABASE_URL,
-        pool_pre_ping=True
-    )
+# Shared with every other module using this database (see app.db.engine)
+admin_engine = get_engine(ADMIN_DATABASE_URL, "admin")
 
 # Create sessionmaker
 AdminSessionLocal = sessionmaker(
@@ -2,14 +2,15 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
 from typing import Generator, Optional
 import logging
 
 from app import crud, models, schemas
 from app.core.config import settings
-from app.db.session import get_db
-from app.db.admin_session import get_admin_db, AdminSessionLocal
+from app.db.session import get_db, AsyncSessionLocal
+from app.db.admin_session import AdminSessionLocal, AsyncAdminSessionLocal
+from app.db import routing
+from app.core.principals import principal_cache
 from app.models.admin import Admin
 
 logger = logging.getLogger(__name__)
@@ -18,8 +19,7 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
     token: str = Depends(reusable_oauth2)
 ) -> models.User:
     try:
@@ -49,9 +49,17 @@ def get_current_user(
             detail="Could not validate credentials",
         )
         
-    user = crud.user.get(db, id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Cached, or loaded in a session of its own that is closed before returning:
+    # either way the user comes back detached, so handlers can attach it to
+    # whichever session (sync or async) they use
+    user = principal_cache.get(models.User, user_id)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = await crud.user.get_async(db, id=user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.put(user)
+    routing.set_principal(f"user:{user.id}")
     return user
 
 def get_current_active_user(
@@ -61,8 +69,7 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_admin(
-    db: Session = Depends(get_admin_db),
+async def get_current_admin(
     token: str = Depends(reusable_oauth2)
 ) -> Admin:
     """Get current admin for regular routes"""
@@ -84,11 +91,24 @@ def get_current_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate admin credentials",
         )
-    admin = crud.admin.get(db, id=token_data.sub)
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
+    try:
+        # asyncpg does not coerce strings for integer columns
+        admin_id = int(token_data.sub)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate admin credentials",
+        )
+    admin = principal_cache.get(Admin, admin_id)
+    if admin is None:
+        async with AsyncAdminSessionLocal() as db:
+            admin = await crud.admin.get_async(db, id=admin_id)
+        if not admin:
+            raise HTTPException(status_code=404, detail="Admin not found")
+        principal_cache.put(admin)
     if not admin.is_active:
         raise HTTPException(status_code=400, detail="Inactive admin")
+    routing.set_principal(f"admin:{admin.id}")
     return admin
 
 async def get_current_user_ws(token: str) -> Optional[models.User]:
@@ -1,89 +1,431 @@
-from typing import Optional, Any
-import json
-from redis import Redis
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
+from collections import OrderedDict
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import orjson
+import redis.asyncio as aioredis
 from functools import wraps
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
 from ..core.config import settings
+from ..core.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# TTL in seconds per cache type; tag invalidation keeps listings fresh in between
+CACHE_TTL = {
+    'default': 300,
+    'marketplace_codes': 60,
+    'countries': 3600,
+    'country_config': 3600,
+}
+
+# In-process tier TTLs; kept short because a missed invalidation message
+# leaves an entry stale until it expires
+LOCAL_CACHE_TTL = {
+    'default': 30,
+    'marketplace_codes': 15,
+    'countries': 600,
+    'country_config': 600,
+}
+
+# Tag sets outlive every entry they point at and are renewed on each write
+TAG_TTL = 24 * 60 * 60
+
+# Workers publish invalidated tags here so every in-process tier evicts together
+INVALIDATION_CHANNEL = 'cache:invalidate'
+
+# Query params whose value is compared case-insensitively
+CASE_INSENSITIVE_PARAMS = {'country'}
+
+KEY_PREFIX = 'cache'
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the scalar params that identify a response, in canonical form"""
+    normalized = {}
+    for name, value in params.items():
+        if value is None or not isinstance(value, (str, int, float, bool)):
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if name in CASE_INSENSITIVE_PARAMS:
+                value = value.lower()
+        normalized[name] = value
+    return normalized
+
+def build_cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+def tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+class LocalCache:
+    """
+    Bounded in-process LRU with per-entry TTL, indexed by tag.
+    Only touched from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> (value, expires_at, tags)
+        self._tags: Dict[str, set] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            metrics.track_cache_eviction('expired')
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: int, tags: Sequence[str]) -> None:
+        if ttl <= 0 or len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl, tuple(tags))
+        self.size += len(value)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        evicted = 0
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            evicted += 1
+        if evicted:
+            metrics.track_cache_eviction('lru', evicted)
+        metrics.update_cache_local_entries(len(self._entries))
+
+    def invalidate(self, tags: Sequence[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        if removed:
+            metrics.track_cache_eviction('invalidated', removed)
+            metrics.update_cache_local_entries(len(self._entries))
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+        metrics.update_cache_local_entries(0)
+
+    def _remove(self, key: str) -> None:
+        value, _, tags = self._entries.pop(key)
+        self.size -= len(value)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class MemoryCacheBackend:
+    """Process-local backend for development and tests (no Redis needed)"""
 
-class RedisCache:
     def __init__(self):
-        self.redis_client = Redis.from_url(
-            settings.REDIS_URL,
-            decode_responses=True
-        )
-        
-        # Country-specific cache settings
-        self.cache_ttl = {
-            'nigeria': {
-                'betting_codes': 300,  # 5 minutes
-                'transactions': 60,    # 1 minute
-                'user_profile': 600,   # 10 minutes
-                'bookmaker_odds': 30   # 30 seconds
-            },
-            'ghana': {
-                'betting_codes': 300,
-                'transactions': 60,
-                'user_profile': 600,
-                'bookmaker_odds': 30
-            }
-        }
-
-    def get_cache_key(self, key: str, country: str) -> str:
-        return f"{country}:{key}"
-
-    async def get(self, key: str, country: str) -> Optional[Any]:
-        full_key = self.get_cache_key(key, country)
-        data = self.redis_client.get(full_key)
-        return json.loads(data) if data else None
+        self._entries: Dict[str, tuple] = {}
+        self._tags: Dict[str, set] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int, tags: Sequence[str]) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+    async def invalidate(self, tags: Sequence[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                removed += self._entries.pop(key, None) is not None
+        return removed
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        # Single process: there are no other workers to notify
+        pass
+
+    async def listen(self, channel: str) -> AsyncIterator[bytes]:
+        return
+        yield
+
+    async def close(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+class RedisCacheBackend:
+    """
+    Redis backend. Each tag is a set of the keys cached under it, so invalidating
+    a tag deletes exactly the responses that depend on it.
+    Accepts any redis.asyncio-compatible client (e.g. fakeredis.aioredis.FakeRedis).
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        return cls(aioredis.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int, tags: Sequence[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=ttl)
+            for tag in tags:
+                pipe.sadd(tag_key(tag), key)
+                pipe.expire(tag_key(tag), TAG_TTL)
+            await pipe.execute()
+
+    async def invalidate(self, tags: Sequence[str]) -> int:
+        removed = 0
+        for tag in tags:
+            keys = await self.client.smembers(tag_key(tag))
+            if keys:
+                removed += await self.client.delete(*keys)
+            await self.client.delete(tag_key(tag))
+        return removed
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.client.publish(channel, message)
+
+    async def listen(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+class RedisCache:
+    """
+    Two-tier response cache: a bounded in-process LRU in front of Redis (or an
+    in-memory backend when REDIS_URL is not set). Invalidations are published
+    on INVALIDATION_CHANNEL so every worker's local tier evicts the same tags.
+    Cache errors are logged and never fail the request.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.enabled = settings.CACHE_ENABLED
+        self.local = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_MAX_BYTES)
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: set = set()
+        self._subscribers: list = []
+
+    def configure(self, backend) -> None:
+        """Swap the backend, e.g. MemoryCacheBackend() or a fakeredis client in tests"""
+        self.backend = backend
+        self.local.clear()
+
+    def _backend(self):
+        if self.backend is None:
+            if settings.REDIS_URL:
+                self.backend = RedisCacheBackend.from_url(settings.REDIS_URL)
+            else:
+                logger.warning("REDIS_URL is not set, using the in-memory response cache")
+                self.backend = MemoryCacheBackend()
+        return self.backend
+
+    async def get(self, key: str, cache_type: str = 'default', tags: Sequence[str] = ()) -> Optional[bytes]:
+        """
+        Look the key up locally, then remotely. A remote hit is copied into the
+        local tier under the same tags so it can be invalidated there too.
+        """
+        if not self.enabled:
+            return None
+
+        value = self.local.get(key)
+        metrics.track_cache_lookup('local', value is not None)
+        if value is not None:
+            return value
+
+        try:
+            value = await self._backend().get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        metrics.track_cache_lookup('remote', value is not None)
+        if value is not None:
+            self.local.set(key, value, self._local_ttl(cache_type), tags)
+        return value
 
     async def set(
         self,
         key: str,
-        value: Any,
-        country: str,
+        value: bytes,
         cache_type: str = 'default',
-        custom_ttl: Optional[int] = None
-    ):
-        full_key = self.get_cache_key(key, country)
-        ttl = custom_ttl or self.cache_ttl[country].get(cache_type, 300)
-        self.redis_client.setex(
-            full_key,
-            ttl,
-            json.dumps(value)
-        )
-
-    async def delete(self, key: str, country: str):
-        full_key = self.get_cache_key(key, country)
-        self.redis_client.delete(full_key)
+        custom_ttl: Optional[int] = None,
+        tags: Sequence[str] = ()
+    ) -> None:
+        if not self.enabled:
+            return
+        ttl = custom_ttl or CACHE_TTL.get(cache_type, CACHE_TTL['default'])
+        self.local.set(key, value, min(ttl, self._local_ttl(cache_type)), tags)
+        try:
+            await self._backend().set(key, value, ttl, tags)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every cached response stored under any of the tags"""
+        if not self.enabled:
+            return
+        self.local.invalidate(tags)
+        try:
+            removed = await self._backend().invalidate(tags)
+            await self._backend().publish(
+                INVALIDATION_CHANNEL,
+                orjson.dumps({"origin": self.instance_id, "tags": list(tags)})
+            )
+            logger.info(f"Invalidated {removed} cached responses for tags {', '.join(tags)}")
+        except Exception as e:
+            # Entries now live until their TTL runs out
+            logger.error(f"Cache invalidation failed for tags {', '.join(tags)}: {str(e)}")
+
+    def invalidate_threadsafe(self, *tags: str) -> None:
+        """
+        invalidate() for sync code, e.g. ORM event hooks, which may run on the
+        event loop thread or in the threadpool. Fire and forget.
+        """
+        loop = self._loop
+        if not self.enabled or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task = loop.create_task(self.invalidate(*tags))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(self.invalidate(*tags), loop)
+
+    def on_invalidate(self, callback: Callable[[Optional[Sequence[str]]], None]) -> None:
+        """
+        Also call callback(tags) for invalidations published by other workers,
+        and callback(None) when some may have been missed
+        """
+        self._subscribers.append(callback)
+
+    def _local_ttl(self, cache_type: str) -> int:
+        return LOCAL_CACHE_TTL.get(cache_type, LOCAL_CACHE_TTL['default'])
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for data in self._backend().listen(INVALIDATION_CHANNEL):
+                    message = orjson.loads(data)
+                    if message.get("origin") != self.instance_id:
+                        tags = message.get("tags", [])
+                        self.local.invalidate(tags)
+                        for callback in self._subscribers:
+                            callback(tags)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {str(e)}")
+            # Invalidations may have been missed while disconnected
+            self.local.clear()
+            for callback in self._subscribers:
+                callback(None)
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Subscribe to invalidations from other workers on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        if self.enabled and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.local.clear()
+        if self.backend is not None:
+            await self.backend.close()
+            self.backend = None
 
 cache = RedisCache()
 
-def cached_response(cache_type: str = 'default', custom_ttl: Optional[int] = None):
+def response_body(result: Any) -> Optional[bytes]:
+    """Rendered JSON of a successful endpoint result, or None if it must not be cached"""
+    if isinstance(result, Response):
+        if result.status_code != 200 or result.media_type != "application/json":
+            return None
+        return bytes(result.body)
+    return orjson.dumps(jsonable_encoder(result))
+
+def cached_response(
+    namespace: str,
+    cache_type: str = 'default',
+    custom_ttl: Optional[int] = None,
+    tags: Sequence[str] = (),
+    vary: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+):
+    """
+    Cache a JSON endpoint. Apply below the route decorator so dependencies
+    (auth included) still run on every request.
+
+    The key is built from the endpoint's scalar params, or from vary(kwargs)
+    when the response depends on something else (e.g. the admin's country).
+    Tags are formatted with the same params, e.g. "marketplace:{country}".
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Get country from kwargs or default to nigeria
-            country = kwargs.get('country', 'nigeria')
-            
-            # Generate cache key based on function arguments
-            cache_key = f"{func.__name__}:{json.dumps(kwargs)}"
-            
-            # Try to get from cache
-            cached_data = await cache.get(cache_key, country)
+            params = normalize_params(vary(kwargs) if vary else kwargs)
+            cache_key = build_cache_key(namespace, params)
+            try:
+                entry_tags = [tag.format_map(params) for tag in tags]
+            except KeyError:
+                # A param the tags need is missing, so the request is rejected anyway
+                return await func(*args, **kwargs)
+
+            cached_data = await cache.get(cache_key, cache_type, entry_tags)
             if cached_data is not None:
-                return cached_data
-            
-            # Execute function if not cached
+                return Response(content=cached_data, media_type="application/json", headers={"X-Cache": "HIT"})
+
             result = await func(*args, **kwargs)
-            
-            # Cache the result
-            await cache.set(
-                cache_key,
-                result,
-                country,
-                cache_type,
-                custom_ttl
-            )
-            
-            return result
+
+            body = response_body(result)
+            if body is None:
+                return result
+            await cache.set(cache_key, body, cache_type, custom_ttl, entry_tags)
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
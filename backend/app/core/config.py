@@ -20,17 +20,56 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
 
+    # Password hashing (existing hashes are upgraded on login when BCRYPT_ROUNDS changes)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     # Environment
     ENVIRONMENT: str = "development"
 
+    # Database engines (shared by the API, admin and code analyzer servers)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_ECHO: Optional[bool] = None  # defaults to on in development only
+
+    # Read replicas for read-only endpoints (comma-separated URLs; any database works
+    # as a stand-in, e.g. a copy of the SQLite file)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000,http://127.0.0.1:5173,http://127.0.0.1:3000"
 
     # API
     API_V1_STR: str = "/api/v1"
 
-    # WebSocket settings
+    # Cache settings (in-memory cache when REDIS_URL is not set)
+    REDIS_URL: Optional[str] = None
+    CACHE_ENABLED: bool = True
+    LOCAL_CACHE_MAX_ENTRIES: int = 1000
+    LOCAL_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PRINCIPAL_CACHE_TTL: int = 30  # authenticated user/admin snapshots; 0 disables
+
+    # WebSocket settings (broadcasts reach other workers through REDIS_URL pub/sub)
     WS_URL: str = "ws://localhost:8000"
+    # Each connection queues up to WS_SEND_QUEUE_SIZE outgoing messages; when a client
+    # falls further behind, drop_oldest / drop_newest discard messages and disconnect
+    # closes it. A single send taking longer than WS_SEND_TIMEOUT_SECONDS closes it too.
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"
+    # Notification events for the same recipient within WS_BATCH_WINDOW_MS are sent
+    # as one frame of at most WS_BATCH_MAX_EVENTS events
+    WS_BATCH_WINDOW_MS: int = 25
+    WS_BATCH_MAX_EVENTS: int = 1000
+    # Connections silent for WS_HEARTBEAT_INTERVAL_SECONDS are sent a PING; those
+    # silent for WS_IDLE_TIMEOUT_SECONDS are closed
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = 25.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 75.0
 
     # Payment settings
     PAYSTACK_SECRET_KEY: str
@@ -38,6 +77,20 @@ class Settings(BaseSettings):
     PAYSTACK_WEBHOOK_SECRET: Optional[str] = None
     PAYSTACK_BASE_URL: str = "https://api.paystack.co"
 
+    # Outbound HTTP: one keep-alive pool per provider for the app's lifetime
+    # (timeouts in seconds; HTTP/2 also needs the h2 package)
+    HTTP2_ENABLED: bool = True
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 10
+    PAYSTACK_HTTP_TIMEOUT: float = 30.0
+    PAYSTACK_HTTP_MAX_CONNECTIONS: int = 20
+    MTN_MOMO_HTTP_TIMEOUT: float = 30.0
+    MTN_MOMO_HTTP_MAX_CONNECTIONS: int = 10
+    RESEND_HTTP_TIMEOUT: float = 10.0
+    RESEND_HTTP_MAX_CONNECTIONS: int = 10
+
     # Country-specific payment settings
     GHANA_REGISTRATION_FEE: float = 200.00  # GHS
     NIGERIA_REGISTRATION_FEE: float = 21927.00  # NGN
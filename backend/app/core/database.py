@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from ..db.base import Base
 from .config import settings
+from ..db.engine import get_engine
 import logging
 import os
 
@@ -9,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 # Database URLs
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-SQLALCHEMY_ADMIN_DATABASE_URL = "sqlite:///./admin.db"
+SQLALCHEMY_ADMIN_DATABASE_URL = settings.ADMIN_DATABASE_URL
 
 # Ensure the database directories exist for SQLite
 for db_url in [SQLALCHEMY_DATABASE_URL, SQLALCHEMY_ADMIN_DATABASE_URL]:
@@ -22,18 +23,9 @@ for db_url in [SQLALCHEMY_DATABASE_URL, SQLALCHEMY_ADMIN_DATABASE_URL]:
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
 
-# Create engines
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {},
-    echo=True
-)
-
-admin_engine = create_engine(
-    SQLALCHEMY_ADMIN_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
+# Engines come from the shared factory, so pool and timeout settings match the API's
+engine = get_engine(SQLALCHEMY_DATABASE_URL, "main")
+admin_engine = get_engine(SQLALCHEMY_ADMIN_DATABASE_URL, "admin")
 
 # Create SessionLocal classes
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -64,6 +56,11 @@ def init_db():
         # Create tables if they don't exist
         Base.metadata.create_all(bind=engine)
         Base.metadata.create_all(bind=admin_engine)  # Also create admin tables
+
+        # Full-text search index for the marketplace (tsvector on Postgres, FTS5 on SQLite)
+        from app.core.search import install_search_index
+        with engine.begin() as conn:
+            install_search_index(conn)
         
         # Verify databases
         for db_engine in [engine, admin_engine]:
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+import asyncio
+import importlib.util
+import logging
+import httpx
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the h2 package; without it every provider speaks HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    """Timeout (seconds per read/write/pool wait) and connection cap of one provider's pool"""
+    timeout: float
+    max_connections: int
+
+PROVIDERS: Dict[str, ProviderLimits] = {
+    'paystack': ProviderLimits(settings.PAYSTACK_HTTP_TIMEOUT, settings.PAYSTACK_HTTP_MAX_CONNECTIONS),
+    'mtn_momo': ProviderLimits(settings.MTN_MOMO_HTTP_TIMEOUT, settings.MTN_MOMO_HTTP_MAX_CONNECTIONS),
+    'resend': ProviderLimits(settings.RESEND_HTTP_TIMEOUT, settings.RESEND_HTTP_MAX_CONNECTIONS),
+    # Every other payment gateway (Vodafone Cash, AirtelTigo, Zeepay, OPay)
+    'gateways': ProviderLimits(settings.HTTP_TIMEOUT, settings.HTTP_MAX_CONNECTIONS),
+}
+
+class HTTPClients:
+    """
+    One httpx.AsyncClient per external provider for the lifetime of the app, so
+    calls reuse kept-alive (and, with h2 installed, HTTP/2 multiplexed)
+    connections instead of paying TCP and TLS setup each time. Clients are
+    built on first use and closed by close() at shutdown.
+    """
+
+    def __init__(self, providers: Dict[str, ProviderLimits]):
+        self.providers = providers
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        limits = self.providers[provider]
+        http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        logger.info(
+            f"Creating '{provider}' HTTP client ({'HTTP/2' if http2 else 'HTTP/1.1'}, "
+            f"{limits.max_connections} connections, {limits.timeout}s timeout)"
+        )
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(limits.timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_connections,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """The shared client for provider; must be called on the event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pooled connections belong to the loop that opened them
+            self._clients = {}
+            self._loop = loop
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._clients[provider] = self._build(provider)
+        return client
+
+    async def close(self) -> None:
+        """Close every client and its pooled connections"""
+        clients, self._clients = self._clients, {}
+        for provider, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing '{provider}' HTTP client: {str(e)}")
+
+http_clients = HTTPClients(PROVIDERS)
@@ -4,6 +4,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 import time
 from typing import Callable
 from .config import settings
+from ..db import routing
 
 class ErrorHandlerMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable):
@@ -46,3 +47,22 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             self.requests[client_ip] = [current_time]
         
         return await call_next(request)
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Tracks database writes per request for read-replica routing. A request that
+    wrote gets a short-lived cookie that keeps the client's later reads on the
+    primary until the replicas have caught up.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        state = routing.begin_request(pinned=routing.PIN_COOKIE in request.cookies)
+        response = await call_next(request)
+        if state.wrote:
+            response.set_cookie(
+                routing.PIN_COOKIE, "1",
+                max_age=int(routing.READ_YOUR_WRITES_SECONDS) + 1,
+                httponly=True,
+                samesite="lax"
+            )
+        return response
@@ -1,5 +1,5 @@
 from prometheus_client import Counter, Histogram, Gauge
-from typing import Dict
+from typing import Dict, Optional
 import time
 
 class Metrics:
@@ -41,6 +41,164 @@ class Metrics:
             ['country', 'payment_method']
         )
 
+        # Response cache metrics, per tier ('local' LRU or 'remote' Redis)
+        self.cache_lookups = Counter(
+            'cache_lookups_total',
+            'Response cache lookups',
+            ['tier', 'result']
+        )
+
+        self.cache_hit_ratio = Gauge(
+            'cache_hit_ratio',
+            'Response cache hit ratio since process start',
+            ['tier']
+        )
+
+        self.cache_local_entries = Gauge(
+            'cache_local_entries',
+            'Entries held in the in-process cache tier'
+        )
+
+        self.cache_local_evictions = Counter(
+            'cache_local_evictions_total',
+            'Entries dropped from the in-process cache tier',
+            ['reason']
+        )
+
+        self._cache_tallies: Dict[str, list] = {}
+
+        # Requests served by joining an identical in-flight computation
+        self.coalesced_calls = Counter(
+            'coalesced_calls_total',
+            'Calls through a single-flight group',
+            ['group', 'role']
+        )
+
+        # Database connection pools, per engine ('main', 'admin', '<name>_async')
+        self.db_pool_checkout_wait = Histogram(
+            'db_pool_checkout_wait_seconds',
+            'Time to obtain a pooled database connection',
+            ['pool'],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+        )
+
+        self.db_pool_checkout_timeouts = Counter(
+            'db_pool_checkout_timeouts_total',
+            'Checkouts that gave up waiting for a free connection',
+            ['pool']
+        )
+
+        self.db_pool_checked_out = Gauge(
+            'db_pool_checked_out',
+            'Connections currently checked out of the pool',
+            ['pool']
+        )
+
+        self.db_replica_lag = Gauge(
+            'db_replica_lag_seconds',
+            'Replication lag of each read replica (-1 while unreachable)',
+            ['replica']
+        )
+
+        self.db_routed_reads = Counter(
+            'db_routed_reads_total',
+            'Statements of read-only sessions, by where they ran',
+            ['target']
+        )
+
+        # bcrypt pool (see app.core.security.PasswordHasher)
+        self.password_hash_queue = Histogram(
+            'password_hash_queue_seconds',
+            'Time password hashing calls wait for a bcrypt worker',
+            ['operation'],
+            buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+        )
+
+        self.password_hash_duration = Histogram(
+            'password_hash_duration_seconds',
+            'Time spent in bcrypt per call',
+            ['operation'],
+            buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2)
+        )
+
+        self.password_hash_rejected = Counter(
+            'password_hash_rejected_total',
+            'Password hashing calls refused because the bcrypt queue was full',
+            ['operation']
+        )
+
+        self.password_rehashes = Counter(
+            'password_rehashes_total',
+            'Password hashes upgraded to the current parameters on login'
+        )
+
+        # Provider OAuth tokens (see app.services.payments.mtn_momo.TokenManager)
+        self.oauth_token_refreshes = Counter(
+            'oauth_token_refreshes_total',
+            'Access token fetches from payment providers',
+            ['provider', 'mode', 'result']
+        )
+
+        # Transactional outbox (see app.services.outbox_service)
+        self.outbox_messages = Counter(
+            'outbox_messages_total',
+            'Outbox delivery attempts by outcome (sent, retry, failed)',
+            ['kind', 'result']
+        )
+
+        self.outbox_delivery_lag = Histogram(
+            'outbox_delivery_lag_seconds',
+            'Time from enqueueing an outbox message to its delivery',
+            ['kind'],
+            buckets=(0.1, 0.5, 1, 5, 30, 60, 300, 1800, 3600)
+        )
+
+        # WebSocket fan-out (see app.core.websocket_manager.Connection)
+        self.ws_connections = Gauge(
+            'websocket_connections',
+            'Open WebSocket connections on this worker',
+            ['country', 'audience']
+        )
+
+        # Sampled by the connection sweeper; per country rather than per
+        # connection to keep the series count bounded
+        self.ws_queued_messages = Gauge(
+            'websocket_queued_messages',
+            'Messages waiting in the send queues of WebSocket connections',
+            ['country', 'audience']
+        )
+
+        self.ws_max_queue_depth = Gauge(
+            'websocket_max_queue_depth',
+            'Deepest send queue among WebSocket connections',
+            ['country', 'audience']
+        )
+
+        self.ws_messages_dropped = Counter(
+            'websocket_messages_dropped_total',
+            'Messages that did not fit in a connection send queue',
+            ['audience', 'policy']
+        )
+
+        self.ws_disconnects = Counter(
+            'websocket_forced_disconnects_total',
+            'Connections closed by the server',
+            ['audience', 'reason']
+        )
+
+        self.ws_backplane_messages = Counter(
+            'websocket_backplane_messages_total',
+            'Messages exchanged with other workers over the WebSocket backplane',
+            ['audience', 'result']
+        )
+
+        self.ws_batch_size = Histogram(
+            'websocket_batch_events',
+            'Notification events coalesced into one WebSocket frame',
+            ['audience'],
+            buckets=(1, 2, 5, 10, 50, 100, 500, 1000)
+        )
+
     def track_request(self, country: str, endpoint: str):
         self.requests_total.labels(country=country, endpoint=endpoint).inc()
 
@@ -50,6 +208,78 @@ class Metrics:
             endpoint=endpoint
         ).observe(duration)
 
+    def track_cache_lookup(self, tier: str, hit: bool):
+        self.cache_lookups.labels(tier=tier, result='hit' if hit else 'miss').inc()
+        tally = self._cache_tallies.setdefault(tier, [0, 0])
+        tally[0] += hit
+        tally[1] += 1
+        self.cache_hit_ratio.labels(tier=tier).set(tally[0] / tally[1])
+
+    def track_cache_eviction(self, reason: str, count: int = 1):
+        self.cache_local_evictions.labels(reason=reason).inc(count)
+
+    def update_cache_local_entries(self, count: int):
+        self.cache_local_entries.set(count)
+
+    def track_coalesced_call(self, group: str, shared: bool):
+        self.coalesced_calls.labels(group=group, role='shared' if shared else 'leader').inc()
+
+    def observe_pool_checkout(self, pool: str, wait: float):
+        self.db_pool_checkout_wait.labels(pool=pool).observe(wait)
+
+    def track_pool_timeout(self, pool: str):
+        self.db_pool_checkout_timeouts.labels(pool=pool).inc()
+
+    def track_pool_checked_out(self, pool: str, delta: int):
+        self.db_pool_checked_out.labels(pool=pool).inc(delta)
+
+    def update_replica_lag(self, replica: str, lag: Optional[float]):
+        self.db_replica_lag.labels(replica=replica).set(-1 if lag is None else lag)
+
+    def track_routed_read(self, target: str):
+        self.db_routed_reads.labels(target=target).inc()
+
+    def observe_password_hash(self, operation: str, queued: float, duration: float):
+        self.password_hash_queue.labels(operation=operation).observe(queued)
+        self.password_hash_duration.labels(operation=operation).observe(duration)
+
+    def track_password_hash_rejected(self, operation: str):
+        self.password_hash_rejected.labels(operation=operation).inc()
+
+    def track_password_rehash(self):
+        self.password_rehashes.inc()
+
+    def track_token_refresh(self, provider: str, mode: str, success: bool):
+        self.oauth_token_refreshes.labels(
+            provider=provider,
+            mode=mode,
+            result='success' if success else 'error'
+        ).inc()
+
+    def track_outbox_message(self, kind: str, result: str, lag: Optional[float] = None):
+        self.outbox_messages.labels(kind=kind, result=result).inc()
+        if lag is not None:
+            self.outbox_delivery_lag.labels(kind=kind).observe(lag)
+
+    def track_ws_connection(self, country: str, audience: str, delta: int):
+        self.ws_connections.labels(country=country, audience=audience).inc(delta)
+
+    def update_ws_queue_depth(self, country: str, audience: str, queued: int, deepest: int):
+        self.ws_queued_messages.labels(country=country, audience=audience).set(queued)
+        self.ws_max_queue_depth.labels(country=country, audience=audience).set(deepest)
+
+    def track_ws_dropped(self, audience: str, policy: str):
+        self.ws_messages_dropped.labels(audience=audience, policy=policy).inc()
+
+    def track_ws_disconnect(self, audience: str, reason: str):
+        self.ws_disconnects.labels(audience=audience, reason=reason).inc()
+
+    def track_ws_backplane(self, audience: str, result: str):
+        self.ws_backplane_messages.labels(audience=audience, result=result).inc()
+
+    def observe_ws_batch(self, audience: str, size: int):
+        self.ws_batch_size.labels(audience=audience).observe(size)
+
     def update_active_users(self, country: str, count: int):
         self.active_users.labels(country=country).set(count)
 
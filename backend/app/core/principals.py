@@ -0,0 +1,122 @@
+from typing import Any, Optional, Sequence
+from collections import OrderedDict
+import time
+import threading
+import logging
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from ..core.cache import cache
+from ..core.config import settings
+from ..core.monitoring import metrics
+from ..models.admin import Admin
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+KINDS = {User: "user", Admin: "admin"}
+
+# Credentials never leave the database row
+UNCACHED_COLUMNS = {"hashed_password"}
+
+MAX_ENTRIES = 10_000
+
+def principal_tag(kind: str, principal_id: Any) -> str:
+    return f"principal:{kind}:{principal_id}"
+
+class PrincipalCache:
+    """
+    Short-lived snapshots of authenticated users and admins keyed by token
+    subject, so resolving a token does not cost a primary-key query on every
+    request. An entry is dropped as soon as one of its columns is changed
+    through the ORM (on other workers through the response cache's
+    invalidation channel) and expires after PRINCIPAL_CACHE_TTL seconds
+    regardless. Used from the event loop and the threadpool, hence the lock.
+    """
+
+    def __init__(self, ttl: int, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # tag -> (columns, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, model, principal_id: Any) -> Optional[Any]:
+        """A detached model instance rebuilt from the snapshot, or None"""
+        if self.ttl <= 0:
+            return None
+        tag = principal_tag(KINDS[model], principal_id)
+        with self._lock:
+            entry = self._entries.get(tag)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[tag]
+                entry = None
+        metrics.track_cache_lookup('principal', entry is not None)
+        if entry is None:
+            return None
+        # Detached with an identity, as if loaded by a session that has closed:
+        # db.add() on it updates the row instead of inserting a copy
+        instance = model(**entry[0])
+        make_transient_to_detached(instance)
+        return instance
+
+    def put(self, instance: Any) -> None:
+        if self.ttl <= 0:
+            return
+        state = inspect(instance)
+        columns = {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict and attr.key not in UNCACHED_COLUMNS
+        }
+        tag = principal_tag(KINDS[type(instance)], state.identity[0])
+        with self._lock:
+            self._entries[tag] = (columns, time.monotonic() + self.ttl)
+            self._entries.move_to_end(tag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, tags: Optional[Sequence[str]]) -> None:
+        """Drop the entries under tags on this worker; None drops everything"""
+        with self._lock:
+            if tags is None:
+                self._entries.clear()
+                return
+            for tag in tags:
+                self._entries.pop(tag, None)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop the entries under tags on every worker"""
+        self.discard(tags)
+        cache.invalidate_threadsafe(*tags)
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL)
+cache.on_invalidate(principal_cache.discard)
+
+# Invalidation: any committed change to a cached column of a user or admin
+
+def _changed(target) -> bool:
+    state = inspect(target)
+    return any(
+        state.attrs[attr.key].history.has_changes()
+        for attr in state.mapper.column_attrs
+        if attr.key not in UNCACHED_COLUMNS
+    )
+
+def _stage(target, changed: bool = True) -> None:
+    session = Session.object_session(target)
+    if session is not None and changed:
+        tag = principal_tag(KINDS[type(target)], inspect(target).identity[0])
+        session.info.setdefault("changed_principals", set()).add(tag)
+
+for _model in KINDS:
+    event.listen(_model, "after_update", lambda mapper, connection, target: _stage(target, _changed(target)))
+    event.listen(_model, "after_delete", lambda mapper, connection, target: _stage(target))
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    tags = session.info.pop("changed_principals", None)
+    if tags:
+        principal_cache.invalidate(*tags)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("changed_principals", None)
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import String, cast, func, literal_column, or_, select, text, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from app.models.betting_code import BettingCode
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Longest search we turn into a full-text query
+MAX_SEARCH_TERMS = 8
+
+SQLITE_FTS_TABLE = "betting_codes_fts"
+
+# Column weights: title and tags rank above bookmaker, description lowest
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE betting_codes ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_betting_codes_search_vector ON betting_codes USING GIN (search_vector)",
+    """
+    CREATE OR REPLACE FUNCTION betting_codes_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce((
+                SELECT string_agg(value, ' ')
+                FROM json_array_elements_text(
+                    CASE WHEN json_typeof(NEW.tags::json) = 'array' THEN NEW.tags::json ELSE '[]'::json END
+                )
+            ), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.bookmaker, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS betting_codes_search_vector_trg ON betting_codes",
+    """
+    CREATE TRIGGER betting_codes_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, bookmaker, tags ON betting_codes
+    FOR EACH ROW EXECUTE FUNCTION betting_codes_search_vector_update()
+    """,
+    # Backfill rows written before the trigger existed
+    "UPDATE betting_codes SET title = title WHERE search_vector IS NULL",
+]
+
+POSTGRES_SEARCH_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS betting_codes_search_vector_trg ON betting_codes",
+    "DROP FUNCTION IF EXISTS betting_codes_search_vector_update()",
+    "DROP INDEX IF EXISTS ix_betting_codes_search_vector",
+    "ALTER TABLE betting_codes DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, description, bookmaker, tags,
+        content='betting_codes', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_insert AFTER INSERT ON betting_codes BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description, bookmaker, tags)
+        VALUES (new.id, new.title, new.description, new.bookmaker, new.tags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_delete AFTER DELETE ON betting_codes BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description, bookmaker, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.bookmaker, old.tags);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS betting_codes_fts_update
+    AFTER UPDATE OF title, description, bookmaker, tags ON betting_codes BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description, bookmaker, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.bookmaker, old.tags);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description, bookmaker, tags)
+        VALUES (new.id, new.title, new.description, new.bookmaker, new.tags);
+    END
+    """,
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_SEARCH_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS betting_codes_fts_insert",
+    "DROP TRIGGER IF EXISTS betting_codes_fts_delete",
+    "DROP TRIGGER IF EXISTS betting_codes_fts_update",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+# Search backend per database URL: 'postgres', 'fts5' or 'like'
+_backends: Dict[str, str] = {}
+
+def install_search_index(connection) -> None:
+    """Create the full-text index, its sync triggers and backfill existing rows"""
+    dialect = connection.dialect.name
+    inspector = inspect(connection)
+    if dialect == "postgresql":
+        if "search_vector" in {c["name"] for c in inspector.get_columns("betting_codes")}:
+            return
+        statements = POSTGRES_SEARCH_DDL
+    elif dialect == "sqlite":
+        if SQLITE_FTS_TABLE in inspector.get_table_names():
+            return
+        statements = SQLITE_SEARCH_DDL
+    else:
+        logger.warning(f"No full-text search support for {dialect}, search falls back to LIKE")
+        return
+
+    for statement in statements:
+        connection.execute(text(statement))
+    _backends.pop(str(connection.engine.url), None)
+    logger.info(f"Full-text search index installed for {dialect}")
+
+def drop_search_index(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = POSTGRES_SEARCH_DROP_DDL
+    elif dialect == "sqlite":
+        statements = SQLITE_SEARCH_DROP_DDL
+    else:
+        return
+
+    for statement in statements:
+        connection.execute(text(statement))
+    _backends.pop(str(connection.engine.url), None)
+
+def search_backend(db: Session) -> str:
+    """Detect which search backend the session's database supports"""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _backends:
+        backend = "like"
+        try:
+            if bind.dialect.name == "postgresql":
+                columns = {c["name"] for c in inspect(bind).get_columns("betting_codes")}
+                if "search_vector" in columns:
+                    backend = "postgres"
+            elif bind.dialect.name == "sqlite":
+                if SQLITE_FTS_TABLE in inspect(bind).get_table_names():
+                    backend = "fts5"
+        except Exception as e:
+            logger.error(f"Error detecting search backend: {str(e)}")
+        if backend == "like":
+            logger.warning("Full-text search index not installed, marketplace search uses LIKE")
+        _backends[key] = backend
+    return _backends[key]
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+
+def apply_search(db: Session, query: Query, search: str) -> Tuple[Query, Optional[object]]:
+    """
+    Restrict a BettingCode query to rows matching every search term (prefix match).
+    Returns the filtered query and a relevance expression to order by descending,
+    or None when no ranking is available.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query, None
+    return _filter_search(search_backend(db), query, terms)
+
+async def apply_search_async(db: AsyncSession, query, search: str) -> Tuple[object, Optional[object]]:
+    """apply_search() for a select() run on an AsyncSession"""
+    terms = search_terms(search)
+    if not terms:
+        return query, None
+    # Backend detection inspects the schema once per database, through the sync API
+    backend = await db.run_sync(search_backend)
+    return _filter_search(backend, query, terms)
+
+def _filter_search(backend: str, query, terms: List[str]):
+    """Works on both Query and select(): only filter() and join() are used"""
+    if backend == "postgres":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column("betting_codes.search_vector")
+        query = query.filter(search_vector.op("@@")(ts_query))
+        return query, func.ts_rank_cd(search_vector, ts_query)
+
+    if backend == "fts5":
+        fts = literal_column(SQLITE_FTS_TABLE)
+        matches = (
+            select(
+                literal_column("rowid").label("code_id"),
+                # bm25 is lower-is-better; weights follow the column order of the FTS table
+                (-func.bm25(fts, 10.0, 1.0, 5.0, 10.0)).label("rank")
+            )
+            .select_from(text(SQLITE_FTS_TABLE))
+            .where(fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.code_id == BettingCode.id)
+        return query, matches.c.rank
+
+    for term in terms:
+        query = query.filter(
+            or_(
+                BettingCode.title.ilike(f"%{term}%"),
+                BettingCode.description.ilike(f"%{term}%"),
+                BettingCode.bookmaker.ilike(f"%{term}%"),
+                # JSON array of tags, matched as its text
+                cast(BettingCode.tags, String).ilike(f"%{term}%")
+            )
+        )
+    return query, None
@@ -1,28 +1,88 @@
 from fastapi import Request, HTTPException, Depends, status
-from typing import Optional, List, Any, Union
+from typing import Callable, Optional, List, Any, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 import ipaddress
 import logging
+import asyncio
+import threading
+import time
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from .config import settings
 from .admin_config import admin_settings
+from .monitoring import metrics
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from ..core.admin_database import AdminSessionLocal
 from ..models.admin import Admin
+from ..db import routing
+from .principals import principal_cache
 import os
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Password hashing context
+# Password hashing context. Hashes made with other parameters (e.g. before a
+# BCRYPT_ROUNDS change) still verify and are replaced on the next login.
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12  # Add explicit rounds
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
 )
 
+class PasswordHasher:
+    """
+    Runs bcrypt, hundreds of milliseconds per call, on a small dedicated thread
+    pool (bcrypt releases the GIL) so a burst of logins neither blocks the
+    event loop nor takes over the shared threadpool. At most
+    PASSWORD_HASH_WORKERS calls run at once; past PASSWORD_HASH_MAX_PENDING
+    running or waiting calls, new ones are refused with 503 instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, operation: str, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.track_password_hash_rejected(operation)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in attempts in progress, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        queued_at = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                metrics.observe_password_hash(operation, started - queued_at, time.perf_counter() - started)
+
+        future = self._executor.submit(run)
+        # Also runs if the future is cancelled before it starts
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def call(self, operation: str, fn: Callable, *args) -> Any:
+        """Run on the pool and wait, for sync code (e.g. handlers in the threadpool)"""
+        return self.submit(operation, fn, *args).result()
+
+    async def call_async(self, operation: str, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self.submit(operation, fn, *args))
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
 # OAuth2 scheme for token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -101,7 +161,9 @@ class SecurityManager:
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
         try:
-            return pwd_context.verify(plain_password, hashed_password)
+            return password_hasher.call("verify", pwd_context.verify, plain_password, hashed_password)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Password verification error: {str(e)}")
             return False
@@ -109,7 +171,41 @@ class SecurityManager:
     def get_password_hash(self, password: str) -> str:
         """Generate password hash"""
         try:
-            return pwd_context.hash(password)
+            return password_hasher.call("hash", pwd_context.hash, password)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Password hashing error: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail="Could not process password"
+            )
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password against its hash without blocking the event loop.
+        Returns (valid, new_hash): new_hash replaces a valid hash made with
+        outdated parameters, otherwise it is None.
+        """
+        try:
+            valid, new_hash = await password_hasher.call_async(
+                "verify", pwd_context.verify_and_update, plain_password, hashed_password
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Password verification error: {str(e)}")
+            return False, None
+        if new_hash:
+            metrics.track_password_rehash()
+        return valid, new_hash
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Generate password hash without blocking the event loop"""
+        try:
+            return await password_hasher.call_async("hash", pwd_context.hash, password)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Password hashing error: {str(e)}")
             raise HTTPException(
@@ -142,6 +238,8 @@ security_manager = SecurityManager()
 create_access_token = security_manager.create_access_token
 verify_password = security_manager.verify_password
 get_password_hash = security_manager.get_password_hash
+verify_password_async = security_manager.verify_password_async
+get_password_hash_async = security_manager.get_password_hash_async
 
 async def get_current_admin(
     db: Session = Depends(get_admin_db),
@@ -170,12 +268,13 @@ async def get_current_admin(
             logger.error(f"Invalid admin role: {payload.get('role')}")
             raise credentials_exception
             
-        admin = db.query(Admin).filter(
-            Admin.id == int(admin_id),
-            Admin.is_active == True
-        ).first()
+        admin = principal_cache.get(Admin, int(admin_id))
+        if admin is None:
+            admin = db.query(Admin).filter(Admin.id == int(admin_id)).first()
+            if admin:
+                principal_cache.put(admin)
         
-        if not admin:
+        if not admin or not admin.is_active:
             logger.error(f"No active admin found with id: {admin_id}")
             raise credentials_exception
             
@@ -184,6 +283,7 @@ async def get_current_admin(
             logger.error(f"Role mismatch: token={payload.get('role')}, db={admin.role}")
             raise credentials_exception
             
+        routing.set_principal(f"admin:{admin.id}")
         return admin
         
     except JWTError as e:
@@ -0,0 +1,73 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from operator import attrgetter
+from fastapi.responses import ORJSONResponse
+
+# Serializers build dicts of JSON-native values plus datetimes, which orjson
+# encodes itself, so responses built from them can skip jsonable_encoder.
+Serializer = Callable[[Any], Dict[str, Any]]
+
+def compile_serializer(fields: Sequence[str], computed: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Serializer:
+    """
+    Build a serializer for a model: every plain column is read through a single
+    attrgetter and computed values are appended after them, in the order given.
+    """
+    names = tuple(fields)
+    getter = attrgetter(*names)
+    computed_items = tuple((computed or {}).items())
+
+    if len(names) == 1:
+        # attrgetter with one name returns the bare value rather than a tuple
+        name = names[0]
+
+        def serialize(obj) -> Dict[str, Any]:
+            data = {name: getter(obj)}
+            for key, compute in computed_items:
+                data[key] = compute(obj)
+            return data
+        return serialize
+
+    def serialize(obj) -> Dict[str, Any]:
+        data = dict(zip(names, getter(obj)))
+        for key, compute in computed_items:
+            data[key] = compute(obj)
+        return data
+    return serialize
+
+def serialize_many(serializer: Serializer, objects: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [serializer(obj) for obj in objects]
+
+def orjson_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    """Return content as-is to orjson; FastAPI does not re-encode Response objects"""
+    return ORJSONResponse(content=content, status_code=status_code)
+
+serialize_code_analysis = compile_serializer((
+    'id', 'betting_code_id', 'analyst_id', 'status', 'risk_level', 'confidence_score',
+    'expert_analysis', 'ai_analysis', 'odds_validation', 'stake_validation',
+    'pattern_validation', 'recommended_price', 'market_category', 'country',
+    'bookmaker', 'created_at', 'updated_at', 'completed_at'
+))
+
+# Same keys and order as BettingCode.to_dict()
+serialize_betting_code = compile_serializer(
+    (
+        'id', 'user_id', 'bookmaker', 'code', 'odds', 'stake', 'potential_winnings',
+        'status', 'created_at', 'description', 'verified_at', 'verified_by',
+        'admin_note', 'rejection_reason', 'market_data', 'price', 'win_probability',
+        'expected_odds', 'valid_until', 'min_stake', 'tags', 'title', 'category',
+        'issuer', 'issuer_type', 'marketplace_status', 'analysis_status', 'user_country'
+    ),
+    {
+        'analysis': lambda code: serialize_code_analysis(code.analysis) if code.analysis else None
+    }
+)
+
+# Same keys as schemas.transaction.Transaction; the table has no updated_at column
+serialize_transaction = compile_serializer(
+    (
+        'type', 'amount', 'fee', 'payment_method', 'status', 'payment_reference',
+        'description', 'currency', 'id', 'user_id', 'created_at'
+    ),
+    {
+        'updated_at': lambda transaction: None
+    }
+)
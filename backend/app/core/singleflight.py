@@ -0,0 +1,54 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+from sqlalchemy.orm import Session
+from ..db.session import ReadSessionLocal
+from ..core.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work and everyone arriving before it finishes awaits the same result (or
+    exception). Nothing is kept once the call completes, so this is not a cache.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._flights.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        metrics.track_coalesced_call(self.name, shared)
+        # A caller going away must not cancel the work the others are waiting on
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+dashboard_flights = SingleFlight("dashboard")
+
+async def coalesced_query(key: Hashable, fn: Callable[..., Any], *args) -> Any:
+    """
+    Run fn(db, *args) once for all concurrent requests with the same key.
+    The queries run in a worker thread with their own read session (replica
+    routed), so the event loop keeps accepting the requests that will join the flight.
+    """
+    def run():
+        db: Session = ReadSessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    return await dashboard_flights.do(key, lambda: asyncio.to_thread(run))
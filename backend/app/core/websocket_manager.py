@@ -1,18 +1,186 @@
 from fastapi import WebSocket
-from typing import Dict, Set, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
 import logging
 import ssl
-import json
+import time
+import uuid
+import orjson
 from datetime import datetime
+from .config import settings
+from .monitoring import metrics
+from .ws_backplane import MemoryBackplane, RedisBackplane
 
 logger = logging.getLogger(__name__)
 
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+# Close code for connections dropped for not keeping up ("try again later")
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+# Close code for connections silent for longer than WS_IDLE_TIMEOUT_SECONDS ("going away")
+WS_CLOSE_GOING_AWAY = 1001
+
+# Closing handshake of a connection being dropped
+CLOSE_TIMEOUT_SECONDS = 5
+
+# Backplane channel per audience ('admins' or 'users') and country; a worker
+# subscribes to one only while it holds connections there
+BACKPLANE_CHANNEL = "ws:{audience}:{country}"
+# Messages for one user, wherever they are connected; followed by every
+# worker holding user connections
+DIRECT_CHANNEL = "ws:direct"
+
+# Event types of the notification API
+EVENT_BATCH = "BATCH"
+EVENT_NEW_BETTING_CODE = "NEW_BETTING_CODE"
+EVENT_CODE_VERIFIED = "CODE_VERIFIED"
+EVENT_PAYMENT_VERIFICATION = "PAYMENT_VERIFICATION"
+EVENT_ADMIN_ACTIVITY = "ADMIN_ACTIVITY"
+
+# Heartbeat frames; clients answer a PING with a PONG, and the server answers theirs
+PING_FRAME = '{"type":"PING"}'
+PONG_FRAME = '{"type":"PONG"}'
+
+def encode_message(message: Any) -> str:
+    """Text frame for message; strings are sent as they are"""
+    if isinstance(message, str):
+        return message
+    return orjson.dumps(message, default=str).decode()
+
+class Connection:
+    """
+    A socket with a bounded queue of outgoing text frames, sent by its own
+    writer task so that queueing a message never waits on the client. When the
+    queue is full, WS_SLOW_CONSUMER_POLICY decides what gives: the oldest queued
+    message, the new one, or the connection.
+    """
+
+    def __init__(self, websocket: WebSocket, audience: str, country: str, on_close: Callable[["Connection"], None]):
+        self.websocket = websocket
+        self.audience = audience  # 'user' or 'admin'
+        self.country = country
+        self.on_close = on_close
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.closed = False
+        # time.monotonic() of the last frame from the client
+        self.last_seen = time.monotonic()
+        self._timed_out = False
+        self._writer = asyncio.create_task(self._write())
+        metrics.track_ws_connection(country, audience, 1)
+
+    def received(self, message: Any) -> None:
+        """Note a frame from the client (text or parsed JSON), answering heartbeat PINGs"""
+        self.last_seen = time.monotonic()
+        if isinstance(message, str):
+            if "PING" not in message:
+                return
+            try:
+                message = orjson.loads(message)
+            except orjson.JSONDecodeError:
+                return
+        if isinstance(message, dict) and message.get("type") == "PING":
+            self.offer(PONG_FRAME)
+
+    def offer(self, message: str) -> bool:
+        """Queue message without waiting; False if it was dropped"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        policy = settings.WS_SLOW_CONSUMER_POLICY
+        metrics.track_ws_dropped(self.audience, policy)
+        if policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            return True
+        if policy == "disconnect":
+            logger.warning(f"Disconnecting slow {self.audience} WebSocket ({self.queue.qsize()} messages behind)")
+            self.abort("slow_consumer")
+        return False
+
+    def _send_timed_out(self) -> None:
+        self._timed_out = True
+        self._writer.cancel()
+
+    async def _write(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                message = await self.queue.get()
+                # A timer rather than wait_for(), which costs a task per frame
+                timer = loop.call_later(settings.WS_SEND_TIMEOUT_SECONDS, self._send_timed_out)
+                try:
+                    await self.websocket.send_text(message)
+                finally:
+                    timer.cancel()
+        except asyncio.CancelledError:
+            if not self._timed_out:
+                raise
+            self.abort("send_timeout")
+        except Exception as e:
+            logger.info(f"{self.audience.capitalize()} WebSocket send failed: {e}")
+            self.abort("send_error")
+
+    def stop(self) -> None:
+        """Stop sending (the socket is closed or handed over); idempotent"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        metrics.track_ws_connection(self.country, self.audience, -1)
+
+    def abort(self, reason: str, code: int = WS_CLOSE_TRY_AGAIN_LATER) -> None:
+        """Drop the connection from the manager and close the socket in the background"""
+        if self.closed:
+            return
+        self.stop()
+        metrics.track_ws_disconnect(self.audience, reason)
+        self.on_close(self)
+        task = asyncio.create_task(self._close_socket(code))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), CLOSE_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+# Closing handshakes in flight (held so they are not garbage collected)
+_closing: Set[asyncio.Task] = set()
+
 class ConnectionManager:
-    def __init__(self):
+    """
+    Connections of this worker. Broadcasts and personal messages are delivered
+    to local connections and published on the backplane (Redis pub/sub, or in
+    memory when REDIS_URL is not set), from which the other workers deliver
+    them to theirs.
+    """
+
+    def __init__(self, backplane=None):
         self.active_connections: Dict[str, Set[WebSocket]] = {}
-        self.admin_connections: Dict[str, Set[WebSocket]] = {}
-        self.user_connections: Dict[str, Dict[str, WebSocket]] = {}
+        # country -> socket -> connection
+        self.admin_connections: Dict[str, Dict[WebSocket, Connection]] = {}
+        # country -> user id -> connection (the latest one per user)
+        self.user_connections: Dict[str, Dict[str, Connection]] = {}
+        # other ids of connected users (e.g. numeric id) -> the id they connected with
+        self.user_aliases: Dict[str, str] = {}
+        # recipient ('admins', country) or ('user', id) -> events waiting to go out, flush timer
+        self._batches: Dict[Tuple[str, str], Tuple[List[Any], asyncio.TimerHandle]] = {}
+        self._sending: Set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._swept: Set[Tuple[str, str]] = set()
         self.ssl_context = self._create_ssl_context()
+        self.backplane = backplane
+        # Tags published envelopes so the backplane's echo of them is skipped
+        self.instance_id = uuid.uuid4().hex
+        if settings.WS_SLOW_CONSUMER_POLICY not in SLOW_CONSUMER_POLICIES:
+            logger.warning(f"Unknown WS_SLOW_CONSUMER_POLICY {settings.WS_SLOW_CONSUMER_POLICY!r}, dropping new messages")
         logger.info("WebSocket manager initialized")
 
     def _create_ssl_context(self) -> ssl.SSLContext:
@@ -31,70 +199,293 @@ class ConnectionManager:
             logger.warning(f"Failed to create SSL context: {e}")
             return None
 
-    async def connect(self, websocket: WebSocket, user_id: str, country: str):
-        """Connect a regular user"""
-        if country not in self.user_connections:
-            self.user_connections[country] = {}
-        self.user_connections[country][user_id] = websocket
+    def configure_backplane(self, backplane) -> None:
+        """Swap the backplane, e.g. MemoryBackplane(hub) shared by several managers in tests"""
+        self.backplane = backplane
+
+    def _backplane(self):
+        if self.backplane is None:
+            if settings.REDIS_URL:
+                self.backplane = RedisBackplane.from_url(settings.REDIS_URL)
+            else:
+                self.backplane = MemoryBackplane()
+        return self.backplane
+
+    def _watch(self, audience: str, country: str, registry: Dict[str, Dict]) -> None:
+        """Follow a country's channel exactly while this worker has connections there"""
+        channel = BACKPLANE_CHANNEL.format(audience=audience, country=country)
+        if registry.get(country):
+            self._backplane().subscribe(channel)
+        else:
+            registry.pop(country, None)
+            self._backplane().unsubscribe(channel)
+        if audience == "users":
+            if self.user_connections:
+                self._backplane().subscribe(DIRECT_CHANNEL)
+            else:
+                self._backplane().unsubscribe(DIRECT_CHANNEL)
+
+    async def _publish(self, channel: str, audience: str, text: str, **routing) -> None:
+        envelope = {"origin": self.instance_id, "audience": audience, "text": text, **routing}
+        try:
+            await self._backplane().publish(channel, orjson.dumps(envelope))
+            metrics.track_ws_backplane(audience, "published")
+        except Exception as e:
+            # Local connections already have it; other workers miss this one
+            metrics.track_ws_backplane(audience, "publish_failed")
+            logger.error(f"Error publishing WebSocket message on {channel}: {str(e)}")
+
+    def _receive(self, channel: str, data: bytes) -> None:
+        """Deliver a message published by another worker to the local connections"""
+        try:
+            envelope = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Ignoring malformed message on {channel}")
+            return
+        if envelope.get("origin") == self.instance_id:
+            return
+        audience, text = envelope["audience"], envelope["text"]
+        metrics.track_ws_backplane(audience, "received")
+        if audience == "admins":
+            self._fan_out(self.admin_connections.get(envelope["country"], {}).values(), text)
+        elif audience == "users":
+            self._fan_out(self.user_connections.get(envelope["country"], {}).values(), text)
+        else:
+            connection = self._find_user(envelope["user_id"])
+            if connection is not None:
+                connection.offer(text)
+
+    def sweep(self) -> None:
+        """
+        Close connections silent for WS_IDLE_TIMEOUT_SECONDS, ping those silent
+        for a heartbeat interval, and record queue depths
+        """
+        now = time.monotonic()
+        swept = set()
+        for audience, registry in (("admin", self.admin_connections), ("user", self.user_connections)):
+            for country, connections in list(registry.items()):
+                swept.add((country, audience))
+                queued = deepest = 0
+                for connection in list(connections.values()):
+                    idle = now - connection.last_seen
+                    if idle >= settings.WS_IDLE_TIMEOUT_SECONDS:
+                        logger.info(f"Closing {audience} WebSocket in {country} idle for {idle:.0f}s")
+                        connection.abort("idle_timeout", WS_CLOSE_GOING_AWAY)
+                        continue
+                    depth = connection.queue.qsize()
+                    queued += depth
+                    deepest = max(deepest, depth)
+                    if idle >= settings.WS_HEARTBEAT_INTERVAL_SECONDS:
+                        connection.offer(PING_FRAME)
+                metrics.update_ws_queue_depth(country, audience, queued, deepest)
+        for country, audience in self._swept - swept:
+            metrics.update_ws_queue_depth(country, audience, 0, 0)
+        self._swept = swept
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping WebSocket connections: {str(e)}")
+
+    def start(self) -> None:
+        """Start receiving other workers' messages and sweeping connections on the running event loop"""
+        self._backplane().start(self._receive)
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def close(self) -> None:
+        if self._sweeper:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        await self.flush()
+        if self.backplane is not None:
+            await self.backplane.close()
+            self.backplane = None
+
+    async def connect(self, websocket: WebSocket, user_id: str, country: str, aliases: Iterable[Any] = ()) -> Connection:
+        """
+        Connect a regular user; messages to user_id or any of aliases reach them.
+        Frames read from the socket are to be passed to the connection's received()
+        """
+        connections = self.user_connections.setdefault(country, {})
+        previous = connections.get(user_id)
+        connection = connections[user_id] = Connection(
+            websocket, "user", country,
+            lambda connection: self._forget_user(connection, user_id, country)
+        )
+        for alias in aliases:
+            self.user_aliases[str(alias)] = user_id
+        if previous is not None:
+            # The user's newest socket gets their messages from now on
+            previous.stop()
+        self._watch("users", country, self.user_connections)
         logger.info(f"User {user_id} connected from {country}")
+        return connection
 
     async def disconnect(self, websocket: WebSocket, user_id: str, country: str):
         """Disconnect a regular user"""
-        if country in self.user_connections and user_id in self.user_connections[country]:
-            del self.user_connections[country][user_id]
+        connection = self.user_connections.get(country, {}).get(user_id)
+        if connection is not None and connection.websocket is websocket:
+            connection.stop()
+            self._forget_user(connection, user_id, country)
             logger.info(f"User {user_id} disconnected from {country}")
 
-    async def connect_admin(self, websocket: WebSocket, country: str):
-        """Connect an admin user"""
-        if country not in self.admin_connections:
-            self.admin_connections[country] = set()
-        self.admin_connections[country].add(websocket)
+    def _forget_user(self, connection: Connection, user_id: str, country: str) -> None:
+        connections = self.user_connections.get(country, {})
+        if connections.get(user_id) is connection:
+            del connections[user_id]
+            for alias in [alias for alias, target in self.user_aliases.items() if target == user_id]:
+                del self.user_aliases[alias]
+            self._watch("users", country, self.user_connections)
+
+    def _find_user(self, user_id: Any) -> Optional[Connection]:
+        """The local connection of a user, by the id they connected with or an alias"""
+        user_id = self.user_aliases.get(str(user_id), str(user_id))
+        for connections in self.user_connections.values():
+            connection = connections.get(user_id)
+            if connection is not None:
+                return connection
+        return None
+
+    async def connect_admin(self, websocket: WebSocket, country: str) -> Connection:
+        """Connect an admin user; frames read from the socket are to be passed to the connection's received()"""
+        connection = self.admin_connections.setdefault(country, {})[websocket] = Connection(
+            websocket, "admin", country,
+            lambda connection: self._forget_admin(connection, country)
+        )
+        self._watch("admins", country, self.admin_connections)
         logger.info(f"Admin connected to {country}")
+        return connection
 
     async def disconnect_admin(self, websocket: WebSocket, country: str):
         """Disconnect an admin user"""
-        if country in self.admin_connections:
-            self.admin_connections[country].discard(websocket)
+        connection = self.admin_connections.get(country, {}).get(websocket)
+        if connection is not None:
+            connection.stop()
+            self._forget_admin(connection, country)
             logger.info(f"Admin disconnected from {country}")
 
-    async def broadcast_to_country(self, message: str, country: str):
-        """Broadcast message to all users in a country"""
-        if country in self.user_connections:
-            disconnected = []
-            for user_id, websocket in self.user_connections[country].items():
-                try:
-                    await websocket.send_text(message)
-                except Exception as e:
-                    logger.error(f"Failed to send to user {user_id}: {e}")
-                    disconnected.append((user_id, websocket))
-
-            # Clean up disconnected users
-            for user_id, _ in disconnected:
-                del self.user_connections[country][user_id]
-
-    async def broadcast_to_admins(self, message: str, country: str):
-        """Broadcast message to all admins in a country"""
-        if country in self.admin_connections:
-            disconnected = set()
-            for websocket in self.admin_connections[country]:
-                try:
-                    await websocket.send_text(message)
-                except Exception as e:
-                    logger.error(f"Failed to send to admin: {e}")
-                    disconnected.add(websocket)
+    def _forget_admin(self, connection: Connection, country: str) -> None:
+        connections = self.admin_connections.get(country, {})
+        if connections.get(connection.websocket) is connection:
+            del connections[connection.websocket]
+            self._watch("admins", country, self.admin_connections)
 
-            # Clean up disconnected admins
-            self.admin_connections[country] -= disconnected
+    @staticmethod
+    def _fan_out(connections: Iterable[Connection], message: Any) -> int:
+        """Queue message, serialized once, on every connection; returns how many took it"""
+        text = encode_message(message)
+        # A snapshot: dropping a slow consumer removes it from the registry
+        return sum(connection.offer(text) for connection in list(connections))
 
-    async def send_personal_message(self, message: str, user_id: str, country: str):
-        """Send a message to a specific user"""
-        if country in self.user_connections and user_id in self.user_connections[country]:
-            try:
-                await self.user_connections[country][user_id].send_text(message)
-                logger.info(f"Sent personal message to user {user_id}")
-            except Exception as e:
-                logger.error(f"Failed to send personal message to user {user_id}: {e}")
-                del self.user_connections[country][user_id] 
+    async def broadcast_to_country(self, message: Any, country: str) -> int:
+        """
+        Broadcast message to all users in a country without waiting on any of
+        them; returns how many local connections took it
+        """
+        text = encode_message(message)
+        sent = self._fan_out(self.user_connections.get(country, {}).values(), text)
+        await self._publish(BACKPLANE_CHANNEL.format(audience="users", country=country), "users", text, country=country)
+        return sent
+
+    async def broadcast_to_admins(self, message: Any, country: str) -> int:
+        """
+        Broadcast message to all admins in a country without waiting on any of
+        them; returns how many local connections took it
+        """
+        text = encode_message(message)
+        sent = self._fan_out(self.admin_connections.get(country, {}).values(), text)
+        await self._publish(BACKPLANE_CHANNEL.format(audience="admins", country=country), "admins", text, country=country)
+        return sent
+
+    async def send_personal_message(self, message: Any, user_id: Any, country: Optional[str] = None) -> bool:
+        """
+        Send a message to a specific user, by the id they connected with or an
+        alias, wherever they are connected; True if a local connection took it
+        """
+        text = encode_message(message)
+        connection = self._find_user(user_id)
+        sent = connection is not None and connection.offer(text)
+        # The user may (also) be connected to another worker
+        await self._publish(DIRECT_CHANNEL, "user", text, user_id=str(user_id))
+        return sent
+
+    # Notification API: events for the same recipient within WS_BATCH_WINDOW_MS
+    # go out as one frame, {"type": "BATCH", "events": [...]}, so that e.g. a
+    # bulk verification costs each user one frame (and one publish) rather
+    # than one per code. A lone event is sent as it is.
+
+    def _queue_event(self, recipient: Tuple[str, str], event: Dict[str, Any]) -> None:
+        pending = self._batches.get(recipient)
+        if pending is None:
+            timer = asyncio.get_running_loop().call_later(
+                settings.WS_BATCH_WINDOW_MS / 1000, self._flush_batch, recipient
+            )
+            pending = self._batches[recipient] = ([], timer)
+        pending[0].append(event)
+        if len(pending[0]) >= settings.WS_BATCH_MAX_EVENTS:
+            self._flush_batch(recipient)
+
+    def _flush_batch(self, recipient: Tuple[str, str]) -> None:
+        pending = self._batches.pop(recipient, None)
+        if pending is None:
+            return
+        events, timer = pending
+        timer.cancel()
+        audience, target = recipient
+        metrics.observe_ws_batch(audience, len(events))
+        frame = events[0] if len(events) == 1 else {"type": EVENT_BATCH, "events": events}
+        if audience == "admins":
+            send = self.broadcast_to_admins(frame, target)
+        else:
+            send = self.send_personal_message(frame, target)
+        task = asyncio.create_task(send)
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def flush(self) -> None:
+        """Send every pending batch now"""
+        for recipient in list(self._batches):
+            self._flush_batch(recipient)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    async def broadcast_to_country_admins(self, country: str, message: Dict[str, Any]) -> None:
+        """Queue message for the admins of a country"""
+        self._queue_event(("admins", country.lower()), message)
+
+    async def notify_country_admin(self, country: str, message: Dict[str, Any]) -> None:
+        await self.broadcast_to_country_admins(country, message)
+
+    async def send_to_user(self, user_id: Any, message: Dict[str, Any]) -> None:
+        """Queue message for a user, by the id they connected with (email) or an alias (numeric id)"""
+        self._queue_event(("user", str(user_id)), message)
+
+    async def notify_user(self, user_id: Any, message: Dict[str, Any]) -> None:
+        await self.send_to_user(user_id, message)
+
+    async def notify_admin_betting_code(self, country: str, betting_code: Dict[str, Any]) -> None:
+        """Tell a country's admins about a newly submitted betting code"""
+        await self.broadcast_to_country_admins(country, {"type": EVENT_NEW_BETTING_CODE, "data": betting_code})
+
+    async def notify_admin_activity(self, country: str, activity: Dict[str, Any]) -> None:
+        """Tell a country's admins about a user activity"""
+        await self.broadcast_to_country_admins(country, {"type": EVENT_ADMIN_ACTIVITY, "data": activity})
+
+    async def notify_code_verification(self, user_id: Any, verification: Dict[str, Any]) -> None:
+        """Tell a user one of their betting codes was verified"""
+        await self.send_to_user(user_id, {"type": EVENT_CODE_VERIFIED, "data": verification})
+
+    async def notify_payment_verification(self, user_id: Any, payment: Dict[str, Any]) -> None:
+        """Tell a user their payment was verified"""
+        await self.send_to_user(user_id, {"type": EVENT_PAYMENT_VERIFICATION, "data": payment})
 
 # Create a global instance of the connection manager
-manager = ConnectionManager() 
\ No newline at end of file
+manager = ConnectionManager()
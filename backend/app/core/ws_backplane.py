@@ -0,0 +1,128 @@
+from typing import Callable, Dict, Optional, Set
+import asyncio
+import logging
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# How long the Redis reader waits for a message before applying subscription changes
+POLL_SECONDS = 0.1
+
+Handler = Callable[[str, bytes], None]
+
+class MemoryBackplane:
+    """
+    In-process stand-in for Redis pub/sub. Backplanes sharing a hub see each
+    other's messages like workers sharing a Redis server, so tests can run
+    several ConnectionManagers in one process; by default each has its own.
+    """
+
+    def __init__(self, hub: Optional[Dict[str, Set["MemoryBackplane"]]] = None):
+        self.hub = hub if hub is not None else {}
+        self.channels: Set[str] = set()
+        self._handler: Optional[Handler] = None
+
+    def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+        self.hub.setdefault(channel, set()).add(self)
+
+    def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+        subscribers = self.hub.get(channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.hub[channel]
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        for backplane in list(self.hub.get(channel, ())):
+            if backplane._handler is not None:
+                backplane._handler(channel, data)
+
+    def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def close(self) -> None:
+        for channel in list(self.channels):
+            self.unsubscribe(channel)
+        self._handler = None
+
+class RedisBackplane:
+    """
+    Redis pub/sub over a single subscriber connection. subscribe() and
+    unsubscribe() only record the channels wanted; the reader task applies
+    them, and resubscribes everything after reconnecting. Like any pub/sub,
+    messages published while a worker is disconnected are lost to it.
+    Accepts any redis.asyncio-compatible client (e.g. fakeredis.aioredis.FakeRedis).
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.channels: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackplane":
+        return cls(aioredis.from_url(url))
+
+    def subscribe(self, channel: str) -> None:
+        if channel not in self.channels:
+            self.channels.add(channel)
+            self._changed.set()
+
+    def unsubscribe(self, channel: str) -> None:
+        if channel in self.channels:
+            self.channels.discard(channel)
+            self._changed.set()
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        await self.client.publish(channel, data)
+
+    async def _read(self, handler: Handler) -> None:
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            subscribed: Set[str] = set()
+            try:
+                while True:
+                    self._changed.clear()
+                    wanted = set(self.channels)
+                    if wanted - subscribed:
+                        await pubsub.subscribe(*(wanted - subscribed))
+                    if subscribed - wanted:
+                        await pubsub.unsubscribe(*(subscribed - wanted))
+                    subscribed = wanted
+                    if not subscribed:
+                        await self._changed.wait()
+                        continue
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=POLL_SECONDS)
+                    if message is not None and message["type"] == "message":
+                        channel = message["channel"]
+                        handler(channel.decode() if isinstance(channel, bytes) else channel, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket backplane subscriber failed: {str(e)}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(1)
+
+    def start(self, handler: Handler) -> None:
+        """Start receiving on the running event loop"""
+        if self._reader is None or self._reader.done():
+            self._changed = asyncio.Event()
+            self._changed.set()
+            self._reader = asyncio.create_task(self._read(handler))
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self.client.aclose()
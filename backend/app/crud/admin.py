@@ -1,6 +1,8 @@
 from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password, verify_password_async
 from app.models.admin import Admin
 from app.schemas.admin import AdminCreate, AdminUpdate
 
@@ -15,6 +17,23 @@ def authenticate(db: Session, *, email: str, password: str) -> Optional[Admin]:
         return None
     return admin
 
+async def get_by_email_async(db: AsyncSession, email: str) -> Optional[Admin]:
+    result = await db.execute(select(Admin).where(Admin.email == email))
+    return result.scalars().first()
+
+async def authenticate_async(db: AsyncSession, *, email: str, password: str) -> Optional[Admin]:
+    """Like authenticate(), off the event loop; upgrades an outdated password hash"""
+    admin = await get_by_email_async(db, email=email)
+    if not admin:
+        return None
+    valid, new_hash = await verify_password_async(password, admin.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        admin.hashed_password = new_hash
+        await db.commit()
+    return admin
+
 def create(db: Session, *, obj_in: AdminCreate) -> Admin:
     db_obj = Admin(
         email=obj_in.email,
@@ -48,4 +67,8 @@ def get_multi(db: Session, *, skip: int = 0, limit: int = 100):
     return db.query(Admin).offset(skip).limit(limit).all()
 
 def get(db: Session, id: int) -> Optional[Admin]:
-    return db.query(Admin).filter(Admin.id == id).first() 
\ No newline at end of file
+    return db.query(Admin).filter(Admin.id == id).first()
+
+async def get_async(db: AsyncSession, id: int) -> Optional[Admin]:
+    result = await db.execute(select(Admin).where(Admin.id == id))
+    return result.scalars().first()
@@ -1,7 +1,8 @@
 from typing import Any, Dict, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect
-from app.core.security import get_password_hash, verify_password
+from sqlalchemy import inspect, select
+from app.core.security import get_password_hash, verify_password, verify_password_async
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas import UserCreate, UserUpdate
@@ -10,6 +11,10 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """Get user by email"""
         return db.query(User).filter(User.email.ilike(email)).first()
+
+    async def get_by_email_async(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email.ilike(email)))
+        return result.scalars().first()
     
     def get_by_phone(self, db: Session, *, phone: str) -> Optional[User]:
         user = db.query(User).filter(User.phone == phone).first()
@@ -54,6 +59,19 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             return None
         return user
 
+    async def authenticate_async(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        """Like authenticate(), off the event loop; upgrades an outdated password hash"""
+        user = await self.get_by_email_async(db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await verify_password_async(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        return user
+
     def is_active(self, user: User) -> bool:
         return user.is_active
 
@@ -1,10 +1,12 @@
-from sqlalchemy import create_engine
+from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 from app.db.base import Base
+from app.db.engine import get_async_engine, get_engine
 
 # Create admin engine
-admin_engine = create_engine(settings.ADMIN_DATABASE_URL)
+admin_engine = get_engine(settings.ADMIN_DATABASE_URL, "admin")
 
 # Create all tables
 Base.metadata.create_all(bind=admin_engine)
@@ -12,10 +14,19 @@ Base.metadata.create_all(bind=admin_engine)
 # Create admin session factory
 AdminSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=admin_engine)
 
+# Async admin session factory (see app.db.session)
+async_admin_engine = get_async_engine(settings.ADMIN_DATABASE_URL, "admin")
+AsyncAdminSessionLocal = async_sessionmaker(async_admin_engine, autoflush=False, expire_on_commit=False)
+
 def get_admin_db() -> Session:
     """Get admin database session"""
     db = AdminSessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
+
+async def get_async_admin_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async admin database session"""
+    async with AsyncAdminSessionLocal() as db:
+        yield db
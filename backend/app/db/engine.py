@@ -0,0 +1,110 @@
+from typing import Any, Dict
+import time
+import logging
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# One engine (and so one pool) per database URL per process, whichever module asks for it
+_engines: Dict[str, Engine] = {}
+_async_engines: Dict[str, AsyncEngine] = {}
+
+class _TimedCheckout:
+    """Records how long each checkout takes to hand out a connection, per pool"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.track_pool_timeout(self.logging_name)
+            raise
+        finally:
+            metrics.observe_pool_checkout(self.logging_name, time.perf_counter() - started)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def async_database_url(url: str) -> str:
+    """The same database through its asyncio driver: asyncpg for Postgres, aiosqlite for SQLite"""
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgres", "postgresql"):
+        # asyncpg takes ssl=, not libpq's sslmode=
+        return f"postgresql+asyncpg://{rest.replace('sslmode=', 'ssl=')}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+def _echo() -> bool:
+    if settings.DB_ECHO is not None:
+        return settings.DB_ECHO
+    return settings.ENVIRONMENT == "development"
+
+def engine_options(url: str, name: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine() keyword arguments for url from the DB_* settings"""
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {
+        "echo": _echo(),
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_logging_name": name,
+    }
+
+    if backend == "sqlite":
+        database = make_url(url).database
+        # SQLite has no statement timeout; wait this long on a locked database instead
+        connect_args: Dict[str, Any] = {"timeout": settings.DB_STATEMENT_TIMEOUT_MS / 1000}
+        if not is_async:
+            connect_args["check_same_thread"] = False
+        options["connect_args"] = connect_args
+        if is_async or not database or database == ":memory:":
+            # Keep the dialect's own pool: a single connection for in-memory databases,
+            # none for aiosqlite, whose connections each hold a worker thread
+            return options
+    elif backend == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+def _track_checked_out(sync_engine: Engine, name: str) -> None:
+    # checkin fires before the pool takes the connection back, so count the events
+    event.listen(sync_engine, "checkout", lambda *args: metrics.track_pool_checked_out(name, 1))
+    event.listen(sync_engine, "checkin", lambda *args: metrics.track_pool_checked_out(name, -1))
+
+def get_engine(url: str, name: str) -> Engine:
+    """The process-wide engine for url; name labels its pool in logs and metrics"""
+    if url not in _engines:
+        engine = create_engine(url, **engine_options(url, name))
+        _track_checked_out(engine, name)
+        _engines[url] = engine
+        logger.info(f"Created '{name}' database engine ({engine.url.get_backend_name()}, pool {engine.pool.status()})")
+    return _engines[url]
+
+def get_async_engine(url: str, name: str) -> AsyncEngine:
+    """Like get_engine() through the asyncio driver; its pool is labelled '<name>_async'"""
+    if url not in _async_engines:
+        name = f"{name}_async"
+        async_url = async_database_url(url)
+        engine = create_async_engine(async_url, **engine_options(async_url, name, is_async=True))
+        _track_checked_out(engine.sync_engine, name)
+        _async_engines[url] = engine
+    return _async_engines[url]
@@ -0,0 +1,208 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import time
+import asyncio
+import itertools
+import logging
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.monitoring import metrics
+from app.db.engine import get_async_engine, get_engine
+
+logger = logging.getLogger(__name__)
+
+LAG_CHECK_INTERVAL_SECONDS = 5
+
+# A replica is only used while its lag is within tolerance, and lag is only
+# measured every few seconds, so after a write the writer reads from the
+# primary until any replica in use must have caught up with it
+READ_YOUR_WRITES_SECONDS = settings.REPLICA_MAX_LAG_SECONDS + LAG_CHECK_INTERVAL_SECONDS
+
+# Browser sessions (anonymous ones included) carry their pin across requests and workers
+PIN_COOKIE = "db_primary"
+
+# Seconds behind the primary; 0 when the primary has nothing left to replay to it
+POSTGRES_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+@dataclass
+class RequestRouting:
+    """Read routing state of one request"""
+    pinned: bool = False
+    principal: Optional[str] = None
+    wrote: bool = False
+
+_request: ContextVar[Optional[RequestRouting]] = ContextVar("db_request_routing", default=None)
+
+# principal -> monotonic time until which its reads stay on the primary
+_pins: Dict[str, float] = {}
+
+def begin_request(pinned: bool = False) -> RequestRouting:
+    """Start tracking the current request; pinned sends all its reads to the primary"""
+    state = RequestRouting(pinned=pinned)
+    _request.set(state)
+    return state
+
+def set_principal(principal: str) -> None:
+    """Attach the authenticated user or admin to the current request, applying any pin they hold"""
+    state = _request.get()
+    if state is None:
+        return
+    state.principal = principal
+    if _pins.get(principal, 0) > time.monotonic():
+        state.pinned = True
+
+def record_write() -> None:
+    """Pin the current request, and its principal for READ_YOUR_WRITES_SECONDS, to the primary"""
+    state = _request.get()
+    if state is None:
+        return
+    state.wrote = state.pinned = True
+    if state.principal:
+        now = time.monotonic()
+        if len(_pins) > 10_000:
+            for principal, until in list(_pins.items()):
+                if until <= now:
+                    del _pins[principal]
+        _pins[state.principal] = now + READ_YOUR_WRITES_SECONDS
+
+def primary_required() -> bool:
+    state = _request.get()
+    return state is not None and state.pinned
+
+class ReplicaSet:
+    """
+    Read replicas of the main database. A background check measures each one's
+    replication lag; reads only go to replicas measured within the tolerance,
+    round robin, and fall back to the primary when there is none.
+    """
+
+    def __init__(self, urls: List[str], max_lag: float):
+        self.urls = urls
+        self.max_lag = max_lag
+        # None until measured, or while unreachable
+        self.lag: Dict[str, Optional[float]] = {url: None for url in urls}
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _name(index: int) -> str:
+        return f"replica{index}"
+
+    def pick(self, is_async: bool = False) -> Optional[Engine]:
+        """A replica within tolerance (the sync engine behind the async one when is_async), or None"""
+        usable = [
+            index for index, url in enumerate(self.urls)
+            if self.lag[url] is not None and self.lag[url] <= self.max_lag
+        ]
+        if not usable:
+            return None
+        index = usable[next(self._turn) % len(usable)]
+        url = self.urls[index]
+        if is_async:
+            return get_async_engine(url, self._name(index)).sync_engine
+        return get_engine(url, self._name(index))
+
+    def measure(self, index: int) -> float:
+        engine = get_engine(self.urls[index], self._name(index))
+        with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+            # Stand-ins without replication (e.g. a SQLite copy) are never behind
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def check(self) -> None:
+        """Measure every replica's lag"""
+        for index, url in enumerate(self.urls):
+            try:
+                lag = self.measure(index)
+            except Exception as e:
+                logger.warning(f"Replica {self._name(index)} is unreachable: {str(e)}")
+                lag = None
+            if lag is not None and lag > self.max_lag and (self.lag[url] or 0) <= self.max_lag:
+                logger.warning(f"Replica {self._name(index)} is {lag:.1f}s behind, reading from the primary")
+            self.lag[url] = lag
+            metrics.update_replica_lag(self._name(index), lag)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error(f"Error checking replica lag: {str(e)}")
+            await asyncio.sleep(LAG_CHECK_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        """Start measuring lag on the running event loop; replicas get no reads until measured"""
+        if self.urls and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+replicas = ReplicaSet(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    settings.REPLICA_MAX_LAG_SECONDS
+)
+
+class RoutingSession(Session):
+    """
+    Session for read-only endpoints: plain SELECTs go to a replica, everything
+    else (flushes, writes, SELECT ... FOR UPDATE, raw SQL) to the primary it is
+    bound to. Once it has written, or the request is pinned, it reads from the
+    primary too.
+    """
+
+    _async = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._flushing or self.info.get("wrote") or self.info.get("primary") or primary_required():
+            target = primary
+        elif not isinstance(clause, Select) or clause._for_update_arg is not None:
+            target = primary
+        else:
+            target = replicas.pick(self._async) or primary
+        metrics.track_routed_read("primary" if target is primary else "replica")
+        return target
+
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession behind an AsyncSession: binds are the sync side of async engines"""
+
+    _async = True
+
+# Write tracking for every session, routed or not: a commit that wrote pins the request
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("wrote", False):
+        session.info["primary"] = True
+        record_write()
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("wrote", None)
@@ -1,18 +1,48 @@
-from sqlalchemy import create_engine
+from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.engine import get_async_engine, get_engine
+from app.db.routing import AsyncRoutingSession, RoutingSession
 
 # Main database connection
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = get_engine(SQLALCHEMY_DATABASE_URL, "main")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async connection to the same database, for handlers that must not block the event loop.
+# expire_on_commit=False keeps loaded attributes readable after commit without a lazy refresh,
+# which an AsyncSession cannot do implicitly.
+async_engine = get_async_engine(SQLALCHEMY_DATABASE_URL, "main")
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read-only endpoints: SELECTs go to a read replica when one is configured and
+# caught up (see app.db.routing), writes and pinned requests to the primary
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+)
+
 # Add this dependency function for FastAPI
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
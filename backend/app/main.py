@@ -1,9 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.api.v1.websocket import router as websocket_router
-from app.core.database import init_db, engine, Base
+from app.core.database import init_db, engine, Base, SessionLocal
+from app.services.trending_service import trending_engine
+from app.services.metrics_rollup_service import metrics_rollup
+from app.services.outbox_service import outbox_worker
+from app.core.cache import cache
+from app.core.middleware import ReadYourWritesMiddleware
+from app.db.routing import replicas
+from app.core.http_clients import http_clients
+from app.core.websocket_manager import manager
 from app.db.base import Base
 import logging
 
@@ -48,6 +57,9 @@ app.add_middleware(
     allow_origin_regex="https?://.*"  # Allow any HTTP/HTTPS origin during testing
 )
 
+# Read-your-writes tracking for read-replica routing
+app.add_middleware(ReadYourWritesMiddleware)
+
 # Include WebSocket router first (without prefix)
 logger.info("Registering WebSocket routes")
 app.include_router(websocket_router)
@@ -56,6 +68,9 @@ app.include_router(websocket_router)
 logger.info("Registering API routes")
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Prometheus metrics (cache hit ratios among others)
+app.mount("/metrics", make_asgi_app())
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Application starting up...")
@@ -70,6 +85,34 @@ async def startup_event():
         logger.error(f"Error initializing database: {e}")
         raise
 
+    # Periodically rebuild the trending rankings from the activity buckets
+    trending_engine.start(SessionLocal)
+
+    # Keep the hourly/daily marketplace metrics rollup current
+    metrics_rollup.start(SessionLocal)
+
+    # Evict local cache entries invalidated by other workers
+    cache.start()
+
+    # Measure read replica lag (no-op without DATABASE_REPLICA_URLS)
+    replicas.start()
+
+    # Deliver purchase emails and other side effects recorded in the outbox
+    outbox_worker.start(SessionLocal)
+
+    # Relay WebSocket broadcasts published by other workers
+    manager.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await trending_engine.stop()
+    await metrics_rollup.stop()
+    await replicas.stop()
+    await outbox_worker.stop()
+    await manager.close()
+    await cache.close()
+    await http_clients.close()
+
 @app.get("/health")
 async def health_check():
     return {
@@ -7,6 +7,16 @@ from app.models.admin import Admin
 from app.models.code_view import CodeView
 from app.models.code_purchase import CodePurchase
 from app.models.code_rating import CodeRating
+from app.models.code_stats import CodeStats
+from app.models.code_activity_bucket import CodeActivityBucket
+from app.models.marketplace_metric import MarketplaceMetric
+from app.models.outbox_message import OutboxMessage
+from app.models.sync_change import SyncChange
+
+# Registers the after_flush listener that logs changes for delta sync. Every
+# process that writes through the models loads this package (the admin apps
+# included), so their writes reach sync_changes too.
+import app.services.sync_service  # noqa: F401
 
 __all__ = [
     "User",
@@ -17,5 +27,10 @@ __all__ = [
     "Admin",
     "CodeView",
     "CodePurchase",
-    "CodeRating"
+    "CodeRating",
+    "CodeStats",
+    "CodeActivityBucket",
+    "MarketplaceMetric",
+    "OutboxMessage",
+    "SyncChange"
 ]
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, CheckConstraint, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, CheckConstraint, Enum, JSON, Boolean, Index, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
 from app.db.base_class import Base
 from sqlalchemy.ext.declarative import declared_attr
 import app.models.code_analysis as code_analysis_model  # Import at module level
@@ -51,6 +51,15 @@ class BettingCode(Base):
     views = relationship("CodeView", back_populates="betting_code")
     purchases = relationship("CodePurchase", back_populates="betting_code")
     ratings = relationship("CodeRating", back_populates="betting_code")
+    stats = relationship("CodeStats", back_populates="betting_code", uselist=False)
+
+    @classmethod
+    def list_options(cls):
+        """
+        Loader options for queries whose results go through to_dict().
+        Fetches every code's analysis in one batched SELECT instead of one per code.
+        """
+        return (selectinload(cls.analysis),)
 
     def to_dict(self):
         """Convert model to dictionary"""
@@ -94,4 +103,21 @@ class BettingCode(Base):
         CheckConstraint('win_probability >= 0 AND win_probability <= 100', name='check_win_probability'),
         CheckConstraint('expected_odds >= 1.0', name='check_expected_odds'),
         CheckConstraint('min_stake >= 0', name='check_min_stake'),
+
+        # Marketplace listing: country + live listing filters, newest first
+        Index(
+            'ix_betting_codes_marketplace_live',
+            'user_country', 'created_at', 'id',
+            postgresql_where=text("is_published AND marketplace_status = 'active' AND status = 'approved'"),
+            sqlite_where=text("is_published = 1 AND marketplace_status = 'active' AND status = 'approved'"),
+            postgresql_include=['valid_until', 'price', 'win_probability', 'expected_odds'],
+            postgresql_ops={'created_at': 'DESC NULLS LAST', 'id': 'DESC'}
+        ),
+        # status trails so the marketplace stats aggregate is answered from the index alone
+        Index('ix_betting_codes_country_marketplace_stats', 'user_country', 'marketplace_status', 'valid_until', 'status'),
+        Index('ix_betting_codes_country_analysis_status', 'user_country', 'analysis_status', 'created_at'),
+        Index('ix_betting_codes_country_status', 'user_country', 'status'),
+        Index('ix_betting_codes_user_id', 'user_id'),
+        # Range scans of the marketplace metrics rollup
+        Index('ix_betting_codes_created_at', 'created_at'),
     )
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
+from app.db.base_class import Base
+
+class CodeActivityBucket(Base):
+    """Hourly view/purchase/rating counts per code, used to compute trending scores"""
+    __tablename__ = "code_activity_buckets"
+
+    code_id = Column(Integer, ForeignKey("betting_codes.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # Truncated to the hour
+    views = Column(Integer, nullable=False, default=0, server_default="0")
+    purchases = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index('ix_code_activity_buckets_bucket_start', 'bucket_start'),
+    )
+
+    def to_dict(self):
+        return {
+            "code_id": self.code_id,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "views": self.views,
+            "purchases": self.purchases,
+            "rating_sum": self.rating_sum,
+            "rating_count": self.rating_count
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, Float, String
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -21,6 +21,11 @@ class CodePurchase(Base):
     betting_code = relationship("BettingCode", back_populates="purchases")
     buyer = relationship("User")
 
+    __table_args__ = (
+        Index('ix_code_purchases_code_id_purchased_at', 'code_id', 'purchased_at'),
+        Index('ix_code_purchases_purchased_at', 'purchased_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
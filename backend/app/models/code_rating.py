@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, String, Text
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, Float, String, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -17,6 +17,10 @@ class CodeRating(Base):
     betting_code = relationship("BettingCode", back_populates="ratings")
     rater = relationship("User")
 
+    __table_args__ = (
+        Index('ix_code_ratings_code_id_created_at', 'code_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class CodeStats(Base):
+    """Per-code rollup of views, purchases and ratings, maintained incrementally"""
+    __tablename__ = "code_stats"
+
+    code_id = Column(Integer, ForeignKey("betting_codes.id", ondelete="CASCADE"), primary_key=True)
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
+    purchase_count = Column(Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(Float, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_viewed_at = Column(DateTime(timezone=True), nullable=True)
+    last_purchased_at = Column(DateTime(timezone=True), nullable=True)
+    last_rated_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    betting_code = relationship("BettingCode", back_populates="stats")
+
+    __table_args__ = (
+        Index('ix_code_stats_purchase_count', 'purchase_count'),
+    )
+
+    @property
+    def avg_rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    def to_dict(self):
+        return {
+            "code_id": self.code_id,
+            "view_count": self.view_count,
+            "purchase_count": self.purchase_count,
+            "revenue": self.revenue,
+            "rating_sum": self.rating_sum,
+            "rating_count": self.rating_count,
+            "avg_rating": self.avg_rating,
+            "last_viewed_at": self.last_viewed_at.isoformat() if self.last_viewed_at else None,
+            "last_purchased_at": self.last_purchased_at.isoformat() if self.last_purchased_at else None,
+            "last_rated_at": self.last_rated_at.isoformat() if self.last_rated_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -14,6 +14,10 @@ class CodeView(Base):
     betting_code = relationship("BettingCode", back_populates="views")
     viewer = relationship("User")
 
+    __table_args__ = (
+        Index('ix_code_views_code_id_viewed_at', 'code_id', 'viewed_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
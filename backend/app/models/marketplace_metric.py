@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from app.db.base_class import Base
+
+class MarketplaceMetric(Base):
+    """
+    Hourly and daily marketplace totals per country, category and bookmaker,
+    rebuilt from betting_codes and code_purchases by the metrics rollup job.
+    Unknown categories/bookmakers are stored as ''.
+    """
+    __tablename__ = "marketplace_metrics"
+
+    granularity = Column(String(4), primary_key=True)  # 'hour' or 'day'
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    country = Column(String(50), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    bookmaker = Column(String(50), primary_key=True)
+
+    # Purchases made in the bucket
+    sales = Column(Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(Float, nullable=False, default=0, server_default="0")
+
+    # Published codes created in the bucket
+    new_listings = Column(Integer, nullable=False, default=0, server_default="0")
+    listing_price_sum = Column(Float, nullable=False, default=0, server_default="0")
+    listing_price_count = Column(Integer, nullable=False, default=0, server_default="0")
+    listing_price_min = Column(Float, nullable=True)
+    listing_price_max = Column(Float, nullable=True)
+
+    # All codes created in the bucket, and how many of them have won
+    codes_created = Column(Integer, nullable=False, default=0, server_default="0")
+    codes_won = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_marketplace_metrics_country_bucket', 'country', 'granularity', 'bucket_start'),
+    )
+
+    def to_dict(self):
+        return {
+            "granularity": self.granularity,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "country": self.country,
+            "category": self.category,
+            "bookmaker": self.bookmaker,
+            "sales": self.sales,
+            "revenue": self.revenue,
+            "new_listings": self.new_listings,
+            "listing_price_sum": self.listing_price_sum,
+            "listing_price_count": self.listing_price_count,
+            "listing_price_min": self.listing_price_min,
+            "listing_price_max": self.listing_price_max,
+            "codes_created": self.codes_created,
+            "codes_won": self.codes_won,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class OutboxMessage(Base):
+    """
+    Side effect (e.g. a purchase email) recorded in the same transaction as the
+    change that causes it and carried out afterwards by the outbox worker.
+    Times are naive UTC.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # selects the handler in app.services.outbox_service
+    payload = Column(JSON, nullable=False)
+    status = Column(String(10), nullable=False, default="pending", server_default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Earliest time of the next attempt; pushed forward while a worker holds the message
+    available_at = Column(DateTime, nullable=False, server_default=func.now())
+    claim_token = Column(String(36), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_outbox_messages_status_available_at', 'status', 'available_at'),
+        Index('ix_outbox_messages_claim_token', 'claim_token'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "available_at": self.available_at.isoformat() if self.available_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None
+        }
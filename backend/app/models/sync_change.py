@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class SyncChange(Base):
+    """
+    Latest change to one of a user's synced records (a betting code, a payment
+    or their account settings), stamped with the user's next sync version. One
+    row per record, so repeated edits collapse into one update and deletions
+    leave a tombstone. Written by app.services.sync_service; times are naive UTC.
+    """
+    __tablename__ = "sync_changes"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String(20), nullable=False)  # code, payment, settings
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False, server_default='0')
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'entity', 'entity_id', name='uq_sync_changes_user_entity'),
+        Index('ix_sync_changes_user_version', 'user_id', 'version'),
+    )
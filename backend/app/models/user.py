@@ -20,6 +20,8 @@ class User(Base):
     payment_status = Column(String, server_default='pending')
     payment_reference = Column(String, nullable=True)
     status = Column(String(50), server_default='active', nullable=False)
+    # Last version handed out to this user's changes (see app.services.sync_service)
+    sync_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     # Add check constraint for status values
     __table_args__ = (
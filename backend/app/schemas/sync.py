@@ -2,9 +2,13 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
 class SyncRequest(BaseModel):
-    lastSync: str
-    version: str
+    lastSync: Optional[str] = None
+    version: Optional[str] = None
+    # cursor of the previous response ("<user id>:<version>"); none syncs everything
+    cursor: Optional[str] = None
 
 class SyncResponse(BaseModel):
     updates: List[Dict[str, Any]]
-    newVersion: str 
\ No newline at end of file
+    newVersion: str
+    cursor: str
+    hasMore: bool = False
@@ -1,4 +1,5 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.models.activity import Activity
@@ -9,7 +10,7 @@ from app.core.websocket_manager import manager
 class ActivityService:
     @staticmethod
     async def create_activity(
-        db: Session,
+        db: Union[Session, AsyncSession],
         user_id: int,
         activity_type: str,
         description: str,
@@ -38,8 +39,12 @@ class ActivityService:
         )
         
         db.add(activity)
-        db.commit()
-        db.refresh(activity)
+        if isinstance(db, AsyncSession):
+            await db.commit()
+            await db.refresh(activity)
+        else:
+            db.commit()
+            db.refresh(activity)
 
         if notify:
             # Notify user
@@ -0,0 +1,183 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, func, select, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.code_stats import CodeStats
+from app.models.code_view import CodeView
+from app.models.code_purchase import CodePurchase
+from app.models.code_rating import CodeRating
+from app.models.code_activity_bucket import CodeActivityBucket
+from app.services.trending_service import trending_engine, bucket_start
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CodeStatsService:
+    """
+    Keeps the code_stats rollup in step with code_views, code_purchases and code_ratings.
+    The record_* methods only stage the change; the caller commits it together with
+    the view/purchase/rating row so both land in the same transaction.
+    """
+
+    @staticmethod
+    def _upsert_increment(
+        db: Session,
+        model,
+        key: Dict[str, object],
+        increments: Dict[str, float],
+        values: Dict[str, object]
+    ) -> None:
+        """Add increments to the row identified by key, creating it if missing"""
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert(model).values(**key, **increments, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[getattr(model, name) for name in key],
+                set_={
+                    **{name: getattr(model, name) + amount for name, amount in increments.items()},
+                    **values
+                }
+            )
+            db.execute(stmt)
+            return
+
+        query = db.query(model)
+        for name, value in key.items():
+            query = query.filter(getattr(model, name) == value)
+        updated = query.update(
+            {
+                **{getattr(model, name): getattr(model, name) + amount for name, amount in increments.items()},
+                **values
+            },
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(model(**key, **increments, **values))
+
+    @staticmethod
+    def _bump(
+        db: Session,
+        code_id: int,
+        increments: Dict[str, float],
+        timestamps: Dict[str, datetime],
+        bucket_increments: Dict[str, float]
+    ) -> None:
+        now = datetime.utcnow()
+        CodeStatsService._upsert_increment(
+            db, CodeStats, {"code_id": code_id}, increments, {**timestamps, "updated_at": now}
+        )
+        # Hourly bucket feeding the trending rankings
+        CodeStatsService._upsert_increment(
+            db, CodeActivityBucket, {"code_id": code_id, "bucket_start": bucket_start(now)}, bucket_increments, {}
+        )
+        # Fed to the live trending scores once the transaction commits
+        db.info.setdefault("trending_events", []).append((
+            code_id,
+            bucket_increments.get("views", 0),
+            bucket_increments.get("purchases", 0),
+            bucket_increments.get("rating_sum", 0.0)
+        ))
+
+    @staticmethod
+    def record_view(db: Session, code_id: int, viewer_id: Optional[int] = None) -> CodeView:
+        now = datetime.utcnow()
+        view = CodeView(code_id=code_id, viewer_id=viewer_id, viewed_at=now)
+        db.add(view)
+        CodeStatsService._bump(db, code_id, {"view_count": 1}, {"last_viewed_at": now}, {"views": 1})
+        return view
+
+    @staticmethod
+    def record_purchase(db: Session, purchase: CodePurchase) -> None:
+        """Count a purchase that has been added to the session"""
+        CodeStatsService._bump(
+            db,
+            purchase.code_id,
+            {"purchase_count": 1, "revenue": float(purchase.amount or 0)},
+            {"last_purchased_at": purchase.purchased_at or datetime.utcnow()},
+            {"purchases": 1}
+        )
+
+    @staticmethod
+    def record_rating(db: Session, code_id: int, rating: float, previous: Optional[float] = None) -> None:
+        """Count a new rating, or apply the difference when an existing rating changes"""
+        if previous is None:
+            increments = {"rating_sum": rating, "rating_count": 1}
+            bucket_increments = {"rating_sum": rating, "rating_count": 1}
+        else:
+            increments = {"rating_sum": rating - previous}
+            # Re-rating counts as fresh activity at the new value
+            bucket_increments = {"rating_sum": rating}
+        CodeStatsService._bump(db, code_id, increments, {"last_rated_at": datetime.utcnow()}, bucket_increments)
+
+    @staticmethod
+    def rebuild(db: Session, code_ids: Optional[Iterable[int]] = None) -> int:
+        """Recompute rollup rows from the raw tables (all codes, or only code_ids)"""
+        code_ids = list(code_ids) if code_ids is not None else None
+
+        def scoped(query, column):
+            return query.where(column.in_(code_ids)) if code_ids is not None else query
+
+        views = db.execute(scoped(
+            select(CodeView.code_id, func.count(CodeView.id), func.max(CodeView.viewed_at))
+            .group_by(CodeView.code_id),
+            CodeView.code_id
+        )).all()
+        purchases = db.execute(scoped(
+            select(
+                CodePurchase.code_id,
+                func.count(CodePurchase.id),
+                func.coalesce(func.sum(CodePurchase.amount), 0),
+                func.max(CodePurchase.purchased_at)
+            ).group_by(CodePurchase.code_id),
+            CodePurchase.code_id
+        )).all()
+        ratings = db.execute(scoped(
+            select(
+                CodeRating.code_id,
+                func.count(CodeRating.id),
+                func.coalesce(func.sum(CodeRating.rating), 0),
+                func.max(func.coalesce(CodeRating.updated_at, CodeRating.created_at))
+            ).group_by(CodeRating.code_id),
+            CodeRating.code_id
+        )).all()
+
+        now = datetime.utcnow()
+        rows: Dict[int, CodeStats] = {}
+
+        def row(code_id: int) -> CodeStats:
+            if code_id not in rows:
+                rows[code_id] = CodeStats(
+                    code_id=code_id, view_count=0, purchase_count=0, revenue=0,
+                    rating_sum=0, rating_count=0, updated_at=now
+                )
+            return rows[code_id]
+
+        for code_id, count, last_at in views:
+            stats = row(code_id)
+            stats.view_count, stats.last_viewed_at = count, last_at
+        for code_id, count, revenue, last_at in purchases:
+            stats = row(code_id)
+            stats.purchase_count, stats.revenue, stats.last_purchased_at = count, float(revenue), last_at
+        for code_id, count, total, last_at in ratings:
+            stats = row(code_id)
+            stats.rating_count, stats.rating_sum, stats.last_rated_at = count, float(total), last_at
+
+        db.execute(scoped(delete(CodeStats), CodeStats.code_id))
+        db.add_all(rows.values())
+        db.commit()
+
+        logger.info(f"Rebuilt code stats for {len(rows)} codes")
+        return len(rows)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for code_id, views, purchases, rating_sum in session.info.pop("trending_events", ()):
+        trending_engine.record_event(code_id, views=views, purchases=purchases, rating_sum=rating_sum)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("trending_events", None)
@@ -0,0 +1,289 @@
+from typing import Iterator, Optional
+from sqlalchemy import Float, and_, case, cast, delete, func, insert, literal, null, select, text, union_all
+from sqlalchemy.orm import Session
+from app.models.betting_code import BettingCode
+from app.models.code_purchase import CodePurchase
+from app.models.marketplace_metric import MarketplaceMetric
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Hourly rows only serve the 24h view; older ones are pruned
+HOURLY_RETENTION = timedelta(days=7)
+
+# Codes keep being settled (won/lost) after the bucket they were created in,
+# so day buckets this far back are recomputed on every refresh
+SETTLEMENT_WINDOW = timedelta(days=7)
+
+# Backfills rebuild day buckets in chunks of this size, one transaction each
+BACKFILL_CHUNK = timedelta(days=30)
+
+REFRESH_INTERVAL_SECONDS = 300
+
+# Lets a single worker refresh at a time on Postgres
+ADVISORY_LOCK_ID = 0x6D6B7472
+
+METRIC_COLUMNS = (
+    "sales", "revenue", "new_listings", "listing_price_sum", "listing_price_count",
+    "listing_price_min", "listing_price_max", "codes_created", "codes_won",
+)
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing moment"""
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+def _bucket_expr(column, granularity: str, dialect: str):
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    # Same text layout SQLAlchemy uses for SQLite datetimes, so comparisons stay lexical
+    layout = "%Y-%m-%d %H:00:00.000000" if granularity == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return func.strftime(layout, column)
+
+def _dimensions():
+    return (
+        func.lower(func.coalesce(BettingCode.user_country, "")).label("country"),
+        func.coalesce(BettingCode.category, "").label("category"),
+        func.coalesce(BettingCode.bookmaker, "").label("bookmaker"),
+    )
+
+def _no_price():
+    return cast(null(), Float)
+
+class MetricsRollup:
+    """
+    Maintains marketplace_metrics: hourly and daily totals per country,
+    category and bookmaker. Buckets are recomputed from the source tables
+    (delete + insert from a GROUP BY), so refreshing a range is idempotent.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def rebuild(self, db: Session, granularity: str, start: datetime, end: datetime) -> int:
+        """
+        Recompute the buckets of granularity in [start, end). Both ends are
+        rounded down to bucket boundaries. Does not commit. Returns rows written.
+        """
+        start, end = truncate(start, granularity), truncate(end, granularity)
+        if start >= end:
+            return 0
+        dialect = db.get_bind().dialect.name
+
+        purchased = _bucket_expr(CodePurchase.purchased_at, granularity, dialect)
+        sales = (
+            select(
+                *_dimensions(),
+                purchased.label("bucket_start"),
+                literal(1).label("sales"),
+                CodePurchase.amount.label("revenue"),
+                literal(0).label("new_listings"),
+                literal(0.0).label("listing_price_sum"),
+                literal(0).label("listing_price_count"),
+                _no_price().label("listing_price_min"),
+                _no_price().label("listing_price_max"),
+                literal(0).label("codes_created"),
+                literal(0).label("codes_won"),
+            )
+            .join(BettingCode, BettingCode.id == CodePurchase.code_id)
+            .where(
+                CodePurchase.status == 'completed',
+                CodePurchase.purchased_at >= start,
+                CodePurchase.purchased_at < end
+            )
+        )
+
+        listed = and_(BettingCode.is_published == True, BettingCode.price != None)
+        listed_price = case((listed, BettingCode.price), else_=None)
+        created = _bucket_expr(BettingCode.created_at, granularity, dialect)
+        codes = (
+            select(
+                *_dimensions(),
+                created.label("bucket_start"),
+                literal(0).label("sales"),
+                literal(0.0).label("revenue"),
+                case((BettingCode.is_published == True, 1), else_=0).label("new_listings"),
+                func.coalesce(listed_price, 0.0).label("listing_price_sum"),
+                case((listed, 1), else_=0).label("listing_price_count"),
+                listed_price.label("listing_price_min"),
+                listed_price.label("listing_price_max"),
+                literal(1).label("codes_created"),
+                case((BettingCode.status == 'won', 1), else_=0).label("codes_won"),
+            )
+            .where(BettingCode.created_at >= start, BettingCode.created_at < end)
+        )
+
+        events = union_all(sales, codes).subquery()
+        grouped = (
+            select(
+                literal(granularity),
+                events.c.bucket_start,
+                events.c.country,
+                events.c.category,
+                events.c.bookmaker,
+                func.sum(events.c.sales),
+                func.sum(events.c.revenue),
+                func.sum(events.c.new_listings),
+                func.sum(events.c.listing_price_sum),
+                func.sum(events.c.listing_price_count),
+                func.min(events.c.listing_price_min),
+                func.max(events.c.listing_price_max),
+                func.sum(events.c.codes_created),
+                func.sum(events.c.codes_won),
+                literal(datetime.utcnow()),
+            )
+            .group_by(events.c.bucket_start, events.c.country, events.c.category, events.c.bookmaker)
+        )
+
+        db.execute(
+            delete(MarketplaceMetric)
+            .where(
+                MarketplaceMetric.granularity == granularity,
+                MarketplaceMetric.bucket_start >= start,
+                MarketplaceMetric.bucket_start < end
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = db.execute(
+            insert(MarketplaceMetric).from_select(
+                ["granularity", "bucket_start", "country", "category", "bookmaker",
+                 *METRIC_COLUMNS, "updated_at"],
+                grouped
+            )
+        )
+        return result.rowcount or 0
+
+    def _try_lock(self, db: Session) -> bool:
+        """Transaction-scoped lock so concurrent workers do not rebuild the same buckets"""
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID}).scalar())
+
+    def refresh(self, db: Session, now: Optional[datetime] = None) -> None:
+        """
+        Recompute the recent buckets: the last two hours, the day buckets of the
+        settlement window, and prune hourly rows past their retention.
+        Backfills all history instead if the table is still empty.
+        """
+        now = now or datetime.utcnow()
+        try:
+            if not self._try_lock(db):
+                return
+            if db.query(MarketplaceMetric.granularity).first() is None:
+                rows = sum(self._backfill_chunks(db, None, now))
+                db.commit()
+                logger.info(f"Marketplace metrics backfilled ({rows} rows)")
+                return
+
+            hours = self.rebuild(db, "hour", now - timedelta(hours=2), now + GRANULARITIES["hour"])
+            days = self.rebuild(db, "day", now - SETTLEMENT_WINDOW, now + GRANULARITIES["day"])
+            db.execute(
+                delete(MarketplaceMetric)
+                .where(
+                    MarketplaceMetric.granularity == "hour",
+                    MarketplaceMetric.bucket_start < truncate(now - HOURLY_RETENTION, "hour")
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Marketplace metrics refreshed ({hours} hourly, {days} daily rows)")
+
+    def backfill(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """
+        Rebuild day buckets over [start, end) (default: all history up to now)
+        and hour buckets over the part of it inside the hourly retention.
+        Commits after every chunk so an interrupted backfill keeps its progress.
+        Returns rows written.
+        """
+        rows = 0
+        try:
+            for written in self._backfill_chunks(db, start, end or datetime.utcnow()):
+                db.commit()
+                rows += written
+        except Exception:
+            db.rollback()
+            raise
+        logger.info(f"Marketplace metrics backfilled ({rows} rows)")
+        return rows
+
+    def _backfill_chunks(self, db: Session, start: Optional[datetime], end: datetime) -> Iterator[int]:
+        """Rebuild [start, end) chunk by chunk, yielding the rows written by each"""
+        if start is None:
+            earliest = [
+                db.query(func.min(BettingCode.created_at)).scalar(),
+                db.query(func.min(CodePurchase.purchased_at)).scalar(),
+            ]
+            earliest = [moment.replace(tzinfo=None) for moment in earliest if moment is not None]
+            if not earliest:
+                return
+            start = min(earliest)
+
+        chunks = [("hour", max(start, end - HOURLY_RETENTION), end + GRANULARITIES["hour"])]
+        chunk_start = truncate(start, "day")
+        while chunk_start <= end:
+            chunk_end = chunk_start + BACKFILL_CHUNK
+            chunks.append(("day", chunk_start, min(chunk_end, end + GRANULARITIES["day"])))
+            chunk_start = chunk_end
+
+        for granularity, chunk_start, chunk_end in chunks:
+            yield self.rebuild(db, granularity, chunk_start, chunk_end)
+
+    @staticmethod
+    def granularity_for(since: datetime, now: Optional[datetime] = None) -> str:
+        """Hour buckets for windows up to two days, day buckets beyond"""
+        now = now or datetime.utcnow()
+        return "hour" if now - since <= timedelta(days=2) else "day"
+
+    @staticmethod
+    def window(db: Session, country: str, since: datetime):
+        """
+        Query over the buckets of country from since onwards, at the coarsest
+        granularity that still lines up with since.
+        """
+        granularity = MetricsRollup.granularity_for(since)
+        return db.query(MarketplaceMetric).filter(
+            MarketplaceMetric.country == country,
+            MarketplaceMetric.granularity == granularity,
+            MarketplaceMetric.bucket_start >= truncate(since, granularity)
+        )
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            try:
+                db = session_factory()
+                try:
+                    await asyncio.to_thread(self.refresh, db)
+                finally:
+                    db.close()
+            except Exception as e:
+                logger.error(f"Error refreshing marketplace metrics: {str(e)}")
+            await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+
+    def start(self, session_factory) -> None:
+        """Start the periodic refresher on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+metrics_rollup = MetricsRollup()
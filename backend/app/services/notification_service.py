@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 import os
 import logging
-import requests
+from app.core.http_clients import http_clients
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,13 +14,13 @@ logger = logging.getLogger(__name__)
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL", "noreply@kilcode.com")
 
-def send_email(
+async def send_email(
     to_email: str,
     subject: str,
     html_content: str,
     text_content: Optional[str] = None
 ) -> bool:
-    """Send an email using Resend"""
+    """Send an email using Resend over the shared keep-alive client"""
     if not RESEND_API_KEY:
         logger.error("Resend API key not configured")
         return False
@@ -51,7 +51,7 @@ def send_email(
             email_data["text"] = text_content
             
         # Send request to Resend API
-        response = requests.post(
+        response = await http_clients.get('resend').post(
             'https://api.resend.com/emails',
             headers=headers,
             json=email_data
@@ -70,7 +70,7 @@ def send_email(
         logger.error(f"Error sending email: {str(e)}")
         return False
 
-def send_code_purchase_email(
+async def send_code_purchase_email(
     to_email: str,
     code_details: Dict[str, Any]
 ) -> bool:
@@ -178,7 +178,7 @@ def send_code_purchase_email(
         This is an automated message, please do not reply to this email.
         """
         
-        return send_email(to_email, subject, html_content, text_content)
+        return await send_email(to_email, subject, html_content, text_content)
     except Exception as e:
         logger.error(f"Error preparing email content: {str(e)}")
         logger.error(f"Code details: {code_details}")
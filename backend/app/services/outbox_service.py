@@ -0,0 +1,229 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import time
+import uuid
+import random
+import asyncio
+import logging
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import Session
+from app.core.monitoring import metrics
+from app.models.outbox_message import OutboxMessage
+from app.services.notification_service import send_code_purchase_email, send_email
+
+logger = logging.getLogger(__name__)
+
+# Messages claimed (and delivered concurrently) per round
+BATCH_SIZE = 50
+
+# Commits that enqueue wake the worker at once; this only bounds how late
+# retries and messages committed by other processes are picked up
+POLL_INTERVAL_SECONDS = 5
+
+# A claimed message becomes due again if its worker has not reported back by
+# then (e.g. it was killed mid-batch), so delivery is at least once
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Retries back off exponentially from RETRY_BASE_SECONDS, with jitter, up to
+# RETRY_MAX_SECONDS; after MAX_ATTEMPTS a message is marked failed
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 3600
+
+# Sent messages are kept this long for inspection
+SENT_RETENTION = timedelta(days=7)
+PRUNE_INTERVAL_SECONDS = 3600
+
+async def _purchase_email(payload: Dict[str, Any]) -> bool:
+    return await send_code_purchase_email(payload["to_email"], payload["code_details"])
+
+async def _email(payload: Dict[str, Any]) -> bool:
+    return await send_email(payload["to_email"], payload["subject"], payload["html"], payload.get("text"))
+
+# kind -> coroutine carrying out the payload; False or an exception means retry
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[bool]]] = {
+    "purchase_email": _purchase_email,
+    "email": _email,
+}
+
+def enqueue(db: Session, kind: str, payload: Dict[str, Any]) -> OutboxMessage:
+    """Add a message to db's transaction; it is delivered once that commits"""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown outbox message kind: {kind}")
+    now = datetime.utcnow()
+    message = OutboxMessage(kind=kind, payload=payload, available_at=now, created_at=now)
+    db.add(message)
+    db.info["outbox"] = True
+    return message
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next try of a message that has failed attempts times"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+class OutboxWorker:
+    """
+    Delivers outbox messages in the background: claims a batch of due messages
+    under a lease (SKIP LOCKED on Postgres, so several workers can share the
+    table), runs their handlers concurrently and records each outcome.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pruned_at = 0.0
+
+    def claim(self, db: Session) -> List[Any]:
+        """Lease up to BATCH_SIZE due messages to this worker; rows of (id, kind, payload, attempts, created_at, token)"""
+        now = datetime.utcnow()
+        token = str(uuid.uuid4())
+        due = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == "pending", OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.available_at)
+            .limit(BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            db.execute(
+                update(OutboxMessage)
+                .where(
+                    OutboxMessage.id.in_(due),
+                    OutboxMessage.status == "pending",
+                    OutboxMessage.available_at <= now
+                )
+                .values(
+                    claim_token=token,
+                    available_at=now + CLAIM_LEASE,
+                    attempts=OutboxMessage.attempts + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = db.execute(
+                select(
+                    OutboxMessage.id, OutboxMessage.kind, OutboxMessage.payload,
+                    OutboxMessage.attempts, OutboxMessage.created_at, OutboxMessage.claim_token
+                ).where(OutboxMessage.claim_token == token)
+            ).all()
+            db.commit()
+            return rows
+        except Exception:
+            db.rollback()
+            raise
+
+    def finish(self, db: Session, results: List[Any]) -> None:
+        """Record (row, error or None) outcomes; a message whose lease was taken over is left alone"""
+        now = datetime.utcnow()
+        try:
+            for row, error in results:
+                mine = update(OutboxMessage).where(
+                    OutboxMessage.id == row.id,
+                    OutboxMessage.claim_token == row.claim_token
+                ).execution_options(synchronize_session=False)
+                if error is None:
+                    db.execute(mine.values(status="sent", sent_at=now, claim_token=None, last_error=None))
+                    metrics.track_outbox_message(row.kind, "sent", (now - row.created_at).total_seconds())
+                elif row.attempts >= MAX_ATTEMPTS:
+                    db.execute(mine.values(status="failed", claim_token=None, last_error=error))
+                    metrics.track_outbox_message(row.kind, "failed")
+                    logger.error(f"Outbox message {row.id} ({row.kind}) failed after {row.attempts} attempts: {error}")
+                else:
+                    db.execute(mine.values(
+                        available_at=now + timedelta(seconds=retry_delay(row.attempts)),
+                        claim_token=None,
+                        last_error=error
+                    ))
+                    metrics.track_outbox_message(row.kind, "retry")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def prune(self, db: Session) -> None:
+        try:
+            db.execute(
+                delete(OutboxMessage)
+                .where(OutboxMessage.status == "sent", OutboxMessage.sent_at < datetime.utcnow() - SENT_RETENTION)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    async def deliver(row) -> Optional[str]:
+        """Run the handler of a claimed message; the error, or None when it went through"""
+        try:
+            if await HANDLERS[row.kind](row.payload):
+                return None
+            return "handler reported failure"
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    async def drain(self, session_factory) -> int:
+        """Deliver one batch; returns how many messages it held"""
+        rows = await asyncio.to_thread(self._with_session, session_factory, self.claim)
+        if not rows:
+            return 0
+        errors = await asyncio.gather(*(self.deliver(row) for row in rows))
+        await asyncio.to_thread(self._with_session, session_factory, self.finish, list(zip(rows, errors)))
+        return len(rows)
+
+    @staticmethod
+    def _with_session(session_factory, method, *args):
+        db = session_factory()
+        try:
+            return method(db, *args)
+        finally:
+            db.close()
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            try:
+                if await self.drain(session_factory) == BATCH_SIZE:
+                    continue  # more are probably due
+                if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    await asyncio.to_thread(self._with_session, session_factory, self.prune)
+            except Exception as e:
+                logger.error(f"Error draining outbox: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def notify(self) -> None:
+        """Wake the worker; safe to call from any thread"""
+        if self._loop is not None and self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self, session_factory) -> None:
+        """Start draining on the running event loop"""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+outbox_worker = OutboxWorker()
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("outbox", False):
+        outbox_worker.notify()
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("outbox", None)
@@ -1,6 +1,7 @@
 from typing import Dict
 from app.models.transaction import Transaction
 from app.core.config import settings
+from app.core.http_clients import http_clients
 import httpx
 
 class MobileMoneyHandler:
@@ -29,37 +30,37 @@ class MobileMoneyHandler:
         if not provider_config:
             raise PaymentError(f"Unsupported provider: {self.provider}")
             
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "amount": str(transaction.amount),
-                "currency": "GHS",
-                "phone": phone,
-                "reference": transaction.payment_reference,
-                "callback_url": f"{settings.API_URL}/payments/{self.provider}/webhook",
-                "return_url": f"{settings.FRONTEND_URL}/payment/status"
+        client = http_clients.get('gateways')
+        payload = {
+            "amount": str(transaction.amount),
+            "currency": "GHS",
+            "phone": phone,
+            "reference": transaction.payment_reference,
+            "callback_url": f"{settings.API_URL}/payments/{self.provider}/webhook",
+            "return_url": f"{settings.FRONTEND_URL}/payment/status"
+        }
+
+        response = await client.post(
+            f"{provider_config['api_url']}/payments",
+            json=payload,
+            headers={
+                "Authorization": f"Bearer {provider_config['api_key']}",
+                "Content-Type": "application/json"
             }
-            
-            response = await client.post(
-                f"{provider_config['api_url']}/payments",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {provider_config['api_key']}",
-                    "Content-Type": "application/json"
-                }
-            )
-            
-            if response.status_code == 200:
-                return {
-                    "status": "pending",
-                    "payment_reference": transaction.payment_reference,
-                    "provider_reference": response.json().get("provider_reference"),
-                    "instructions": [
-                        f"You will receive a prompt on your {provider_config['name']} registered number",
-                        "Enter your PIN to authorize the payment",
-                        "Wait for confirmation message"
-                    ]
-                }
-            raise PaymentError(f"Failed to initialize {provider_config['name']} payment")
+        )
+
+        if response.status_code == 200:
+            return {
+                "status": "pending",
+                "payment_reference": transaction.payment_reference,
+                "provider_reference": response.json().get("provider_reference"),
+                "instructions": [
+                    f"You will receive a prompt on your {provider_config['name']} registered number",
+                    "Enter your PIN to authorize the payment",
+                    "Wait for confirmation message"
+                ]
+            }
+        raise PaymentError(f"Failed to initialize {provider_config['name']} payment")
 
 class ZeepayHandler:
     def __init__(self):
@@ -67,24 +68,24 @@ class ZeepayHandler:
         self.api_key = settings.ZEEPAY_API_KEY
         
     async def initialize_payment(self, transaction: Transaction, phone: str) -> Dict:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "amount": str(transaction.amount),
-                "currency": "GHS",
-                "phone": phone,
-                "reference": transaction.payment_reference,
-                "callback_url": f"{settings.API_URL}/payments/zeepay/webhook"
+        client = http_clients.get('gateways')
+        payload = {
+            "amount": str(transaction.amount),
+            "currency": "GHS",
+            "phone": phone,
+            "reference": transaction.payment_reference,
+            "callback_url": f"{settings.API_URL}/payments/zeepay/webhook"
+        }
+
+        response = await client.post(
+            f"{self.api_url}/payments",
+            json=payload,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
             }
-            
-            response = await client.post(
-                f"{self.api_url}/payments",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            raise PaymentError("Failed to initialize Zeepay payment") 
\ No newline at end of file
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        raise PaymentError("Failed to initialize Zeepay payment") 
\ No newline at end of file
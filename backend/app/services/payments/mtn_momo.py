@@ -1,8 +1,86 @@
 import os
+import time
 import uuid
-from typing import Optional
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 import httpx
 from fastapi import HTTPException
+from app.core.http_clients import http_clients
+from app.core.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# Fetch a new token this long before the current one expires, in the
+# background, while requests keep using the current one
+TOKEN_REFRESH_AHEAD_SECONDS = 300
+
+# Never hand out a token this close to expiry; it could lapse in flight
+TOKEN_EXPIRY_MARGIN_SECONDS = 30
+
+# Wait this long after a failed background refresh before trying again
+TOKEN_RETRY_SECONDS = 5
+
+class TokenManager:
+    """
+    Caches a provider access token for its lifetime instead of fetching one per
+    call. Once the token is within TOKEN_REFRESH_AHEAD_SECONDS of expiring,
+    callers still get it while a replacement is fetched in the background; only
+    a missing or nearly expired token makes them wait. Concurrent callers share
+    a single fetch.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Tuple[str, float]]]):
+        self.name = name
+        self.fetch = fetch  # -> (token, seconds until it expires)
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+        self._stale_at = 0.0
+        self._retry_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self) -> str:
+        now = time.monotonic()
+        if self._token is not None and now < self._stale_at:
+            if now >= self._refresh_at and now >= self._retry_at:
+                self._refresh("background")
+            return self._token
+        # shield: a caller giving up must not cancel the fetch the others wait on
+        return await asyncio.shield(self._refresh("blocking"))
+
+    def invalidate(self, token: str) -> None:
+        """Drop token (e.g. after the provider rejected it) unless already replaced"""
+        if self._token == token:
+            self._token = None
+
+    def _refresh(self, mode: str) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._fetch(mode))
+            self._task.add_done_callback(self._fetched)
+        return self._task
+
+    async def _fetch(self, mode: str) -> str:
+        started = time.monotonic()
+        try:
+            token, expires_in = await self.fetch()
+        except Exception:
+            metrics.track_token_refresh(self.name, mode, False)
+            self._retry_at = time.monotonic() + TOKEN_RETRY_SECONDS
+            raise
+        metrics.track_token_refresh(self.name, mode, True)
+        # Short-lived tokens refresh after 80% of their lifetime at the latest
+        self._refresh_at = started + expires_in - min(TOKEN_REFRESH_AHEAD_SECONDS, expires_in / 5)
+        self._stale_at = started + expires_in - min(TOKEN_EXPIRY_MARGIN_SECONDS, expires_in / 10)
+        self._token = token
+        return token
+
+    def _fetched(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to refresh {self.name} access token: {str(task.exception())}")
+
+# One manager per API user, shared by every MTNMoMoService
+_token_managers: Dict[Tuple[str, str], TokenManager] = {}
 
 class MTNMoMoService:
     def __init__(self):
@@ -12,24 +90,33 @@ class MTNMoMoService:
         self.api_key = os.getenv('MTN_API_KEY')
         self.environment = os.getenv('ENVIRONMENT', 'sandbox')
 
+        key = (self.api_url, self.api_user)
+        if key not in _token_managers:
+            _token_managers[key] = TokenManager('mtn_momo', self._fetch_auth_token)
+        self.tokens = _token_managers[key]
+
+    async def _fetch_auth_token(self) -> Tuple[str, float]:
+        client = http_clients.get('mtn_momo')
+        response = await client.post(
+            f"{self.api_url}/collection/token/",
+            headers={
+                'Ocp-Apim-Subscription-Key': self.subscription_key,
+                'Authorization': f"Basic {self._get_basic_auth()}"
+            }
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data['access_token'], float(data.get('expires_in', 3600))
+
     async def get_auth_token(self) -> str:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.api_url}/collection/token/",
-                    headers={
-                        'Ocp-Apim-Subscription-Key': self.subscription_key,
-                        'Authorization': f"Basic {self._get_basic_auth()}"
-                    }
-                )
-                response.raise_for_status()
-                return response.json()['access_token']
-            except httpx.HTTPError as e:
-                raise HTTPException(status_code=500, detail=f"Failed to get MTN auth token: {str(e)}")
+        try:
+            return await self.tokens.get()
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to get MTN auth token: {str(e)}")
 
     async def initialize_payment(self, amount: float, phone: str, currency: str = 'GHS', description: Optional[str] = None) -> dict:
         reference = f"TX-{uuid.uuid4()}"
-        
+
         payment_request = {
             "amount": str(amount),
             "currency": currency,
@@ -43,9 +130,9 @@ class MTNMoMoService:
         }
 
         try:
-            token = await self.get_auth_token()
-            
-            async with httpx.AsyncClient() as client:
+            client = http_clients.get('mtn_momo')
+            for attempt in range(2):
+                token = await self.get_auth_token()
                 response = await client.post(
                     f"{self.api_url}/collection/v1_0/requesttopay",
                     json=payment_request,
@@ -57,15 +144,19 @@ class MTNMoMoService:
                         'Content-Type': 'application/json'
                     }
                 )
-                response.raise_for_status()
-                
-                return {
-                    "status": "pending",
-                    "reference": reference,
-                    "amount": amount,
-                    "currency": currency,
-                    "phone": phone
-                }
+                if response.status_code != 401 or attempt:
+                    break
+                # Revoked or expired early: fetch a new token and retry once
+                self.tokens.invalidate(token)
+            response.raise_for_status()
+
+            return {
+                "status": "pending",
+                "reference": reference,
+                "amount": amount,
+                "currency": currency,
+                "phone": phone
+            }
 
         except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"MTN MoMo payment failed: {str(e)}")
@@ -73,4 +164,4 @@ class MTNMoMoService:
     def _get_basic_auth(self) -> str:
         import base64
         credentials = f"{self.api_user}:{self.api_key}"
-        return base64.b64encode(credentials.encode()).decode() 
\ No newline at end of file
+        return base64.b64encode(credentials.encode()).decode()
@@ -1,6 +1,7 @@
 from typing import Dict
 from app.models.transaction import Transaction
 from app.core.config import settings
+from app.core.http_clients import http_clients
 import httpx
 from datetime import datetime, timedelta
 
@@ -11,35 +12,35 @@ class PaystackHandler:
         self.secret_key = settings.PAYSTACK_SECRET_KEY
         
     async def initialize_payment(self, transaction: Transaction, email: str) -> Dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.BASE_URL}/transaction/initialize",
-                json={
-                    "email": email,
-                    "amount": int(transaction.amount * 100),  # Convert to kobo
-                    "reference": transaction.payment_reference,
-                    "callback_url": f"{settings.FRONTEND_URL}/payment/verify"
-                },
-                headers={
-                    "Authorization": f"Bearer {self.secret_key}",
-                    "Content-Type": "application/json"
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            raise PaymentError("Failed to initialize Paystack payment")
+        client = http_clients.get('paystack')
+        response = await client.post(
+            f"{self.BASE_URL}/transaction/initialize",
+            json={
+                "email": email,
+                "amount": int(transaction.amount * 100),  # Convert to kobo
+                "reference": transaction.payment_reference,
+                "callback_url": f"{settings.FRONTEND_URL}/payment/verify"
+            },
+            headers={
+                "Authorization": f"Bearer {self.secret_key}",
+                "Content-Type": "application/json"
+            }
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        raise PaymentError("Failed to initialize Paystack payment")
 
     async def verify_payment(self, reference: str) -> Dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/transaction/verify/{reference}",
-                headers={"Authorization": f"Bearer {self.secret_key}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            raise PaymentError("Failed to verify Paystack payment") 
+        client = http_clients.get('paystack')
+        response = await client.get(
+            f"{self.BASE_URL}/transaction/verify/{reference}",
+            headers={"Authorization": f"Bearer {self.secret_key}"}
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        raise PaymentError("Failed to verify Paystack payment") 
 
 class USSDHandler:
     def __init__(self):
@@ -79,29 +80,29 @@ class OPayHandler:
         self.secret_key = settings.OPAY_SECRET_KEY
         
     async def initialize_payment(self, transaction: Transaction, phone: str) -> Dict:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "amount": str(transaction.amount),
-                "currency": "NGN",
-                "country": "NG",
-                "reference": transaction.payment_reference,
-                "callbackUrl": f"{settings.API_URL}/payments/opay/webhook",
-                "returnUrl": f"{settings.FRONTEND_URL}/payment/status",
-                "customerPhone": phone,
-                "customerEmail": transaction.user.email,
-                "customerName": transaction.user.name,
-                "expireAt": (datetime.utcnow() + timedelta(minutes=30)).isoformat()
+        client = http_clients.get('gateways')
+        payload = {
+            "amount": str(transaction.amount),
+            "currency": "NGN",
+            "country": "NG",
+            "reference": transaction.payment_reference,
+            "callbackUrl": f"{settings.API_URL}/payments/opay/webhook",
+            "returnUrl": f"{settings.FRONTEND_URL}/payment/status",
+            "customerPhone": phone,
+            "customerEmail": transaction.user.email,
+            "customerName": transaction.user.name,
+            "expireAt": (datetime.utcnow() + timedelta(minutes=30)).isoformat()
+        }
+
+        response = await client.post(
+            f"{self.BASE_URL}/payments",
+            json=payload,
+            headers={
+                "Authorization": f"Bearer {self.secret_key}",
+                "MerchantId": self.merchant_id
             }
-            
-            response = await client.post(
-                f"{self.BASE_URL}/payments",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {self.secret_key}",
-                    "MerchantId": self.merchant_id
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            raise PaymentError("Failed to initialize OPay payment")
\ No newline at end of file
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        raise PaymentError("Failed to initialize OPay payment")
\ No newline at end of file
@@ -3,6 +3,7 @@ import httpx
 from fastapi import HTTPException
 import logging
 from app.core.config import settings
+from app.core.http_clients import http_clients
 from datetime import datetime, timedelta
 import json
 import hashlib
@@ -28,18 +29,19 @@ class PaystackService:
     async def check_health(self) -> Dict[str, Any]:
         """Check if Paystack service is available"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/ping",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                
-                return {
-                    "status": "healthy",
-                    "latency_ms": response.elapsed.total_seconds() * 1000,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+            client = http_clients.get('paystack')
+            response = await client.get(
+                f"{self.base_url}/ping",
+                headers=self.headers,
+                timeout=10.0
+            )
+            response.raise_for_status()
+
+            return {
+                "status": "healthy",
+                "latency_ms": response.elapsed.total_seconds() * 1000,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         except Exception as e:
             logger.error(f"Paystack health check failed: {str(e)}")
             return {
@@ -137,39 +139,39 @@ class PaystackService:
                 )["channels"]
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                try:
-                    response = await client.post(
-                        f"{self.base_url}/transaction/initialize",
-                        json=payload,
-                        headers=self.headers
-                    )
-                    response.raise_for_status()
-                    data = response.json()
+            client = http_clients.get('paystack')
+            try:
+                response = await client.post(
+                    f"{self.base_url}/transaction/initialize",
+                    json=payload,
+                    headers=self.headers
+                )
+                response.raise_for_status()
+                data = response.json()
 
-                    if not data["status"]:
-                        logger.error(f"Paystack error: {data.get('message')}")
-                        raise PaymentValidationError(data.get("message", "Payment initialization failed"))
+                if not data["status"]:
+                    logger.error(f"Paystack error: {data.get('message')}")
+                    raise PaymentValidationError(data.get("message", "Payment initialization failed"))
 
-                    logger.info(f"Payment initialized successfully for {email}")
-                    return {
-                        "authorization_url": data["data"]["authorization_url"],
-                        "access_code": data["data"]["access_code"],
-                        "reference": data["data"]["reference"]
-                    }
+                logger.info(f"Payment initialized successfully for {email}")
+                return {
+                    "authorization_url": data["data"]["authorization_url"],
+                    "access_code": data["data"]["access_code"],
+                    "reference": data["data"]["reference"]
+                }
 
-                except httpx.TimeoutException:
-                    logger.error("Paystack API timeout")
-                    raise HTTPException(
-                        status_code=504,
-                        detail="Payment service timeout. Please try again."
-                    )
-                except httpx.HTTPError as e:
-                    logger.error(f"Paystack HTTP error: {str(e)}")
-                    raise HTTPException(
-                        status_code=502,
-                        detail="Payment service unavailable. Please try again later."
-                    )
+            except httpx.TimeoutException:
+                logger.error("Paystack API timeout")
+                raise HTTPException(
+                    status_code=504,
+                    detail="Payment service timeout. Please try again."
+                )
+            except httpx.HTTPError as e:
+                logger.error(f"Paystack HTTP error: {str(e)}")
+                raise HTTPException(
+                    status_code=502,
+                    detail="Payment service unavailable. Please try again later."
+                )
 
         except PaymentValidationError as e:
             logger.warning(f"Payment validation error: {str(e)}")
@@ -187,51 +189,51 @@ class PaystackService:
             if not reference:
                 raise PaymentValidationError("Payment reference is required")
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                try:
-                    response = await client.get(
-                        f"{self.base_url}/transaction/verify/{reference}",
-                        headers=self.headers
-                    )
-                    response.raise_for_status()
-                    data = response.json()
+            client = http_clients.get('paystack')
+            try:
+                response = await client.get(
+                    f"{self.base_url}/transaction/verify/{reference}",
+                    headers=self.headers
+                )
+                response.raise_for_status()
+                data = response.json()
 
-                    if not data["status"]:
-                        logger.error(f"Payment verification failed: {data.get('message')}")
-                        raise PaymentValidationError(data.get("message", "Payment verification failed"))
+                if not data["status"]:
+                    logger.error(f"Payment verification failed: {data.get('message')}")
+                    raise PaymentValidationError(data.get("message", "Payment verification failed"))
 
-                    payment_data = data["data"]
-                    status = payment_data["status"]
-                    
-                    # Enhanced status validation
-                    if status not in ["success", "failed", "abandoned"]:
-                        logger.warning(f"Unexpected payment status: {status}")
-                        raise PaymentValidationError("Invalid payment status")
+                payment_data = data["data"]
+                status = payment_data["status"]
 
-                    logger.info(f"Payment verified successfully: {reference}")
-                    return {
-                        "status": status,
-                        "amount": payment_data["amount"] / 100,
-                        "currency": payment_data["currency"],
-                        "reference": payment_data["reference"],
-                        "metadata": payment_data.get("metadata", {}),
-                        "paid_at": payment_data.get("paid_at"),
-                        "channel": payment_data.get("channel"),
-                        "card_type": payment_data.get("authorization", {}).get("card_type")
-                    }
+                # Enhanced status validation
+                if status not in ["success", "failed", "abandoned"]:
+                    logger.warning(f"Unexpected payment status: {status}")
+                    raise PaymentValidationError("Invalid payment status")
 
-                except httpx.TimeoutException:
-                    logger.error("Verification timeout")
-                    raise HTTPException(
-                        status_code=504,
-                        detail="Verification service timeout. Please try again."
-                    )
-                except httpx.HTTPError as e:
-                    logger.error(f"Verification HTTP error: {str(e)}")
-                    raise HTTPException(
-                        status_code=502,
-                        detail="Verification service unavailable. Please try again later."
-                    )
+                logger.info(f"Payment verified successfully: {reference}")
+                return {
+                    "status": status,
+                    "amount": payment_data["amount"] / 100,
+                    "currency": payment_data["currency"],
+                    "reference": payment_data["reference"],
+                    "metadata": payment_data.get("metadata", {}),
+                    "paid_at": payment_data.get("paid_at"),
+                    "channel": payment_data.get("channel"),
+                    "card_type": payment_data.get("authorization", {}).get("card_type")
+                }
+
+            except httpx.TimeoutException:
+                logger.error("Verification timeout")
+                raise HTTPException(
+                    status_code=504,
+                    detail="Verification service timeout. Please try again."
+                )
+            except httpx.HTTPError as e:
+                logger.error(f"Verification HTTP error: {str(e)}")
+                raise HTTPException(
+                    status_code=502,
+                    detail="Verification service unavailable. Please try again later."
+                )
 
         except PaymentValidationError as e:
             logger.warning(f"Payment verification validation error: {str(e)}")
@@ -332,29 +334,29 @@ class PaystackService:
             start_date = start_date or (datetime.utcnow() - timedelta(days=30))
             end_date = end_date or datetime.utcnow()
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/transaction/totals",
-                    headers=self.headers,
-                    params={
-                        "from": start_date.strftime("%Y-%m-%d"),
-                        "to": end_date.strftime("%Y-%m-%d")
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = http_clients.get('paystack')
+            response = await client.get(
+                f"{self.base_url}/transaction/totals",
+                headers=self.headers,
+                params={
+                    "from": start_date.strftime("%Y-%m-%d"),
+                    "to": end_date.strftime("%Y-%m-%d")
+                }
+            )
+            response.raise_for_status()
+            data = response.json()
 
-                return {
-                    "total_transactions": data["data"]["total_transactions"],
-                    "successful_transactions": data["data"]["successful_transactions"],
-                    "total_volume": data["data"]["total_volume"] / 100,  # Convert to major currency
-                    "pending_transfers": data["data"]["pending_transfers"],
-                    "unique_customers": data["data"]["unique_customers"],
-                    "period": {
-                        "start": start_date.isoformat(),
-                        "end": end_date.isoformat()
-                    }
+            return {
+                "total_transactions": data["data"]["total_transactions"],
+                "successful_transactions": data["data"]["successful_transactions"],
+                "total_volume": data["data"]["total_volume"] / 100,  # Convert to major currency
+                "pending_transfers": data["data"]["pending_transfers"],
+                "unique_customers": data["data"]["unique_customers"],
+                "period": {
+                    "start": start_date.isoformat(),
+                    "end": end_date.isoformat()
                 }
+            }
 
         except Exception as e:
             logger.error(f"Failed to get payment analytics: {str(e)}")
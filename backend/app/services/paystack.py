@@ -1,6 +1,7 @@
 import httpx
 from typing import Dict, Any
 from app.core.config import settings
+from app.core.http_clients import http_clients
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,31 +30,30 @@ class PaystackService:
         try:
             logger.info(f"Verifying Paystack transaction: {reference}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                logger.debug(f"Authorization header: Bearer sk_****{self.secret_key[-6:]}")
-                
-                response = await client.get(
-                    f"{self.base_url}/transaction/verify/{reference}",
-                    headers=self.headers,
-                    follow_redirects=True
-                )
-                
-                logger.debug(f"Response status: {response.status_code}")
-                logger.debug(f"Response headers: {response.headers}")
-                
-                if response.status_code == 401:
-                    logger.error("Paystack authentication failed")
-                    logger.error(f"Response body: {response.text}")
-                    raise Exception("Invalid Paystack authentication")
+            logger.debug(f"Authorization header: Bearer sk_****{self.secret_key[-6:]}")
 
-                if response.status_code != 200:
-                    error_data = response.json()
-                    logger.error(f"Paystack error: {error_data}")
-                    raise Exception(f"Payment verification failed: {error_data.get('message')}")
+            response = await http_clients.get('paystack').get(
+                f"{self.base_url}/transaction/verify/{reference}",
+                headers=self.headers,
+                follow_redirects=True
+            )
 
-                data = response.json()
-                logger.info(f"Paystack verification successful: {data}")
-                return data
+            logger.debug(f"Response status: {response.status_code}")
+            logger.debug(f"Response headers: {response.headers}")
+
+            if response.status_code == 401:
+                logger.error("Paystack authentication failed")
+                logger.error(f"Response body: {response.text}")
+                raise Exception("Invalid Paystack authentication")
+
+            if response.status_code != 200:
+                error_data = response.json()
+                logger.error(f"Paystack error: {error_data}")
+                raise Exception(f"Payment verification failed: {error_data.get('message')}")
+
+            data = response.json()
+            logger.info(f"Paystack verification successful: {data}")
+            return data
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error during verification: {str(e)}")
@@ -0,0 +1,216 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import logging
+from sqlalchemy import bindparam, event, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.betting_code import BettingCode
+from app.models.payment import Payment
+from app.models.sync_change import SyncChange
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Changes returned per sync request; clients continue from the returned cursor
+PAGE_SIZE = 500
+
+# Synced entity per model
+ENTITIES = {BettingCode: "code", Payment: "payment", User: "settings"}
+
+# Update type per entity, as handled by the clients' SyncManager
+UPDATE_TYPES = {"code": "CODE_STATUS", "payment": "PAYMENT_STATUS", "settings": "USER_SETTINGS"}
+
+# Account fields synced as the user's settings; changes to other columns of
+# users (password hashes, sync_version itself) are not recorded
+SETTINGS_FIELDS = ("name", "phone", "country", "balance", "is_verified", "payment_status", "status")
+
+# Columns sent per entity
+COLUMNS = {
+    "code": (
+        BettingCode.id, BettingCode.code, BettingCode.bookmaker, BettingCode.status,
+        BettingCode.odds, BettingCode.stake, BettingCode.potential_winnings,
+        BettingCode.admin_note, BettingCode.verified_at, BettingCode.created_at
+    ),
+    "payment": (
+        Payment.id, Payment.reference, Payment.status, Payment.amount, Payment.currency,
+        Payment.type.label("payment_type"), Payment.payment_method, Payment.verified_at, Payment.created_at
+    ),
+}
+
+# user id -> (entity, entity id) -> deleted
+Changes = Dict[int, Dict[Tuple[str, int], bool]]
+
+def record_changes(connection, changes: Changes) -> None:
+    """
+    Give each changed record the user's next version. Bumping users.sync_version
+    locks the user's row until commit, so one user's versions commit in order
+    and a client never skips past a version that commits late.
+    """
+    users = User.__table__
+    log = SyncChange.__table__
+    now = datetime.utcnow()
+    for user_id, records in changes.items():
+        connection.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(sync_version=users.c.sync_version + len(records))
+        )
+        head = connection.execute(select(users.c.sync_version).where(users.c.id == user_id)).scalar()
+        if head is None:
+            continue  # the user is gone
+        existing = {
+            (row.entity, row.entity_id): row.id
+            for row in connection.execute(
+                select(log.c.id, log.c.entity, log.c.entity_id).where(
+                    log.c.user_id == user_id,
+                    log.c.entity_id.in_({entity_id for _, entity_id in records})
+                )
+            )
+        }
+        updates, inserts = [], []
+        for version, ((entity, entity_id), deleted) in enumerate(sorted(records.items()), head - len(records) + 1):
+            if (entity, entity_id) in existing:
+                updates.append({
+                    "row_id": existing[(entity, entity_id)],
+                    "new_version": version,
+                    "is_deleted": deleted,
+                    "at": now
+                })
+            else:
+                inserts.append({
+                    "user_id": user_id,
+                    "entity": entity,
+                    "entity_id": entity_id,
+                    "version": version,
+                    "deleted": deleted,
+                    "changed_at": now
+                })
+        if updates:
+            connection.execute(
+                update(log)
+                .where(log.c.id == bindparam("row_id"))
+                .values(version=bindparam("new_version"), deleted=bindparam("is_deleted"), changed_at=bindparam("at")),
+                updates
+            )
+        if inserts:
+            connection.execute(insert(log), inserts)
+
+def _collect(session: Session) -> Changes:
+    """Synced records the flush inserted, changed or deleted, by owner"""
+    changes: Changes = {}
+
+    def add(obj, deleted: bool) -> None:
+        entity = ENTITIES.get(type(obj))
+        if entity is None:
+            return
+        state = inspect(obj)
+        if not deleted and obj not in session.new:
+            if not session.is_modified(obj, include_collections=False):
+                return
+            if entity == "settings" and not any(
+                state.attrs[field].history.has_changes() for field in SETTINGS_FIELDS
+            ):
+                return
+        entity_id = state.dict.get("id") or (state.identity[0] if state.identity else None)
+        owner = entity_id if entity == "settings" else state.dict.get("user_id")
+        if owner is None and not deleted and entity != "settings":
+            owner = obj.user_id  # expired since it was loaded
+        if entity_id is None or owner is None:
+            return  # e.g. a betting code uploaded by an admin
+        changes.setdefault(owner, {})[(entity, entity_id)] = deleted
+
+    for obj in session.new:
+        add(obj, False)
+    for obj in session.dirty:
+        add(obj, False)
+    for obj in session.deleted:
+        add(obj, True)
+    return changes
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    changes = _collect(session)
+    if changes:
+        record_changes(session.connection(), changes)
+
+def _compact(row) -> Dict[str, Any]:
+    """Row as a dict without empty fields"""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row._mapping.items()
+        if value is not None
+    }
+
+def encode_cursor(user_id: int, version: int) -> str:
+    return f"{user_id}:{version}"
+
+def decode_cursor(cursor: Optional[str], user_id: int) -> int:
+    """
+    Version to resume user_id's sync from. A cursor names the user it was
+    issued to, so one left behind by another user of the same browser (or a
+    bare version from before cursors named their user) starts over from 0.
+    Raises ValueError for a malformed cursor.
+    """
+    if not cursor:
+        return 0
+    owner, separator, version = cursor.partition(":")
+    if not separator:
+        int(owner)
+        return 0
+    owner, version = int(owner), int(version)
+    return version if owner == user_id else 0
+
+async def fetch_changes(db: AsyncSession, user_id: int, cursor: Optional[str], limit: int = PAGE_SIZE) -> Dict[str, Any]:
+    """
+    The user's records changed after cursor, oldest change first, at most
+    limit of them: {"updates", "cursor" (resume from here), "has_more",
+    "head" (the user's latest version)}. A cursor ahead of the user's latest
+    version (e.g. from before a restore) starts over from scratch. Raises
+    ValueError for a malformed cursor.
+    """
+    version = decode_cursor(cursor, user_id)
+    head = (await db.execute(select(User.sync_version).where(User.id == user_id))).scalar() or 0
+    if not 0 <= version <= head:
+        version = 0
+    rows = (await db.execute(
+        select(SyncChange.entity, SyncChange.entity_id, SyncChange.version, SyncChange.deleted)
+        .where(SyncChange.user_id == user_id, SyncChange.version > version)
+        .order_by(SyncChange.version)
+        .limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    current: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for entity, model in (("code", BettingCode), ("payment", Payment)):
+        ids = [row.entity_id for row in rows if row.entity == entity and not row.deleted]
+        if ids:
+            for record in await db.execute(
+                select(*COLUMNS[entity]).where(model.id.in_(ids), model.user_id == user_id)
+            ):
+                current[(entity, record.id)] = _compact(record)
+    if any(row.entity == "settings" and not row.deleted for row in rows):
+        settings = (await db.execute(
+            select(*(getattr(User, field) for field in SETTINGS_FIELDS)).where(User.id == user_id)
+        )).first()
+        if settings is not None:
+            current[("settings", user_id)] = {"settings": _compact(settings)}
+
+    updates: List[Dict[str, Any]] = []
+    for row in rows:
+        record = current.get((row.entity, row.entity_id))
+        update_type = UPDATE_TYPES.get(row.entity)
+        if update_type is None:
+            continue
+        if record is None:
+            # Deleted (or no longer this user's)
+            updates.append({"type": update_type, "id": row.entity_id, "deleted": True, "version": row.version})
+        else:
+            updates.append({"type": update_type, **record, "version": row.version})
+
+    return {
+        "updates": updates,
+        "cursor": encode_cursor(user_id, rows[-1].version if rows else version),
+        "has_more": has_more,
+        "head": head
+    }
@@ -0,0 +1,195 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models.betting_code import BettingCode
+from app.models.code_activity_bucket import CodeActivityBucket
+from datetime import datetime, timedelta, timezone
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# timeframe -> (window, half-life) of the exponential decay
+TRENDING_TIMEFRAMES = {
+    "24h": (timedelta(hours=24), timedelta(hours=6)),
+    "7d": (timedelta(days=7), timedelta(hours=24)),
+    "30d": (timedelta(days=30), timedelta(hours=72)),
+}
+
+# Per-event weights: a rating contributes RATING_WEIGHT * stars
+VIEW_WEIGHT = 0.3
+PURCHASE_WEIGHT = 0.5
+RATING_WEIGHT = 0.2
+
+REFRESH_INTERVAL_SECONDS = 60
+MAX_RANKED_PER_COUNTRY = 200
+
+def bucket_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+class _Ranking:
+    """
+    Codes of one country ordered by forward-decayed score.
+    Scores are stored as weight * exp(rate * (t - epoch)) so a new event never
+    requires decaying the existing entries; the order equals the decayed order.
+    """
+
+    def __init__(self, rate: float, epoch: float):
+        self.rate = rate
+        self.epoch = epoch
+        self.scores: Dict[int, float] = {}
+        self.ordered: List[Tuple[float, int]] = []  # (-score, code_id), ascending
+
+    def boost(self, code_id: int, weight: float, at: float) -> None:
+        self.add(code_id, weight * math.exp(self.rate * (at - self.epoch)))
+
+    def add(self, code_id: int, amount: float) -> None:
+        old = self.scores.get(code_id)
+        if old is not None:
+            index = bisect.bisect_left(self.ordered, (-old, code_id))
+            if index < len(self.ordered) and self.ordered[index] == (-old, code_id):
+                self.ordered.pop(index)
+        score = (old or 0.0) + amount
+        self.scores[code_id] = score
+        bisect.insort(self.ordered, (-score, code_id))
+
+    def top(self, limit: int, now: float) -> List[Tuple[int, float]]:
+        scale = math.exp(-self.rate * (now - self.epoch))
+        return [(code_id, -neg_score * scale) for neg_score, code_id in self.ordered[:limit]]
+
+class TrendingEngine:
+    """
+    In-process trending index. Hourly activity buckets in the database are the
+    source of truth: every worker rebuilds its rankings from them on a schedule
+    and applies its own events immediately in between.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rankings: Dict[Tuple[str, str], _Ranking] = {}
+        self._code_countries: Dict[int, str] = {}
+        self._refreshed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def refresh(self, db: Session) -> None:
+        """Rebuild every ranking from the activity buckets of live listings"""
+        now = datetime.utcnow()
+        epoch = time.time()
+        longest_window = max(window for window, _ in TRENDING_TIMEFRAMES.values())
+
+        rows = (
+            db.query(
+                CodeActivityBucket.code_id,
+                CodeActivityBucket.bucket_start,
+                CodeActivityBucket.views,
+                CodeActivityBucket.purchases,
+                CodeActivityBucket.rating_sum,
+                BettingCode.user_country
+            )
+            .join(BettingCode, BettingCode.id == CodeActivityBucket.code_id)
+            .filter(
+                CodeActivityBucket.bucket_start >= bucket_start(now - longest_window),
+                BettingCode.is_published == True,
+                BettingCode.marketplace_status == 'active',
+                or_(BettingCode.valid_until == None, BettingCode.valid_until > now)
+            )
+            .all()
+        )
+
+        rankings: Dict[Tuple[str, str], _Ranking] = {}
+        code_countries: Dict[int, str] = {}
+        for code_id, started, views, purchases, rating_sum, country in rows:
+            if not country:
+                continue
+            country = country.lower()
+            started = _naive_utc(started)
+            code_countries[code_id] = country
+            weight = views * VIEW_WEIGHT + purchases * PURCHASE_WEIGHT + rating_sum * RATING_WEIGHT
+            if weight <= 0:
+                continue
+            # Credit each bucket at its midpoint
+            at = epoch - (now - started - timedelta(minutes=30)).total_seconds()
+            for timeframe, (window, half_life) in TRENDING_TIMEFRAMES.items():
+                if started < bucket_start(now - window):
+                    continue
+                key = (country, timeframe)
+                if key not in rankings:
+                    rankings[key] = _Ranking(math.log(2) / half_life.total_seconds(), epoch)
+                rankings[key].boost(code_id, weight, at)
+
+        for ranking in rankings.values():
+            # Only the head of each ranking is ever served
+            for _, code_id in ranking.ordered[MAX_RANKED_PER_COUNTRY:]:
+                del ranking.scores[code_id]
+            del ranking.ordered[MAX_RANKED_PER_COUNTRY:]
+
+        with self._lock:
+            self._rankings = rankings
+            self._code_countries = code_countries
+            self._refreshed_at = time.monotonic()
+
+        logger.info(f"Trending rankings refreshed from {len(rows)} activity buckets")
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Refresh inline when the background refresher is not running or has stalled"""
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > 2 * REFRESH_INTERVAL_SECONDS:
+            self.refresh(db)
+
+    def record_event(self, code_id: int, views: int = 0, purchases: int = 0, rating_sum: float = 0.0) -> None:
+        """Apply an event to this worker's rankings without waiting for the next refresh"""
+        weight = views * VIEW_WEIGHT + purchases * PURCHASE_WEIGHT + rating_sum * RATING_WEIGHT
+        now = time.time()
+        with self._lock:
+            country = self._code_countries.get(code_id)
+            if not country or weight <= 0:
+                return
+            for timeframe, (_, half_life) in TRENDING_TIMEFRAMES.items():
+                key = (country, timeframe)
+                if key not in self._rankings:
+                    self._rankings[key] = _Ranking(math.log(2) / half_life.total_seconds(), now)
+                self._rankings[key].boost(code_id, weight, now)
+
+    def top(self, country: str, timeframe: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """(code_id, decayed score) pairs, best first"""
+        with self._lock:
+            ranking = self._rankings.get((country.lower(), timeframe))
+            if ranking is None:
+                return []
+            return ranking.top(limit, time.time())
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            try:
+                db = session_factory()
+                try:
+                    await asyncio.to_thread(self.refresh, db)
+                finally:
+                    db.close()
+            except Exception as e:
+                logger.error(f"Error refreshing trending rankings: {str(e)}")
+            await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+
+    def start(self, session_factory) -> None:
+        """Start the periodic refresher on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+trending_engine = TrendingEngine()
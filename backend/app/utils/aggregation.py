@@ -0,0 +1,42 @@
+from typing import Any, Dict, Tuple
+from sqlalchemy import case, func, true
+from sqlalchemy.orm import Query, Session
+
+# Conditional aggregates let one scan of a filtered set produce several metrics.
+# SUM(CASE ...) is used instead of FILTER (WHERE ...) so the same SQL runs on
+# SQLite and Postgres.
+
+def count_if(condition):
+    """Number of rows matching condition (0, never NULL)"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def sum_if(column, condition):
+    """Sum of column over rows matching condition (0 when none match)"""
+    return func.coalesce(func.sum(case((condition, column), else_=None)), 0)
+
+def avg_if(column, condition):
+    """Average of column over rows matching condition (NULL when none match)"""
+    return func.avg(case((condition, column), else_=None))
+
+def aggregate(query: Query, **metrics) -> Dict[str, Any]:
+    """
+    Evaluate every metric expression in a single query over query's FROM
+    clause, joins and filters. Returns {metric name: value}.
+    """
+    row = query.with_entities(*[expr.label(name) for name, expr in metrics.items()]).one()
+    return row._asdict()
+
+def aggregate_sets(db: Session, *sets: Tuple[Query, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Like aggregate() for metrics over several differently filtered sets:
+    each (query, metrics) pair is scanned once as a one-row subquery and the
+    rows are joined, so all of them come back in a single round trip.
+    """
+    subqueries = [
+        query.with_entities(*[expr.label(name) for name, expr in metrics.items()]).subquery()
+        for query, metrics in sets
+    ]
+    combined = db.query(*[column for subquery in subqueries for column in subquery.c]).select_from(subqueries[0])
+    for subquery in subqueries[1:]:
+        combined = combined.join(subquery, true())
+    return combined.one()._asdict()
@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, or_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+import base64
+import json
+
+# Counts are capped at this many rows when an estimate is requested
+ESTIMATE_COUNT_CAP = 1000
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+def encode_cursor(sort_by: str, direction: str, value: Any, last_id: int) -> str:
+    """Encode the position after the last returned row as an opaque cursor"""
+    if isinstance(value, datetime):
+        payload_value = {'t': 'dt', 'v': value.isoformat()}
+    else:
+        payload_value = {'t': 'raw', 'v': value}
+
+    payload = {'s': sort_by, 'd': direction, 'k': payload_value, 'id': last_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload['k']['v']
+        if payload['k']['t'] == 'dt' and value is not None:
+            value = datetime.fromisoformat(value)
+        return {
+            'sort_by': payload['s'],
+            'direction': payload['d'],
+            'value': value,
+            'id': int(payload['id'])
+        }
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def apply_keyset(
+    query: Query,
+    sort_column,
+    id_column,
+    direction: str,
+    cursor: Optional[Dict[str, Any]] = None
+) -> Query:
+    """
+    Order a query by (sort_column, id) and seek past the cursor position.
+    NULL sort values always come last so the ordering is the same on SQLite and Postgres.
+    """
+    if direction == 'desc':
+        query = query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc().nulls_last(), id_column.asc())
+
+    if not cursor:
+        return query
+
+    value = cursor['value']
+    last_id = cursor['id']
+    past_id = id_column < last_id if direction == 'desc' else id_column > last_id
+
+    if value is None:
+        # Already inside the trailing NULL block
+        return query.filter(and_(sort_column.is_(None), past_id))
+
+    past_value = sort_column < value if direction == 'desc' else sort_column > value
+    return query.filter(
+        or_(
+            past_value,
+            and_(sort_column == value, past_id),
+            sort_column.is_(None)
+        )
+    )
+
+def count_rows(query: Query, mode: str) -> Tuple[Optional[int], bool]:
+    """
+    Count the rows matched by a query.
+    Returns (total, is_estimate); 'estimate' stops counting at ESTIMATE_COUNT_CAP.
+    """
+    if mode == 'none':
+        return None, False
+
+    if mode == 'estimate':
+        capped = query.order_by(None).with_entities(query.column_descriptions[0]['entity'].id)
+        capped = capped.limit(ESTIMATE_COUNT_CAP + 1).subquery()
+        total = query.session.execute(select(func.count()).select_from(capped)).scalar() or 0
+        if total > ESTIMATE_COUNT_CAP:
+            return ESTIMATE_COUNT_CAP, True
+        return total, False
+
+    return query.order_by(None).count(), False
+
+async def count_rows_async(db: AsyncSession, stmt: Select, mode: str) -> Tuple[Optional[int], bool]:
+    """count_rows() for a select() run on an AsyncSession"""
+    if mode == 'none':
+        return None, False
+
+    stmt = stmt.order_by(None)
+    if mode == 'estimate':
+        capped = stmt.with_only_columns(stmt.column_descriptions[0]['entity'].id)
+        capped = capped.limit(ESTIMATE_COUNT_CAP + 1).subquery()
+        total = (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
+        if total > ESTIMATE_COUNT_CAP:
+            return ESTIMATE_COUNT_CAP, True
+        return total, False
+
+    return (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar() or 0, False
+
+def next_cursor(
+    rows: List[Any],
+    limit: int,
+    sort_by: str,
+    direction: str
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row fetched with limit + 1 and build the cursor for the next page"""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_by, direction, getattr(last, sort_by), last.id)
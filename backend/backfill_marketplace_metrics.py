@@ -0,0 +1,33 @@
+"""
+Rebuild the marketplace_metrics rollup over a date range.
+
+The rollup job backfills all history by itself when the table is empty; use
+this after fixing source data, or to rebuild a range without waiting for it.
+
+Usage:
+    python backfill_marketplace_metrics.py [start YYYY-MM-DD] [end YYYY-MM-DD]
+
+Without arguments every bucket from the oldest code or purchase up to now is rebuilt.
+"""
+import sys
+import logging
+from datetime import datetime
+import app.db.base  # noqa: F401 - imports every model so the mappers can configure
+from app.db.session import SessionLocal
+from app.services.metrics_rollup_service import metrics_rollup
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    start = datetime.strptime(sys.argv[1], "%Y-%m-%d") if len(sys.argv) > 1 else None
+    end = datetime.strptime(sys.argv[2], "%Y-%m-%d") if len(sys.argv) > 2 else None
+
+    db = SessionLocal()
+    try:
+        rows = metrics_rollup.backfill(db, start, end)
+        print(f"Rebuilt {rows} marketplace metric rows")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
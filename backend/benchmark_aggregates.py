@@ -0,0 +1,259 @@
+"""
+Benchmark the admin stats endpoints: one query per metric (the previous
+implementation, reproduced below) against single-scan conditional aggregation,
+or against the marketplace_metrics rollup for the analytics endpoint.
+
+Reports database round trips and median latency for marketplace stats,
+marketplace analytics and payment statistics, and checks both versions agree.
+
+Usage:
+    python benchmark_aggregates.py [codes]
+
+Set BENCH_DATABASE_URL to run against Postgres instead of the default SQLite file.
+A local SQLite file has no network between app and database; set BENCH_RTT_MS to
+add that latency to every statement and see what the saved round trips are worth.
+"""
+import os
+import sys
+import time
+import types
+import random
+import asyncio
+import logging
+import statistics
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, func, text
+from sqlalchemy.orm import sessionmaker
+from app.db.base_class import Base
+import app.db.base  # noqa: F401 - imports every model so the mappers can configure
+import app.models  # noqa: F401
+from app.models.betting_code import BettingCode
+from app.models.code_analysis import CodeAnalysis
+from app.models.code_purchase import CodePurchase
+from app.models.code_stats import CodeStats
+from app.models.payment import Payment
+from app.models.user import User
+from app.services.code_stats_service import CodeStatsService
+from app.services.metrics_rollup_service import metrics_rollup, truncate
+from app.api.v1.endpoints import code_analyzer, admin_payments
+
+logging.basicConfig(level=logging.WARNING)
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_aggregates.db")
+BENCH_RTT_MS = float(os.getenv("BENCH_RTT_MS", "0"))
+DEFAULT_CODES = 100_000
+BATCH_SIZE = 10_000
+REPEATS = 7
+COUNTRY = "nigeria"
+
+def seed(engine, codes: int):
+    """Recreate every table and fill it with synthetic rows"""
+    # Point BENCH_DATABASE_URL at a scratch database: every table is recreated
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    users = max(codes // 20, 10)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, name, hashed_password, country, phone, balance, is_active, is_verified) "
+            "VALUES (:id, :email, :name, 'x', :country, :phone, 0, 1, 1)"
+        ), [
+            {"id": i, "email": f"user{i}@example.com", "name": f"User {i}",
+             "country": rng.choice(["nigeria", "ghana"]), "phone": str(i)}
+            for i in range(1, users + 1)
+        ])
+
+        for start in range(0, codes, BATCH_SIZE):
+            conn.execute(text("""
+                INSERT INTO betting_codes (
+                    id, user_id, bookmaker, code, odds, stake, potential_winnings, status, created_at,
+                    price, valid_until, marketplace_status, user_country, is_published
+                ) VALUES (
+                    :id, :user_id, 'bet9ja', :code, 2.0, 100.0, 200.0, :status, :created_at,
+                    :price, :valid_until, :marketplace_status, :user_country, :is_published
+                )
+            """), [
+                {
+                    "id": i, "user_id": rng.randint(1, users), "code": f"BENCH{i:08d}",
+                    "status": rng.choice(["approved", "approved", "pending", "won", "lost"]),
+                    "created_at": now - timedelta(hours=rng.randint(0, 24 * 120)),
+                    "price": float(rng.randint(100, 5000)),
+                    "valid_until": now + timedelta(days=rng.randint(-30, 30)),
+                    "marketplace_status": rng.choice(["active", "active", "sold", "draft", "expired"]),
+                    "user_country": rng.choice(["nigeria", "ghana"]),
+                    "is_published": rng.random() < 0.8,
+                }
+                for i in range(start + 1, min(start + BATCH_SIZE, codes) + 1)
+            ])
+
+        conn.execute(text("""
+            INSERT INTO code_analyses (betting_code_id, analyst_id, country, bookmaker)
+            VALUES (:code_id, 1, 'nigeria', 'bet9ja')
+        """), [{"code_id": rng.randint(1, codes)} for _ in range(codes // 2)])
+
+        conn.execute(text("""
+            INSERT INTO code_purchases (code_id, amount, currency, status, purchased_at)
+            VALUES (:code_id, :amount, 'NGN', 'completed', :purchased_at)
+        """), [
+            {"code_id": rng.randint(1, codes), "amount": float(rng.randint(100, 5000)),
+             "purchased_at": now - timedelta(hours=rng.randint(0, 24 * 60))}
+            for _ in range(codes // 5)
+        ])
+
+        conn.execute(text("""
+            INSERT INTO payments (user_id, amount, currency, status, type, created_at)
+            VALUES (:user_id, :amount, 'NGN', :status, 'withdrawal', :created_at)
+        """), [
+            {"user_id": rng.randint(1, users), "amount": float(rng.randint(1000, 50000)),
+             "status": rng.choice(["pending", "approved", "rejected"]),
+             "created_at": now - timedelta(days=rng.randint(0, 90))}
+            for _ in range(codes // 5)
+        ])
+
+# Previous implementations, one query per metric
+
+def legacy_marketplace_stats(db, country):
+    active_listings = db.query(BettingCode).filter(
+        BettingCode.marketplace_status == 'active',
+        BettingCode.valid_until > datetime.utcnow(),
+        BettingCode.user_country == country
+    ).count()
+    total_revenue = db.query(func.sum(CodePurchase.amount)).join(
+        BettingCode, CodePurchase.code_id == BettingCode.id
+    ).filter(BettingCode.user_country == country).scalar() or 0
+    won_codes = db.query(BettingCode).filter(
+        BettingCode.status == 'won', BettingCode.user_country == country
+    ).count()
+    total_sold = db.query(BettingCode).filter(
+        BettingCode.marketplace_status == 'sold', BettingCode.user_country == country
+    ).count()
+    avg_win_rate = (won_codes / total_sold * 100) if total_sold > 0 else 0
+    total_analyzed = db.query(CodeAnalysis).join(
+        BettingCode, CodeAnalysis.betting_code_id == BettingCode.id
+    ).filter(BettingCode.user_country == country).count()
+    total_published = db.query(BettingCode).filter(
+        BettingCode.marketplace_status == 'active', BettingCode.user_country == country
+    ).count()
+    return {
+        "active_listings": active_listings,
+        "total_revenue": float(total_revenue),
+        "avg_win_rate": round(avg_win_rate, 2),
+        "total_analyzed": total_analyzed,
+        "total_published": total_published
+    }
+
+def legacy_marketplace_analytics(db, country, start_date):
+    # Scans the source tables; the rollup answers the same question from its
+    # day buckets, so the window starts at the same bucket boundary
+    start_date = truncate(start_date, "day")
+    sold = db.query(CodePurchase).join(BettingCode, CodePurchase.code_id == BettingCode.id).filter(
+        BettingCode.user_country == country,
+        CodePurchase.status == 'completed',
+        CodePurchase.purchased_at >= start_date
+    )
+    listed = db.query(BettingCode).filter(
+        BettingCode.user_country == country,
+        BettingCode.is_published == True,
+        BettingCode.created_at >= start_date
+    )
+    return {
+        "sales": sold.count(),
+        "revenue": float(sold.with_entities(func.sum(CodePurchase.amount)).scalar() or 0),
+        "new_listings": listed.count(),
+        "avg_price": float(listed.with_entities(func.avg(BettingCode.price)).scalar() or 0),
+        "min_price": float(listed.with_entities(func.min(BettingCode.price)).scalar() or 0),
+        "max_price": float(listed.with_entities(func.max(BettingCode.price)).scalar() or 0)
+    }
+
+def legacy_payment_statistics(db, country):
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    base_query = db.query(Payment).join(User).filter(
+        func.lower(User.country) == country,
+        Payment.type == 'withdrawal',
+        Payment.created_at >= thirty_days_ago
+    )
+    total_amount = db.query(func.sum(Payment.amount)).select_from(Payment).join(User).filter(
+        func.lower(User.country) == country,
+        Payment.type == 'withdrawal',
+        Payment.status == 'approved'
+    ).scalar() or 0
+    return {
+        "totalPayments": base_query.count(),
+        "pendingPayments": base_query.filter(Payment.status == 'pending').count(),
+        "approvedPayments": base_query.filter(Payment.status == 'approved').count(),
+        "rejectedPayments": base_query.filter(Payment.status == 'rejected').count(),
+        "totalAmount": float(total_amount)
+    }
+
+def measure(engine, fn):
+    """(result, round trips, median ms) of fn()"""
+    round_trips = [0]
+
+    def count(*args):
+        round_trips[0] += 1
+        if BENCH_RTT_MS:
+            time.sleep(BENCH_RTT_MS / 1000)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        timings = []
+        result = None
+        for _ in range(REPEATS):
+            round_trips[0] = 0
+            started = time.perf_counter()
+            result = fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return result, round_trips[0], statistics.median(timings)
+
+def main():
+    codes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CODES
+    engine = create_engine(BENCH_DATABASE_URL)
+    seed(engine, codes)
+
+    db = sessionmaker(bind=engine)()
+    CodeStatsService.rebuild(db)
+    metrics_rollup.backfill(db)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    admin = types.SimpleNamespace(country=COUNTRY)
+    start_date = datetime.utcnow() - timedelta(days=30)
+
+    cases = [
+        (
+            "marketplace stats",
+            lambda: legacy_marketplace_stats(db, COUNTRY),
+            lambda: code_analyzer._marketplace_stats(db, COUNTRY)
+        ),
+        (
+            "marketplace analytics (30d)",
+            lambda: legacy_marketplace_analytics(db, COUNTRY, start_date),
+            lambda: asyncio.run(code_analyzer.get_marketplace_analytics(timeframe="30d", current_admin=admin, db=db))
+        ),
+        (
+            "payment statistics",
+            lambda: legacy_payment_statistics(db, COUNTRY),
+            lambda: asyncio.run(admin_payments.get_payment_statistics(current_admin=admin, db=db))
+        ),
+    ]
+
+    print(f"{codes} betting codes on {engine.dialect.name}, {BENCH_RTT_MS} ms added per round trip, median of {REPEATS} runs\n")
+    print(f"{'endpoint':<30}{'queries':>16}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name, legacy, single_pass in cases:
+        before, before_trips, before_ms = measure(engine, legacy)
+        after, after_trips, after_ms = measure(engine, single_pass)
+        if before != after:
+            print(f"  warning: results differ\n    before: {before}\n    after:  {after}")
+        print(
+            f"{name:<30}{f'{before_trips} -> {after_trips}':>16}"
+            f"{before_ms:>12.2f}{after_ms:>12.2f}{before_ms / after_ms:>9.1f}x"
+        )
+    db.close()
+
+if __name__ == "__main__":
+    main()
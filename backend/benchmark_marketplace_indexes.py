@@ -0,0 +1,224 @@
+"""
+Benchmark the marketplace read queries with and without the hot-filter indexes.
+
+Seeds betting_codes (plus views, purchases and ratings) and prints the query plan
+and median latency of each query before and after the indexes from the
+add_marketplace_indexes migration are created.
+
+Usage:
+    python benchmark_marketplace_indexes.py [rows]
+
+Set BENCH_DATABASE_URL to run against Postgres instead of the default SQLite file.
+"""
+import os
+import sys
+import time
+import random
+import logging
+import statistics
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from app.db.base_class import Base
+import app.models  # noqa: F401 - registers every table on Base.metadata
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench_marketplace.db")
+DEFAULT_ROWS = 1_000_000
+BATCH_SIZE = 10_000
+REPEATS = 5
+
+BENCH_TABLES = ["betting_codes", "code_views", "code_purchases", "code_ratings"]
+
+# Indexes added by alembic/versions/add_marketplace_indexes.py (and its follow-ups)
+BENCH_INDEXES = [
+    "ix_betting_codes_marketplace_live",
+    "ix_betting_codes_country_marketplace_stats",
+    "ix_betting_codes_country_analysis_status",
+    "ix_betting_codes_country_status",
+    "ix_betting_codes_user_id",
+    "ix_code_views_code_id_viewed_at",
+    "ix_code_purchases_code_id_purchased_at",
+    "ix_code_ratings_code_id_created_at",
+]
+
+LIVE_FILTER = """
+    user_country = :country
+    AND is_published = :published
+    AND marketplace_status = 'active'
+    AND status = 'approved'
+    AND (valid_until IS NULL OR valid_until > :now)
+"""
+
+QUERIES = {
+    "marketplace page 1": f"""
+        SELECT id FROM betting_codes WHERE {LIVE_FILTER}
+        ORDER BY created_at DESC, id DESC LIMIT 12
+    """,
+    "marketplace page 500 (offset)": f"""
+        SELECT id FROM betting_codes WHERE {LIVE_FILTER}
+        ORDER BY created_at DESC, id DESC LIMIT 12 OFFSET 5988
+    """,
+    "marketplace page 500 (keyset)": f"""
+        SELECT id FROM betting_codes WHERE {LIVE_FILTER}
+        AND (created_at < :cursor_at OR (created_at = :cursor_at AND id < :cursor_id))
+        ORDER BY created_at DESC, id DESC LIMIT 12
+    """,
+    "marketplace total count": f"SELECT count(*) FROM betting_codes WHERE {LIVE_FILTER}",
+    "active listings stat": """
+        SELECT count(*) FROM betting_codes
+        WHERE user_country = :country AND marketplace_status = 'active' AND valid_until > :now
+    """,
+    "pending analysis": """
+        SELECT id FROM betting_codes
+        WHERE user_country = :country AND analysis_status = 'pending'
+        ORDER BY created_at DESC LIMIT 50
+    """,
+    "views for one code": "SELECT count(*) FROM code_views WHERE code_id = :code_id",
+    "purchases for one code": "SELECT count(*), sum(amount) FROM code_purchases WHERE code_id = :code_id",
+    "ratings for one code": "SELECT avg(rating) FROM code_ratings WHERE code_id = :code_id",
+}
+
+def seed(engine, rows: int):
+    """Create the marketplace tables and fill them with synthetic rows"""
+    # Point BENCH_DATABASE_URL at a scratch database: every table is recreated
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    countries = ["nigeria", "ghana"]
+    statuses = ["approved"] * 6 + ["pending", "won", "lost", "rejected"]
+    market_statuses = ["active"] * 5 + ["draft", "sold", "expired"]
+
+    logger.info(f"Seeding {rows} betting codes...")
+    with engine.begin() as conn:
+        insert = text("""
+            INSERT INTO betting_codes (
+                id, bookmaker, code, odds, stake, potential_winnings, status, created_at,
+                price, win_probability, expected_odds, valid_until, min_stake,
+                marketplace_status, analysis_status, user_country, is_published
+            ) VALUES (
+                :id, :bookmaker, :code, :odds, :stake, :potential_winnings, :status, :created_at,
+                :price, :win_probability, :expected_odds, :valid_until, :min_stake,
+                :marketplace_status, :analysis_status, :user_country, :is_published
+            )
+        """)
+        for start in range(0, rows, BATCH_SIZE):
+            batch = []
+            for i in range(start + 1, min(start + BATCH_SIZE, rows) + 1):
+                created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+                batch.append({
+                    "id": i,
+                    "bookmaker": "bet9ja",
+                    "code": f"BENCH{i:08d}",
+                    "odds": 2.0,
+                    "stake": 100.0,
+                    "potential_winnings": 200.0,
+                    "status": rng.choice(statuses),
+                    "created_at": created_at,
+                    "price": float(rng.randint(100, 5000)),
+                    "win_probability": float(rng.randint(10, 95)),
+                    "expected_odds": 2.0,
+                    "valid_until": created_at + timedelta(days=rng.randint(1, 400)),
+                    "min_stake": 100.0,
+                    "marketplace_status": rng.choice(market_statuses),
+                    "analysis_status": rng.choice(["pending", "completed", "completed"]),
+                    "user_country": rng.choice(countries),
+                    "is_published": rng.random() < 0.8,
+                })
+            conn.execute(insert, batch)
+
+        for table, ts_column, extra, per_code in [
+            ("code_views", "viewed_at", {}, 0.5),
+            ("code_purchases", "purchased_at", {"amount": 1000.0, "currency": "NGN", "status": "completed"}, 0.1),
+            ("code_ratings", "created_at", {"rating": 4.0}, 0.1),
+        ]:
+            count = int(rows * per_code)
+            logger.info(f"Seeding {count} rows into {table}...")
+            columns = ["code_id", ts_column] + list(extra)
+            insert = text(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(':' + c for c in columns)})"
+            )
+            for start in range(0, count, BATCH_SIZE):
+                batch = [
+                    {"code_id": rng.randint(1, rows), ts_column: now - timedelta(hours=rng.randint(0, 24 * 90)), **extra}
+                    for _ in range(min(BATCH_SIZE, count - start))
+                ]
+                conn.execute(insert, batch)
+
+def drop_bench_indexes(engine):
+    with engine.begin() as conn:
+        for name in BENCH_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        analyze(conn)
+
+def create_bench_indexes(engine):
+    with engine.begin() as conn:
+        for table in BENCH_TABLES:
+            for index in Base.metadata.tables[table].indexes:
+                if index.name in BENCH_INDEXES:
+                    index.create(bind=conn, checkfirst=True)
+        analyze(conn)
+
+def analyze(conn):
+    conn.execute(text("ANALYZE"))
+
+def query_plan(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).fetchall()
+        return "\n".join(row[0] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+def run_queries(engine, label: str, params: dict) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            timings = []
+            for _ in range(REPEATS):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+
+            print(f"\n[{label}] {name}: {results[name]:.2f} ms (median of {REPEATS})")
+            for line in query_plan(conn, sql, params).splitlines():
+                print(f"    {line}")
+    return results
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    engine = create_engine(BENCH_DATABASE_URL)
+
+    seed(engine, rows)
+
+    # Keyset cursor positioned roughly where page 500 starts
+    with engine.connect() as conn:
+        now = datetime.utcnow()
+        base_params = {"country": "nigeria", "published": True, "now": now}
+        cursor_row = conn.execute(
+            text(QUERIES["marketplace page 500 (offset)"].replace("LIMIT 12", "LIMIT 1")),
+            base_params
+        ).first()
+        cursor_id = cursor_row[0] if cursor_row else rows
+        cursor_at = conn.execute(
+            text("SELECT created_at FROM betting_codes WHERE id = :id"), {"id": cursor_id}
+        ).scalar() or now
+    params = {**base_params, "cursor_at": cursor_at, "cursor_id": cursor_id, "code_id": rows // 2}
+
+    drop_bench_indexes(engine)
+    before = run_queries(engine, "before", params)
+
+    create_bench_indexes(engine)
+    after = run_queries(engine, "after", params)
+
+    print(f"\n{'query':<34}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<34}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
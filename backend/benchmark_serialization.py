@@ -0,0 +1,149 @@
+"""
+Benchmark response serialization for 1k-row listing payloads.
+
+Compares, per model:
+    to_dict + jsonable_encoder + JSONResponse   (the previous path)
+    to_dict + jsonable_encoder + ORJSONResponse (router default)
+    precompiled serializer + ORJSONResponse     (listing endpoints)
+
+and checks that every path produces the same JSON document.
+
+Usage:
+    python benchmark_serialization.py [rows] [repeats]
+"""
+import sys
+import json
+import time
+import statistics
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+import app.db.base  # noqa: F401 - imports every model so the mappers can configure
+from app.models.betting_code import BettingCode
+from app.models.code_analysis import CodeAnalysis
+from app.models.code_purchase import CodePurchase
+from app.models.code_view import CodeView
+from app.models.transaction import Transaction
+from app.schemas.transaction import Transaction as TransactionSchema
+from app.core.serialization import (
+    compile_serializer, serialize_betting_code, serialize_transaction, serialize_many
+)
+
+DEFAULT_ROWS = 1_000
+DEFAULT_REPEATS = 20
+
+# No endpoint lists purchases or views yet, so their serializers live here
+serialize_code_purchase = compile_serializer((
+    'id', 'code_id', 'buyer_id', 'amount', 'currency', 'status', 'purchased_at',
+    'email', 'reference', 'payment_method', 'country'
+))
+
+serialize_code_view = compile_serializer(('id', 'code_id', 'viewer_id', 'viewed_at'))
+
+def make_betting_codes(rows: int):
+    now = datetime.utcnow()
+    codes = []
+    for i in range(rows):
+        code = BettingCode(
+            id=i + 1, user_id=i % 50, bookmaker="bet9ja", code=f"BENCH{i:06d}",
+            odds=2.5, stake=100.0, potential_winnings=250.0, status="approved",
+            created_at=now - timedelta(minutes=i), description="Weekend accumulator " * 4,
+            market_data={"league": "EPL", "selections": 5}, price=1500.0,
+            win_probability=62.5, expected_odds=2.4, valid_until=now + timedelta(days=2),
+            min_stake=100.0, tags=["football", "epl", "acca"], title=f"Code {i}",
+            category="Football", issuer="Kilcode", issuer_type="admin",
+            marketplace_status="active", analysis_status="completed", user_country="nigeria"
+        )
+        if i % 2 == 0:
+            code.analysis = CodeAnalysis(
+                id=i + 1, betting_code_id=i + 1, analyst_id=1, status="completed",
+                confidence_score=80.0, expert_analysis="Solid picks", ai_analysis={"score": 0.8},
+                recommended_price=1500.0, market_category="Football", country="nigeria",
+                bookmaker="bet9ja", created_at=now, updated_at=now, completed_at=now
+            )
+        codes.append(code)
+    return codes
+
+def make_purchases(rows: int):
+    now = datetime.utcnow()
+    return [
+        CodePurchase(
+            id=i + 1, code_id=i % 100, buyer_id=i % 50, amount=1500.0, currency="NGN",
+            status="completed", purchased_at=now - timedelta(minutes=i), email="buyer@example.com",
+            reference=f"REF{i:08d}", payment_method="paystack", country="nigeria"
+        )
+        for i in range(rows)
+    ]
+
+def make_views(rows: int):
+    now = datetime.utcnow()
+    return [
+        CodeView(id=i + 1, code_id=i % 100, viewer_id=i % 50, viewed_at=now - timedelta(seconds=i))
+        for i in range(rows)
+    ]
+
+def make_transactions(rows: int):
+    now = datetime.utcnow()
+    return [
+        Transaction(
+            id=i + 1, user_id=1, type="reward", amount=250.0, fee=0.0, status="completed",
+            payment_method="wallet", payment_reference=f"TXN{i:08d}", description="Code reward",
+            currency="NGN", created_at=now - timedelta(hours=i)
+        )
+        for i in range(rows)
+    ]
+
+def transaction_to_dict(transaction):
+    return TransactionSchema.model_validate(transaction).model_dump()
+
+def json_dict_path(to_dict):
+    return lambda objects: JSONResponse(jsonable_encoder([to_dict(o) for o in objects])).body
+
+def orjson_dict_path(to_dict):
+    return lambda objects: ORJSONResponse(jsonable_encoder([to_dict(o) for o in objects])).body
+
+def compiled_path(serializer):
+    return lambda objects: ORJSONResponse(serialize_many(serializer, objects)).body
+
+def timed(render, objects, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        render(objects)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REPEATS
+
+    models = [
+        ("BettingCode", make_betting_codes(rows), lambda code: code.to_dict(), serialize_betting_code),
+        ("CodePurchase", make_purchases(rows), lambda purchase: purchase.to_dict(), serialize_code_purchase),
+        ("CodeView", make_views(rows), lambda view: view.to_dict(), serialize_code_view),
+        ("Transaction", make_transactions(rows), transaction_to_dict, serialize_transaction),
+    ]
+
+    print(f"{rows} rows per payload, median of {repeats} runs\n")
+    print(f"{'model':<14}{'path':<34}{'ms/payload':>12}{'payloads/s':>12}{'speedup':>9}")
+    for name, objects, to_dict, serializer in models:
+        paths = [
+            ("to_dict + jsonable_encoder + json", json_dict_path(to_dict)),
+            ("to_dict + jsonable_encoder + orjson", orjson_dict_path(to_dict)),
+            ("compiled serializer + orjson", compiled_path(serializer)),
+        ]
+
+        expected = json.loads(paths[0][1](objects))
+        for label, render in paths[1:]:
+            if json.loads(render(objects)) != expected:
+                raise SystemExit(f"{name}: '{label}' output differs from the previous path")
+
+        baseline = None
+        for label, render in paths:
+            seconds = timed(render, objects, repeats)
+            baseline = baseline or seconds
+            print(f"{name:<14}{label:<34}{seconds * 1000:>12.2f}{1 / seconds:>12.1f}{baseline / seconds:>8.1f}x")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark WebSocket broadcasts to 10k simulated sockets.
+
+Compares the previous fan-out (await send_text on every socket in turn,
+reproduced below) with ConnectionManager's per-connection send queues and
+writer tasks. A small share of the sockets are slow clients that take
+slow_delay seconds per frame; the rest yield once per frame like a socket
+with room in its buffer.
+
+Reports, per strategy:
+    broadcast call   time until broadcast_to_country() returns
+    delivery p50/p99 time from a broadcast to its arrival at a fast socket
+    loop stall       longest the event loop went without running a ticker
+    dropped          messages the slow sockets lost to the queue policy
+
+Usage:
+    python benchmark_websocket_fanout.py [sockets] [broadcasts] [slow_share] [slow_delay]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import statistics
+
+os.environ.setdefault("WS_SEND_QUEUE_SIZE", "16")
+os.environ.setdefault("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+from app.core.websocket_manager import ConnectionManager, encode_message
+from app.core.monitoring import metrics
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger("app").setLevel(logging.WARNING)
+
+DEFAULT_SOCKETS = 10_000
+DEFAULT_BROADCASTS = 20
+DEFAULT_SLOW_SHARE = 0.001
+DEFAULT_SLOW_DELAY = 0.2
+BROADCAST_INTERVAL = 0.1
+COUNTRY = "nigeria"
+
+class SimulatedSocket:
+    """Records when each frame arrives; slow sockets take delay seconds per frame"""
+
+    def __init__(self, delay: float, sent_at: list, latencies: list):
+        self.delay = delay
+        self.sent_at = sent_at
+        self.latencies = latencies
+        self.received = 0
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.delay)
+        if not self.delay:
+            self.latencies.append(time.perf_counter() - self.sent_at[self.received])
+        self.received += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def legacy_broadcast(sockets, message):
+    """The previous broadcast_to_country: one send at a time"""
+    text = encode_message(message)
+    for websocket in sockets:
+        try:
+            await websocket.send_text(text)
+        except Exception:
+            pass
+
+async def ticker(stalls: list, stop: asyncio.Event):
+    """Longest gap between wake-ups of a task that asks to run every millisecond"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last)
+        last = now
+
+async def run(strategy: str, sockets: int, broadcasts: int, slow_share: float, slow_delay: float):
+    sent_at, latencies, stalls = [], [], []
+    slow_every = int(1 / slow_share) if slow_share else 0
+    simulated = [
+        SimulatedSocket(slow_delay if slow_every and i % slow_every == 0 else 0.0, sent_at, latencies)
+        for i in range(sockets)
+    ]
+    manager = ConnectionManager()
+    if strategy == "queued":
+        for i, websocket in enumerate(simulated):
+            await manager.connect(websocket, f"user{i}", COUNTRY)
+    dropped_before = sum(
+        sample.value for metric in metrics.ws_messages_dropped.collect()
+        for sample in metric.samples if sample.name.endswith("_total")
+    )
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(ticker(stalls, stop))
+    calls = []
+    for seq in range(broadcasts):
+        message = {"type": "NEW_BETTING_CODE", "data": {"seq": seq, "code": "BENCH", "odds": 2.5}}
+        sent_at.append(time.perf_counter())
+        if strategy == "queued":
+            await manager.broadcast_to_country(message, COUNTRY)
+        else:
+            await legacy_broadcast(simulated, message)
+        calls.append(time.perf_counter() - sent_at[-1])
+        await asyncio.sleep(BROADCAST_INTERVAL)
+
+    fast = sockets - (len(range(0, sockets, slow_every)) if slow_every else 0)
+    deadline = time.perf_counter() + 30
+    while len(latencies) < fast * broadcasts and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    stop.set()
+    await watcher
+
+    for i in range(sockets):
+        await manager.disconnect(simulated[i], f"user{i}", COUNTRY)
+    dropped = sum(
+        sample.value for metric in metrics.ws_messages_dropped.collect()
+        for sample in metric.samples if sample.name.endswith("_total")
+    ) - dropped_before
+
+    latencies.sort()
+    return {
+        "call": statistics.median(calls) * 1000,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "stall": max(stalls) * 1000,
+        "dropped": int(dropped),
+    }
+
+def main():
+    sockets = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SOCKETS
+    broadcasts = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BROADCASTS
+    slow_share = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_SLOW_SHARE
+    slow_delay = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_SLOW_DELAY
+
+    print(
+        f"{sockets} sockets, {broadcasts} broadcasts {BROADCAST_INTERVAL * 1000:.0f} ms apart, "
+        f"{slow_share:.2%} slow at {slow_delay * 1000:.0f} ms/frame, "
+        f"queue {os.environ['WS_SEND_QUEUE_SIZE']} ({os.environ['WS_SLOW_CONSUMER_POLICY']})\n"
+    )
+    print(f"{'strategy':<12}{'call ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'stall ms':>10}{'dropped':>10}")
+    for strategy in ("sequential", "queued"):
+        result = asyncio.run(run(strategy, sockets, broadcasts, slow_share, slow_delay))
+        print(
+            f"{strategy:<12}{result['call']:>10.1f}{result['p50']:>10.1f}{result['p99']:>10.1f}"
+            f"{result['stall']:>10.1f}{result['dropped']:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
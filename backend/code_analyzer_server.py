@@ -1,6 +1,7 @@
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.admin_config import admin_settings
 from app.api.v1.endpoints import admin_auth, admin_betting, code_analyzer
 from app.db.base import Base
@@ -16,7 +17,7 @@ logger = logging.getLogger(__name__)
 # Create tables
 Base.metadata.create_all(bind=admin_engine)
 
-app = FastAPI(title="Code Analyzer API")
+app = FastAPI(title="Code Analyzer API", default_response_class=ORJSONResponse)
 
 # Configure CORS for code analyzer portal
 origins = [
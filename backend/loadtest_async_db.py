@@ -0,0 +1,245 @@
+"""
+Load test the database hot paths on the blocking Session (the previous
+handlers, reproduced below) against the AsyncSession stack.
+
+Both versions serve the same requests through an in-process ASGI client with
+many requests in flight at once: authenticated /auth/me, the marketplace
+listing and a payment status lookup. A handler that runs a blocking query
+inside `async def` holds the event loop for the whole round trip, so requests
+queue behind each other; on the async stack they overlap.
+
+Usage:
+    python loadtest_async_db.py [requests] [concurrency]
+
+LOADTEST_DATABASE_URL selects the scratch database (default: a SQLite file);
+every table in it is recreated. A local SQLite file answers in microseconds,
+so LOADTEST_RTT_MS (default 5) adds that much latency to each statement, spent
+in the thread that executes it like a network round trip would be.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import statistics
+from datetime import datetime, timedelta
+
+LOADTEST_DATABASE_URL = os.getenv("LOADTEST_DATABASE_URL", "sqlite:///./loadtest.db")
+LOADTEST_RTT_MS = float(os.getenv("LOADTEST_RTT_MS", "5"))
+
+# The app's engines are built from settings at import time
+os.environ["DATABASE_URL"] = LOADTEST_DATABASE_URL
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["DB_ECHO"] = "false"
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt
+from sqlalchemy import event, or_, text
+from sqlalchemy.orm import Session
+from app import crud
+from app.api.v1.api import api_router
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.serialization import orjson_response, serialize_betting_code, serialize_many
+from app.db.base_class import Base
+import app.db.base  # noqa: F401 - imports every model so the mappers can configure
+from app.db.session import engine, async_engine, get_db
+from app.models.betting_code import BettingCode
+from app.models.payment import Payment
+from app.models.transaction import Transaction
+from app.schemas.payment import PaymentVerification
+from app.schemas.user import User as UserSchema
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger("app").setLevel(logging.WARNING)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = 10
+USERS = 200
+CODES = 5_000
+
+def seed():
+    """Recreate every table and fill it with synthetic rows"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, name, hashed_password, country, phone, balance, is_active, is_verified, payment_status) "
+            "VALUES (:id, :email, :name, 'x', 'nigeria', :phone, 50000, 1, 1, 'completed')"
+        ), [
+            {"id": i, "email": f"user{i}@example.com", "name": f"User {i}", "phone": str(i)}
+            for i in range(1, USERS + 1)
+        ])
+        conn.execute(text("""
+            INSERT INTO betting_codes (
+                id, user_id, bookmaker, code, odds, stake, potential_winnings, status, created_at,
+                price, valid_until, marketplace_status, user_country, is_published
+            ) VALUES (
+                :id, :user_id, 'bet9ja', :code, 2.0, 100.0, 200.0, 'approved', :created_at,
+                :price, :valid_until, 'active', 'nigeria', 1
+            )
+        """), [
+            {
+                "id": i, "user_id": rng.randint(1, USERS), "code": f"LOAD{i:08d}",
+                "created_at": now - timedelta(hours=rng.randint(0, 24 * 60)),
+                "price": float(rng.randint(100, 5000)),
+                "valid_until": now + timedelta(days=rng.randint(1, 30)),
+            }
+            for i in range(1, CODES + 1)
+        ])
+        conn.execute(text(
+            "INSERT INTO payments (id, user_id, amount, currency, reference, status, type) "
+            "VALUES (:id, :id, 20000, 'NGN', :reference, 'pending', 'withdrawal')"
+        ), [{"id": i, "reference": f"WD-LOAD-{i}"} for i in range(1, USERS + 1)])
+        conn.execute(text(
+            "INSERT INTO transactions (user_id, type, amount, status, payment_method, payment_reference, currency) "
+            "VALUES (:id, 'withdrawal', 20000, 'pending', 'paystack', :reference, 'NGN')"
+        ), [{"id": i, "reference": f"WD-LOAD-{i}"} for i in range(1, USERS + 1)])
+
+def add_latency(sync_engine):
+    """Sleep LOADTEST_RTT_MS per statement in the thread executing it"""
+    delay = LOADTEST_RTT_MS / 1000
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        trace = lambda statement: time.sleep(delay)
+        if hasattr(dbapi_connection, "run_async"):
+            # aiosqlite: statements run on the driver's worker thread
+            dbapi_connection.run_async(lambda conn: conn.set_trace_callback(trace))
+        else:
+            dbapi_connection.set_trace_callback(trace)
+
+# Previous handlers: blocking Session calls made from the event loop
+
+legacy_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+
+def legacy_current_user(db: Session = Depends(get_db), token: str = Depends(legacy_oauth2)):
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    user = crud.user.get(db, id=int(payload["sub"]))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+legacy = FastAPI()
+
+@legacy.get(f"{settings.API_V1_STR}/auth/me", response_model=UserSchema)
+def legacy_read_current_user(current_user=Depends(legacy_current_user)):
+    return current_user
+
+@legacy.get(f"{settings.API_V1_STR}/code-analyzer/marketplace-codes")
+async def legacy_marketplace_codes(country: str, page: int = 1, limit: int = 12, db: Session = Depends(get_db)):
+    query = db.query(BettingCode).filter(
+        BettingCode.user_country == country,
+        BettingCode.is_published == True,
+        BettingCode.marketplace_status == 'active',
+        BettingCode.status == 'approved',
+        or_(BettingCode.valid_until == None, BettingCode.valid_until > datetime.utcnow())
+    )
+    total = query.count()
+    codes = (
+        query.order_by(BettingCode.created_at.desc().nulls_last(), BettingCode.id.desc())
+        .options(*BettingCode.list_options())
+        .offset((page - 1) * limit)
+        .limit(limit)
+        .all()
+    )
+    return orjson_response({
+        "items": serialize_many(serialize_betting_code, codes),
+        "total": total,
+        "total_is_estimate": False,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit,
+        "success": True
+    })
+
+@legacy.post(f"{settings.API_V1_STR}/payments/verify/{{payment_id}}")
+async def legacy_verify_payment(
+    payment_id: int,
+    verification: PaymentVerification,
+    current_user=Depends(legacy_current_user),
+    db: Session = Depends(get_db)
+):
+    payment = db.query(Payment).filter(Payment.id == payment_id, Payment.user_id == current_user.id).first()
+    transaction = db.query(Transaction).filter(
+        Transaction.payment_reference == payment.reference,
+        Transaction.user_id == current_user.id
+    ).first()
+    if not payment or not transaction:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return {"status": payment.status, "data": {"payment_id": payment.id, "amount": payment.amount}}
+
+current = FastAPI()
+current.include_router(api_router, prefix=settings.API_V1_STR)
+
+def token_for(user_id: int) -> str:
+    return create_access_token(data={"sub": str(user_id), "email": f"user{user_id}@example.com", "type": "access"})
+
+async def run(app: FastAPI, requests: int, concurrency: int, build):
+    """Fire requests built by build(i) with at most concurrency in flight; (wall seconds, latencies ms)"""
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        async def one(i):
+            method, url, kwargs = build(i)
+            async with gate:
+                started = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} returned {response.status_code}: {response.text[:200]}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return time.perf_counter() - started, latencies
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CONCURRENCY
+
+    seed()
+    add_latency(engine)
+    add_latency(async_engine.sync_engine)
+    tokens = {user_id: token_for(user_id) for user_id in range(1, USERS + 1)}
+
+    def auth(i):
+        return {"Authorization": f"Bearer {tokens[i % USERS + 1]}"}
+
+    cases = [
+        ("auth /me", lambda i: ("GET", f"{settings.API_V1_STR}/auth/me", {"headers": auth(i)})),
+        ("marketplace listing", lambda i: (
+            "GET", f"{settings.API_V1_STR}/code-analyzer/marketplace-codes",
+            {"params": {"country": "nigeria", "page": i % 20 + 1}}
+        )),
+        ("payment status", lambda i: (
+            "POST", f"{settings.API_V1_STR}/payments/verify/{i % USERS + 1}",
+            {"headers": auth(i), "json": {"status": "pending"}}
+        )),
+    ]
+
+    print(
+        f"{requests} requests, {concurrency} in flight, {LOADTEST_RTT_MS} ms per statement, "
+        f"{engine.dialect.name}\n"
+    )
+    print(f"{'endpoint':<22}{'stack':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, build in cases:
+        for stack, app in (("sync", legacy), ("async", current)):
+            # Warm up the pools and the search/serializer caches
+            asyncio.run(run(app, concurrency, concurrency, build))
+            elapsed, latencies = asyncio.run(run(app, requests, concurrency, build))
+            latencies.sort()
+            print(
+                f"{name:<22}{stack:<8}{requests / elapsed:>10.1f}"
+                f"{statistics.median(latencies):>10.1f}{latencies[int(len(latencies) * 0.95) - 1]:>10.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
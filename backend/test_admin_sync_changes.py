@@ -0,0 +1,90 @@
+"""
+Writes made through the admin apps must reach the delta-sync change log.
+
+The admin apps never import the main API, so the checks run in a fresh
+interpreter that loads nothing but the app under test.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+def seed(db):
+    from app.models import Admin, BettingCode, Payment, User
+
+    admin = Admin(email="admin@example.com", hashed_password="x", country="ghana", role="super_admin")
+    user = User(email="user@example.com", name="User", hashed_password="x", country="ghana", phone="233200000000", balance=100.0)
+    db.add_all([admin, user])
+    db.flush()
+    codes = [
+        BettingCode(
+            user_id=user.id, bookmaker="sportybet", code=f"CODE{i}", odds=2.0, stake=10.0,
+            potential_winnings=20.0, status="pending", user_country="ghana", marketplace_status="active"
+        )
+        for i in range(2)
+    ]
+    payment = Payment(user_id=user.id, amount=50.0, currency="GHS", reference="WD-1", status="pending", payment_method="momo", type="withdrawal")
+    db.add_all(codes + [payment])
+    db.commit()
+    return admin, user, codes, payment
+
+def check_admin_writes():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    import admin_server
+    import code_analyzer_server
+    import payment_admin_server
+    from app.core.auth import get_current_admin
+    from app.core.database import engine
+    from app.models import SyncChange, User
+
+    with Session(engine, expire_on_commit=False) as db:
+        admin, user, codes, payment = seed(db)
+        # The flushes that seeded the user's records logged them already
+        seeded = db.execute(select(User.sync_version).where(User.id == user.id)).scalar()
+
+    def changes():
+        with Session(engine) as db:
+            return {
+                (row.entity, row.entity_id): row.version
+                for row in db.execute(select(SyncChange).where(SyncChange.user_id == user.id)).scalars()
+            }
+
+    writes = [
+        (admin_server.app, "post", f"/api/v1/admin/bulk-verify?user_id={user.id}&status=approved", None, ("code", codes[0].id)),
+        (payment_admin_server.app, "post", f"/api/v1/payment-admin/{payment.id}/verify", {"status": "approved"}, ("payment", payment.id)),
+        (code_analyzer_server.app, "put", f"/api/v1/code-analyzer/marketplace-status/{codes[1].id}?status=draft", None, ("code", codes[1].id)),
+    ]
+    for app, method, path, body, record in writes:
+        app.dependency_overrides[get_current_admin] = lambda: admin
+        before = changes()
+        response = getattr(TestClient(app), method)(path, json=body)
+        assert response.status_code == 200, (path, response.status_code, response.text)
+        after = changes()
+        assert after.get(record, 0) > before.get(record, 0), (path, before, after)
+
+    with Session(engine) as db:
+        head = db.execute(select(User.sync_version).where(User.id == user.id)).scalar()
+    assert head > seeded
+    assert head == max(changes().values())
+
+def test_admin_writes_produce_change_rows():
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{directory}/app.db",
+            ADMIN_DATABASE_URL=f"sqlite:///{directory}/admin.db",
+            CACHE_ENABLED="false",
+            DB_ECHO="false"
+        )
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, timeout=120
+        )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+if __name__ == "__main__":
+    check_admin_writes()
+    print("Admin writes reach sync_changes")
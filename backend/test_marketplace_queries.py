@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.base_class import Base
+from app.models import Admin, BettingCode, CodeAnalysis
+from app.models.code_analysis import AnalysisStatus
+from app.api.v1.endpoints.code_analyzer import get_marketplace_codes
+
+# Rows seeded; more than a page so the counts show no per-code queries
+CODES = 30
+PAGE = 12
+
+# Skip the response cache so every call reaches the database
+list_codes = get_marketplace_codes.__wrapped__
+
+async def seed(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        admin = Admin(email="analyst@example.com", hashed_password="x", country="ghana")
+        db.add(admin)
+        await db.flush()
+        now = datetime.utcnow()
+        for i in range(CODES):
+            code = BettingCode(
+                bookmaker="sportybet", code=f"CODE{i}", odds=2.0, stake=10.0, potential_winnings=20.0,
+                status="approved", is_published=True, marketplace_status="active",
+                user_country="ghana", price=5.0, title=f"Code {i}",
+                created_at=now - timedelta(minutes=i)
+            )
+            db.add(code)
+            await db.flush()
+            db.add(CodeAnalysis(
+                betting_code_id=code.id, analyst_id=admin.id, status=AnalysisStatus.COMPLETED,
+                country="ghana", bookmaker="sportybet"
+            ))
+        await db.commit()
+
+async def list_page(**params):
+    """The endpoint's response body and the statements it ran"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    await seed(engine)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSession(engine) as db:
+        response = await list_codes(db=db, country="ghana", limit=PAGE, **params)
+    await engine.dispose()
+    return orjson.loads(response.body), statements
+
+def test_page_mode_queries():
+    # COUNT, the page of codes, their analyses in one batch
+    body, statements = asyncio.run(list_page(page=2))
+    assert len(body["items"]) == PAGE
+    assert body["total"] == CODES
+    assert all(item["analysis"] for item in body["items"])
+    assert len(statements) == 3, statements
+
+def test_cursor_mode_queries():
+    # No COUNT by default: the page of codes and their analyses
+    body, statements = asyncio.run(list_page(pagination="cursor"))
+    assert len(body["items"]) == PAGE
+    assert body["has_more"]
+    assert all(item["analysis"] for item in body["items"])
+    assert len(statements) == 2, statements
+
+if __name__ == "__main__":
+    test_page_mode_queries()
+    test_cursor_mode_queries()
+    print("Marketplace list queries OK")
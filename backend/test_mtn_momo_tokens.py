@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.payments import mtn_momo
+from app.services.payments.mtn_momo import MTNMoMoService, TOKEN_REFRESH_AHEAD_SECONDS, TOKEN_RETRY_SECONDS
+
+# Lifetime of the tokens the fake server issues
+EXPIRES_IN = 3600
+
+class FakeMoMo(ThreadingHTTPServer):
+    """
+    MTN MoMo collection API on localhost: issues tokens t1, t2, ... from
+    /collection/token/ and accepts request-to-pay calls unless their token
+    was revoked (401). Set fail_tokens to make token requests fail with 500.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeMoMoHandler)
+        self.token_requests = 0
+        self.issued = 0
+        self.fail_tokens = False
+        self.token_delay = 0.1  # keeps concurrent callers waiting on the same fetch
+        self.revoked = set()
+        self.payment_tokens = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+class FakeMoMoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def reply(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        if self.path == "/collection/token/":
+            server.token_requests += 1
+            time.sleep(server.token_delay)
+            if server.fail_tokens:
+                return self.reply(500)
+            server.issued += 1
+            return self.reply(200, json.dumps({
+                "access_token": f"t{server.issued}",
+                "token_type": "access_token",
+                "expires_in": EXPIRES_IN
+            }).encode())
+        if self.path == "/collection/v1_0/requesttopay":
+            token = self.headers["Authorization"].split()[1]
+            server.payment_tokens.append(token)
+            return self.reply(401 if token in server.revoked else 202)
+        self.reply(404)
+
+    def log_message(self, *args):
+        pass
+
+class Clock:
+    """Stands in for time.monotonic so tests can move through a token's lifetime"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def momo(monkeypatch):
+    server = FakeMoMo()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("MTN_API_URL", server.url)
+    monkeypatch.setenv("MTN_API_USER", "api-user")
+    monkeypatch.setenv("MTN_API_KEY", "api-key")
+    monkeypatch.setenv("MTN_SUBSCRIPTION_KEY", "subscription-key")
+    monkeypatch.setattr(mtn_momo, "_token_managers", {})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(mtn_momo, "time", clock)
+    return clock
+
+async def settle(condition, timeout: float = 5.0) -> None:
+    """Wait for background work the fake server observes"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def test_concurrent_payments_share_one_token_fetch(momo):
+    async def run():
+        await asyncio.gather(*(
+            MTNMoMoService().initialize_payment(10, "+233200000000") for _ in range(20)
+        ))
+        await MTNMoMoService().initialize_payment(10, "+233200000000")
+
+    asyncio.run(run())
+    assert momo.token_requests == 1
+    assert momo.payment_tokens == ["t1"] * 21
+
+def test_token_refreshes_in_the_background_before_expiry(momo, clock):
+    async def run():
+        service = MTNMoMoService()
+        assert await service.get_auth_token() == "t1"
+
+        clock.now += EXPIRES_IN - TOKEN_REFRESH_AHEAD_SECONDS - 1
+        assert await service.get_auth_token() == "t1"
+        assert momo.token_requests == 1
+
+        # Inside the refresh window: the current token is returned at once
+        clock.now += 2
+        assert await service.get_auth_token() == "t1"
+        await settle(lambda: service.tokens._token == "t2")
+        assert await service.get_auth_token() == "t2"
+
+    asyncio.run(run())
+    assert momo.token_requests == 2
+
+def test_rejected_token_is_invalidated_and_retried_once(momo):
+    async def run():
+        service = MTNMoMoService()
+        await service.initialize_payment(10, "+233200000000")
+        momo.revoked.add("t1")
+        await service.initialize_payment(10, "+233200000000")
+
+        # A rejected retry is not retried again
+        momo.revoked.update({"t2", "t3"})
+        with pytest.raises(mtn_momo.HTTPException):
+            await service.initialize_payment(10, "+233200000000")
+
+    asyncio.run(run())
+    assert momo.payment_tokens == ["t1", "t1", "t2", "t2", "t3"]
+    assert momo.token_requests == 3
+
+def test_failed_background_refresh_backs_off(momo, clock):
+    async def run():
+        service = MTNMoMoService()
+        assert await service.get_auth_token() == "t1"
+
+        momo.fail_tokens = True
+        clock.now += EXPIRES_IN - TOKEN_REFRESH_AHEAD_SECONDS + 1
+        assert await service.get_auth_token() == "t1"
+        await settle(lambda: momo.token_requests == 2 and service.tokens._task.done())
+
+        # Callers keep the current token without hammering the token endpoint
+        for _ in range(10):
+            assert await service.get_auth_token() == "t1"
+        clock.now += TOKEN_RETRY_SECONDS - 1
+        assert await service.get_auth_token() == "t1"
+        await asyncio.sleep(0.2)
+        assert momo.token_requests == 2
+
+        # Retried once the backoff has passed
+        momo.fail_tokens = False
+        clock.now += 2
+        assert await service.get_auth_token() == "t1"
+        await settle(lambda: service.tokens._token == "t2")
+
+    asyncio.run(run())
+    assert momo.token_requests == 3
@@ -0,0 +1,170 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from app.db.base_class import Base
+from app.models import BettingCode, Payment, User
+from app.schemas.sync import SyncRequest
+from app.services import sync_service
+from app.api.v1.sync import sync_data
+
+# Small pages so a handful of records spans several of them
+LIMIT = 3
+
+@pytest.fixture
+def database(tmp_path):
+    """Two users' codes and payments, written through the ORM so the flush listener logs them"""
+    path = tmp_path / "sync.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as db:
+        users = [
+            User(email=f"user{i}@example.com", name=f"User {i}", hashed_password="x", country="ghana", phone=f"23320000000{i}")
+            for i in range(2)
+        ]
+        db.add_all(users)
+        db.flush()
+        for user in users:
+            db.add_all([
+                BettingCode(
+                    user_id=user.id, bookmaker="sportybet", code=f"U{user.id}C{i}",
+                    odds=2.0, stake=10.0, potential_winnings=20.0, status="pending"
+                )
+                for i in range(4)
+            ])
+            db.add_all([
+                Payment(user_id=user.id, amount=10.0 * i, currency="GHS", reference=f"U{user.id}P{i}", status="pending")
+                for i in range(1, 3)
+            ])
+        db.commit()
+    yield engine, f"sqlite+aiosqlite:///{path}", users
+    engine.dispose()
+
+def fetch(url, user_id, cursor, limit=LIMIT):
+    async def run():
+        engine = create_async_engine(url)
+        try:
+            async with AsyncSession(engine) as db:
+                return await sync_service.fetch_changes(db, user_id, cursor, limit)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+def sync_all(url, user_id, cursor=None):
+    """Every page from cursor on, and the cursor to continue from"""
+    pages = []
+    while True:
+        page = fetch(url, user_id, cursor)
+        pages.append(page)
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return pages, cursor
+
+def test_pages_through_every_change_once(database):
+    engine, url, (user, _) = database
+    pages, cursor = sync_all(url, user.id)
+    head = pages[0]["head"]
+
+    # The user's settings, 4 codes and 2 payments
+    assert head == 7
+    assert [len(page["updates"]) for page in pages] == [3, 3, 1]
+    assert [page["has_more"] for page in pages] == [True, True, False]
+    versions = [update["version"] for page in pages for update in page["updates"]]
+    assert versions == list(range(1, head + 1))
+    assert cursor == f"{user.id}:{head}"
+
+    updates = [update for page in pages for update in page["updates"]]
+    assert sorted(update["code"] for update in updates if update["type"] == "CODE_STATUS") == [
+        f"U{user.id}C{i}" for i in range(4)
+    ]
+    assert sorted(update["reference"] for update in updates if update["type"] == "PAYMENT_STATUS") == [
+        f"U{user.id}P{i}" for i in range(1, 3)
+    ]
+    assert all(not update.get("deleted") for update in updates)
+
+    # Caught up: nothing more until something changes
+    page = fetch(url, user.id, cursor)
+    assert page["updates"] == [] and not page["has_more"] and page["cursor"] == cursor
+
+def test_resumes_from_cursor(database):
+    engine, url, (user, _) = database
+    first = fetch(url, user.id, None)
+    second = fetch(url, user.id, first["cursor"])
+    assert [update["version"] for update in second["updates"]] == [4, 5, 6]
+
+    with Session(engine) as db:
+        code = db.query(BettingCode).filter(BettingCode.user_id == user.id).first()
+        code.status = "won"
+        db.commit()
+        code_id = code.id
+
+    # Only what changed since the cursor, at the user's next version
+    pages, _ = sync_all(url, user.id, second["cursor"])
+    updates = [update for page in pages for update in page["updates"]]
+    assert updates[-1]["id"] == code_id and updates[-1]["status"] == "won" and updates[-1]["version"] == 8
+    assert [update["version"] for update in updates] == [7, 8]
+
+def test_deleted_records_come_back_as_tombstones(database):
+    engine, url, (user, _) = database
+    _, cursor = sync_all(url, user.id)
+
+    with Session(engine) as db:
+        code = db.query(BettingCode).filter(BettingCode.user_id == user.id).first()
+        payment = db.query(Payment).filter(Payment.user_id == user.id).first()
+        code_id, payment_id = code.id, payment.id
+        db.delete(code)
+        db.delete(payment)
+        db.commit()
+
+    page = fetch(url, user.id, cursor)
+    assert page["updates"] == [
+        {"type": "CODE_STATUS", "id": code_id, "deleted": True, "version": 8},
+        {"type": "PAYMENT_STATUS", "id": payment_id, "deleted": True, "version": 9},
+    ]
+
+    # A client syncing from scratch sees the tombstones, not the deleted records
+    pages, _ = sync_all(url, user.id)
+    updates = [update for page in pages for update in page["updates"]]
+    assert len(updates) == 7
+    assert {(update["type"], update["id"]) for update in updates if update.get("deleted")} == {
+        ("CODE_STATUS", code_id), ("PAYMENT_STATUS", payment_id)
+    }
+
+def test_cursor_ahead_of_latest_version_starts_over(database):
+    engine, url, (user, _) = database
+    page = fetch(url, user.id, f"{user.id}:100")
+    assert [update["version"] for update in page["updates"]] == [1, 2, 3]
+    assert page["cursor"] == f"{user.id}:3"
+
+def test_cursor_from_another_user_starts_over(database):
+    engine, url, (user, other) = database
+    # The other user's cursor is behind this user's latest version, so only
+    # the user id tells them apart
+    other_cursor = fetch(url, other.id, None)["cursor"]
+    assert other_cursor == f"{other.id}:3"
+    page = fetch(url, user.id, other_cursor)
+    assert [update["version"] for update in page["updates"]] == [1, 2, 3]
+
+    # A bare version, as clients stored before cursors named their user
+    page = fetch(url, user.id, "3")
+    assert [update["version"] for update in page["updates"]] == [1, 2, 3]
+
+@pytest.mark.parametrize("cursor", ["abc", "1:", ":3", "1:2:3", "x:1"])
+def test_malformed_cursor_is_rejected(database, cursor):
+    engine, url, (user, _) = database
+    with pytest.raises(ValueError):
+        fetch(url, user.id, cursor)
+
+    async def request():
+        async_engine = create_async_engine(url)
+        try:
+            async with AsyncSession(async_engine) as db:
+                return await sync_data(SyncRequest(cursor=cursor), current_user=user, db=db, authorization="Bearer token")
+        finally:
+            await async_engine.dispose()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(request())
+    assert error.value.status_code == 400
@@ -1,6 +1,7 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import axios from 'axios';
 import { toast } from 'react-hot-toast';
+import { SyncManager } from '../utils/syncManager';
 
 const AuthContext = createContext(null);
 
@@ -111,6 +112,10 @@ export const AuthProvider = ({ children }) => {
   };
 
   const clearUserData = () => {
+    const userId = SyncManager.getCurrentUserId();
+    if (userId !== null) {
+      SyncManager.clearSyncCursor(userId);
+    }
     localStorage.removeItem('token');
     localStorage.removeItem('userCountry');
     localStorage.removeItem('user');
@@ -3,6 +3,7 @@ import { OfflineStorage } from './offlineStorage';
 export class SyncManager {
   static VERSION_KEY = 'data_version';
   static SYNC_TIMESTAMP = 'last_sync';
+  static CURSOR_KEY = 'sync_cursor';
 
   static async getLastSyncTimestamp() {
     return localStorage.getItem(this.SYNC_TIMESTAMP) || '0';
@@ -20,7 +21,32 @@ export class SyncManager {
     localStorage.setItem(this.VERSION_KEY, version);
   }
 
-  static async synchronize(apiUrl, token) {
+  // Cursors are kept per user, so another login on this browser starts its own sync
+  static cursorKey(userId) {
+    return `${this.CURSOR_KEY}:${userId}`;
+  }
+
+  static getCurrentUserId() {
+    try {
+      return JSON.parse(localStorage.getItem('user') || 'null')?.id ?? null;
+    } catch (error) {
+      return null;
+    }
+  }
+
+  static async getSyncCursor(userId) {
+    return localStorage.getItem(this.cursorKey(userId));
+  }
+
+  static async setSyncCursor(userId, cursor) {
+    localStorage.setItem(this.cursorKey(userId), cursor);
+  }
+
+  static clearSyncCursor(userId) {
+    localStorage.removeItem(this.cursorKey(userId));
+  }
+
+  static async synchronize(apiUrl, token, userId = this.getCurrentUserId()) {
     try {
       // Track sync attempt
       const syncAttempt = {
@@ -33,31 +59,38 @@ export class SyncManager {
       const currentVersion = await this.getDataVersion();
 
       try {
-        const response = await fetch(`${apiUrl}/sync`, {
-          method: 'POST',
-          headers: {
-            'Authorization': token.startsWith('Bearer ') ? token : `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          },
-          body: JSON.stringify({
-            lastSync,
-            version: currentVersion
-          }),
-          credentials: 'include'
-        });
+        // The server sends changes since the cursor a page at a time
+        let processedCount = 0;
+        let failedCount = 0;
+        let total = 0;
+        let hasMore = true;
 
-        if (!response.ok) {
-          const error = await response.json();
-          throw new Error(error.detail || 'Sync failed');
-        }
+        while (hasMore) {
+          const cursor = await this.getSyncCursor(userId);
+          const response = await fetch(`${apiUrl}/sync`, {
+            method: 'POST',
+            headers: {
+              'Authorization': token.startsWith('Bearer ') ? token : `Bearer ${token}`,
+              'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+              lastSync,
+              version: currentVersion,
+              cursor
+            }),
+            credentials: 'include'
+          });
 
-        const { updates, newVersion } = await response.json();
+          if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || 'Sync failed');
+          }
 
-        // Process updates with tracking
-        let processedCount = 0;
-        let failedCount = 0;
-        
-        if (updates?.length > 0) {
+          const page = await response.json();
+          const updates = page.updates || [];
+          total += updates.length;
+
+          // Process updates with tracking
           for (const update of updates) {
             try {
               await this.processUpdate(update);
@@ -71,17 +104,19 @@ export class SyncManager {
               });
             }
           }
-        }
 
-        // Update version and timestamp
-        await this.setDataVersion(newVersion);
+          // Update version and cursor
+          await this.setDataVersion(page.newVersion);
+          await this.setSyncCursor(userId, page.cursor);
+          hasMore = page.hasMore;
+        }
         await this.setLastSyncTimestamp();
 
         // Update sync status
         syncAttempt.status = 'completed';
         syncAttempt.endTime = Date.now();
         syncAttempt.stats = {
-          total: updates?.length || 0,
+          total,
           processed: processedCount,
           failed: failedCount
         };
@@ -130,18 +165,22 @@ export class SyncManager {
 
   static async processUpdates(updates) {
     for (const update of updates) {
-      switch (update.type) {
-        case 'CODE_STATUS':
-          await this.handleCodeStatusUpdate(update);
-          break;
-        case 'PAYMENT_STATUS':
-          await this.handlePaymentStatusUpdate(update);
-          break;
-        case 'USER_SETTINGS':
-          await this.handleSettingsUpdate(update);
-          break;
-        // Add more cases as needed
-      }
+      await this.processUpdate(update);
+    }
+  }
+
+  static async processUpdate(update) {
+    switch (update.type) {
+      case 'CODE_STATUS':
+        await this.handleCodeStatusUpdate(update);
+        break;
+      case 'PAYMENT_STATUS':
+        await this.handlePaymentStatusUpdate(update);
+        break;
+      case 'USER_SETTINGS':
+        await this.handleSettingsUpdate(update);
+        break;
+      // Add more cases as needed
     }
   }
 
@@ -149,32 +188,41 @@ export class SyncManager {
     try {
       const cache = await OfflineStorage.getCache();
       
-      if (!update || !update.code) {
+      if (!update || update.id == null || (!update.deleted && !update.code)) {
         console.error('Invalid update data:', update);
         return;
       }
 
-      // Find and update existing item or add new one
+      // Find the cached code by id; the code string is not unique
       const existingIndex = cache.findIndex(item => 
         item.type === 'CODE_STATUS' && 
-        item.code === update.code
+        item.id === update.id
       );
 
-      const updatedItem = {
-        ...update,
-        timestamp: Date.now(),
-        synced: true // Add sync status
-      };
-
-      if (existingIndex >= 0) {
-        cache[existingIndex] = {
-          ...cache[existingIndex],
-          ...updatedItem
-        };
+      if (update.deleted) {
+        // Tombstone: the code was deleted or is no longer this user's
+        if (existingIndex >= 0) {
+          cache.splice(existingIndex, 1);
+        }
       } else {
-        cache.push(updatedItem);
+        const updatedItem = {
+          ...update,
+          timestamp: Date.now(),
+          synced: true // Add sync status
+        };
+
+        if (existingIndex >= 0) {
+          cache[existingIndex] = {
+            ...cache[existingIndex],
+            ...updatedItem
+          };
+        } else {
+          cache.push(updatedItem);
+        }
       }
 
+      // saveToCache appends arrays to what is stored, so replace the cache
+      await OfflineStorage.clearCache();
       await OfflineStorage.saveToCache(cache);
       return true;
     } catch (error) {
@@ -189,6 +189,12 @@ class WebSocketManager {
   }
 
   handleMessage(data) {
+    // Bursts of events arrive together in one BATCH frame
+    if (data.type === 'BATCH') {
+      data.events.forEach(event => this.handleMessage(event));
+      return;
+    }
+
     console.log('Received WebSocket message:', data);
     
     try {
@@ -217,6 +223,10 @@ class WebSocketManager {
         case 'PONG':
           // Handle ping response
           break;
+        case 'PING':
+          // Server heartbeat; an unanswered connection is closed as idle
+          this.ws.send(JSON.stringify({ type: 'PONG' }));
+          break;
         default:
           console.log('Unknown message type:', data.type);
       }